@@ -1,25 +1,51 @@
+from typing import Callable
+
 import datetime
 import logging
 import os
 import re
 import subprocess
+import time
 from time import sleep
 
 from chronus.application.benchmark_service import JobFailedException
+from chronus.domain.configuration import Configuration
 from chronus.domain.interfaces.application_runner_interface import ApplicationRunnerInterface
+from chronus.domain.interfaces.job_state_tracker_interface import JobStateTrackerInterface
+from chronus.domain.job_state import JobState
 from chronus.domain.Run import Run
+from chronus.SystemIntegration.job_state_trackers.slurm_job_state_tracker import (
+    SlurmJobStateTracker,
+)
 
 hpcg_dat_file_content = """HPCG benchmark input file
 Benchmarked on 2020-11-24 14:00:00
 104 104 104
 900"""
 
+ARRAY_SLURM_FILE_NAME = "HPCG_BENCHMARK_ARRAY.slurm"
+# How long a job without output can be unknown to Slurm before it counts as failed. squeue and
+# sacct fail now and then, e.g. while slurmctld or slurmdbd restart.
+UNKNOWN_GRACE_SECONDS = 60.0
+
 
 class HpcgService(ApplicationRunnerInterface):
     _output: str
     _job_id: int
+    _array_size: int = 0
 
-    def __init__(self, hpcg_path, output_dir: str = ""):
+    def __init__(
+        self,
+        hpcg_path,
+        output_dir: str = "",
+        job_state_tracker: JobStateTrackerInterface = None,
+        node: str = None,
+        unknown_grace_seconds: float = UNKNOWN_GRACE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Benchmarks sharing a ``job_state_tracker`` have the states of their jobs polled
+        together. With a ``node`` the jobs are pinned to that node. A job Slurm does not know
+        and that left no output fails after ``unknown_grace_seconds``."""
         self._hpcg_path = hpcg_path
         if output_dir == "":
             self._output_dir = "./"
@@ -29,6 +55,13 @@ class HpcgService(ApplicationRunnerInterface):
 
         self._output_dir = output_dir
         self._output = ""
+        if job_state_tracker is None:
+            job_state_tracker = SlurmJobStateTracker()
+        self._job_state_tracker = job_state_tracker
+        self._node = node
+        self._unknown_grace_seconds = unknown_grace_seconds
+        self._clock = clock
+        self._unknown_since: dict[str, float] = {}
         self.logger = logging.getLogger(__name__)
 
     def prepare(self):
@@ -47,8 +80,43 @@ class HpcgService(ApplicationRunnerInterface):
         ) as slurm_file:
             slurm_file.write(slurm_file_content)
 
+        self._submit("HPCG_BENCHMARK.slurm")
+
+    def run_array(self, configurations: list[Configuration]) -> None:
+        """Submits one array job with a task for each configuration.
+
+        The tasks run one at a time, so the power of the node is drawn by one configuration, and
+        each task runs HPCG in its own directory, task_<index>, so their outputs are kept apart.
+        """
+        self._array_size = len(configurations)
+        for task in range(self._array_size):
+            os.mkdir(self._task_dir(task))
+            self._prepare_hpcg_dat_file(self._task_dir(task))
+
+        with open(
+            self._output_dir + "hpcg_benchmark_output/" + ARRAY_SLURM_FILE_NAME, "w"
+        ) as slurm_file:
+            slurm_file.write(self._generate_array_slurm_file_content(configurations))
+
+        self._submit(ARRAY_SLURM_FILE_NAME)
+
+    def array_task_states(self) -> dict[int, JobState]:
+        tasks = {f"{self._job_id}_{task}": task for task in range(self._array_size)}
+        states = self._job_state_tracker.states(list(tasks))
+        return {
+            task: self._known_state(job_id, states[job_id], self._task_dir(task))
+            for job_id, task in tasks.items()
+        }
+
+    def array_task_gflops(self, task: int) -> float:
+        return self._parse_gflops(self._get_output_file_content(self._task_dir(task)))
+
+    def array_task_result(self, task: int) -> float:
+        return self._parse_result(self._get_output_file_content(self._task_dir(task)))
+
+    def _submit(self, slurm_file_name: str):
         job: subprocess.CompletedProcess = subprocess.run(
-            ["sbatch", "HPCG_BENCHMARK.slurm"],
+            ["sbatch", slurm_file_name],
             cwd=self._output_dir + "hpcg_benchmark_output",
             stdout=subprocess.PIPE,
         )
@@ -61,15 +129,32 @@ class HpcgService(ApplicationRunnerInterface):
         self.logger.info(f"Job started with id: {self._job_id}")
 
     def is_running(self) -> bool:
-        cmd = subprocess.run(["scontrol", "show", "job", str(self._job_id)], stdout=subprocess.PIPE)
-
-        is_running = re.search(r"JobState=COMPLETED", str(cmd.stdout)) is None
+        state = self._known_state(
+            str(self._job_id),
+            self._job_state_tracker.state(str(self._job_id)),
+            self._output_dir + "hpcg_benchmark_output",
+        )
+        if state.is_failed:
+            self.logger.error(f"Job with id {self._job_id} ended as {state.value}")
+            raise JobFailedException(f"Job with id {self._job_id} ended as {state.value}")
 
-        if re.search(r"JobState=FAILED", str(cmd.stdout)):
-            self.logger.error(f"Job with id {self._job_id} failed")
-            raise JobFailedException(f"Job with id {self._job_id} failed")
+        return not state.is_terminal
 
-        return is_running
+    def _known_state(self, job_id: str, state: JobState, directory: str) -> JobState:
+        # Slurm forgets finished jobs after a while, their output tells how they went.
+        if state is not JobState.UNKNOWN:
+            self._unknown_since.pop(job_id, None)
+            return state
+        if self._has_output_file(directory):
+            return JobState.COMPLETED
+        unknown_since = self._unknown_since.setdefault(job_id, self._clock())
+        if self._clock() - unknown_since < self._unknown_grace_seconds:
+            return JobState.UNKNOWN
+        self.logger.error(
+            f"Slurm did not know job {job_id} for {self._unknown_grace_seconds} seconds and it "
+            f"left no output"
+        )
+        return JobState.FAILED
 
     @property
     def gflops(self) -> float:
@@ -78,14 +163,21 @@ class HpcgService(ApplicationRunnerInterface):
         self.logger.debug(f"GFlops calculated: {gflops}")
         return gflops
 
-    def _get_output_file_content(self):
-        files = os.listdir(self._output_dir + "hpcg_benchmark_output")
+    def _get_output_file_content(self, directory: str = None):
+        directory = directory or self._output_dir + "hpcg_benchmark_output"
+        files = os.listdir(directory)
         output_file = [f for f in files if re.match(r"HPCG-Benchmark_", f)][0]
-        output_file_content = open(
-            self._output_dir + "hpcg_benchmark_output/" + output_file, "r"
-        ).read()
+        output_file_content = open(directory + "/" + output_file, "r").read()
         return output_file_content
 
+    def _has_output_file(self, directory: str) -> bool:
+        return os.path.isdir(directory) and any(
+            re.match(r"HPCG-Benchmark_", f) for f in os.listdir(directory)
+        )
+
+    def _task_dir(self, task: int) -> str:
+        return self._output_dir + f"hpcg_benchmark_output/task_{task}"
+
     @property
     def result(self) -> float:
         output_file_content = self._get_output_file_content()
@@ -103,12 +195,37 @@ class HpcgService(ApplicationRunnerInterface):
 #SBATCH --job-name=HPCG_BENCHMARK
 #SBATCH --output=HPCG_BENCHMARK.out
 #SBATCH --error=HPCG_BENCHMARK.err
-#SBATCH --nodes=1
+#SBATCH --nodes=1{self._nodelist()}
 #SBATCH --ntasks={cores}
 #SBATCH --cpu-freq={frequency}
 
 srun --mpi=pmix_v4 --ntasks-per-core={thread_per_core} {self._hpcg_path}"""
 
+    def _generate_array_slurm_file_content(self, configurations: list[Configuration]) -> str:
+        cores = " ".join(str(conf.cores) for conf in configurations)
+        frequencies = " ".join(str(int(conf.frequency)) for conf in configurations)
+        threads_per_core = " ".join(str(conf.threads_per_core) for conf in configurations)
+        max_cores = max(conf.cores for conf in configurations)
+        return f"""#!/bin/bash
+#SBATCH --job-name=HPCG_BENCHMARK
+#SBATCH --output=task_%a/HPCG_BENCHMARK.out
+#SBATCH --error=task_%a/HPCG_BENCHMARK.err
+#SBATCH --nodes=1{self._nodelist()}
+#SBATCH --ntasks={max_cores}
+#SBATCH --array=0-{len(configurations) - 1}%1
+
+CORES=({cores})
+FREQUENCIES=({frequencies})
+THREADS_PER_CORE=({threads_per_core})
+TASK=$SLURM_ARRAY_TASK_ID
+
+cd task_$TASK
+srun --mpi=pmix_v4 --ntasks=${{CORES[$TASK]}} --cpu-freq=${{FREQUENCIES[$TASK]}} \\
+    --ntasks-per-core=${{THREADS_PER_CORE[$TASK]}} {self._hpcg_path}"""
+
+    def _nodelist(self) -> str:
+        return "" if self._node is None else f"\n#SBATCH --nodelist={self._node}"
+
     def _parse_gflops(self, output: str) -> float:
         gflops_parser = re.compile(r"GFLOP/s rating of=(?P<gflops>\d+\.\d+)")
         match = gflops_parser.search(output)
@@ -139,8 +256,8 @@ srun --mpi=pmix_v4 --ntasks-per-core={thread_per_core} {self._hpcg_path}"""
         os.mkdir(output_dir)
         self.logger.info(f"Created directory: {output_dir}")
 
-    def _prepare_hpcg_dat_file(self):
-        output_dir = self._output_dir + "hpcg_benchmark_output"
+    def _prepare_hpcg_dat_file(self, output_dir: str = None):
+        output_dir = output_dir or self._output_dir + "hpcg_benchmark_output"
         dat_file_path = output_dir + "/hpcg.dat"
         with open(dat_file_path, "w") as dat_file:
             dat_file.write(hpcg_dat_file_content)
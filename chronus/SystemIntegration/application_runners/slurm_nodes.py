@@ -0,0 +1,13 @@
+import subprocess
+
+
+def list_partition_nodes(partition: str) -> list[str]:
+    """The names of the nodes in a Slurm partition, each once."""
+    cmd = subprocess.run(
+        ["sinfo", "--noheader", "--Node", f"--partition={partition}", "--format=%N"],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    # A node is listed once for every partition it is in, and sinfo can list it twice.
+    return list(dict.fromkeys(line.strip() for line in cmd.stdout.splitlines() if line.strip()))
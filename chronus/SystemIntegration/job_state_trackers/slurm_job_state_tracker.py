@@ -0,0 +1,155 @@
+from typing import Callable
+
+import logging
+import re
+import subprocess
+import threading
+import time
+
+from chronus.domain.interfaces.job_state_tracker_interface import JobStateTrackerInterface
+from chronus.domain.job_state import JobState
+
+# A pending job array is listed once, as <array job id>_[<task ids>], e.g. 450_[2-5%1].
+ARRAY_TASK_RANGE = re.compile(r"(?P<job_id>\d+)_\[(?P<task_ids>[^\]]+)\]")
+# Polls in a row a job can be unknown to both squeue and sacct before it is no longer tracked.
+MAX_UNKNOWN_POLLS = 30
+
+
+class SlurmJobStateTracker(JobStateTrackerInterface):
+    """Polls the states of all tracked jobs with one squeue call, and one sacct call for the
+    jobs squeue has forgotten.
+
+    The states are cached for ``cache_seconds``, so the benchmarks sharing a tracker put one
+    query on slurmctld per interval however many jobs they wait for. Jobs in a terminal state are
+    not polled again, and jobs Slurm does not know for ``max_unknown_polls`` polls in a row are
+    no longer tracked.
+    """
+
+    def __init__(
+        self,
+        cache_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_unknown_polls: int = MAX_UNKNOWN_POLLS,
+    ):
+        self.cache_seconds = cache_seconds
+        self.max_unknown_polls = max_unknown_polls
+        self._clock = clock
+        self._states: dict[str, JobState] = {}
+        self._tracked: set[str] = set()
+        self._unknown_polls: dict[str, int] = {}
+        self._polled_at: float = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def track(self, *job_ids: str) -> None:
+        with self._lock:
+            self._tracked.update(str(job_id) for job_id in job_ids)
+
+    def states(self, job_ids: list[str]) -> dict[str, JobState]:
+        job_ids = [str(job_id) for job_id in job_ids]
+        with self._lock:
+            new = any(job_id not in self._tracked for job_id in job_ids)
+            self._tracked.update(job_ids)
+            if new or self._is_stale():
+                self._poll()
+            return {job_id: self._states.get(job_id, JobState.UNKNOWN) for job_id in job_ids}
+
+    def _is_stale(self) -> bool:
+        return self._polled_at is None or self._clock() - self._polled_at >= self.cache_seconds
+
+    def _poll(self) -> None:
+        active = sorted(
+            job_id
+            for job_id in self._tracked
+            if not self._states.get(job_id, JobState.UNKNOWN).is_terminal
+        )
+        if active:
+            states = self._squeue(active)
+            forgotten = [job_id for job_id in active if job_id not in states]
+            if forgotten:
+                states.update(self._sacct(forgotten))
+            for job_id in active:
+                self._update(job_id, states.get(job_id, JobState.UNKNOWN))
+        self._polled_at = self._clock()
+
+    def _update(self, job_id: str, state: JobState) -> None:
+        if state is not JobState.UNKNOWN:
+            self._unknown_polls.pop(job_id, None)
+            self._states[job_id] = state
+            return
+        self._unknown_polls[job_id] = self._unknown_polls.get(job_id, 0) + 1
+        if self._unknown_polls[job_id] < self.max_unknown_polls:
+            self._states[job_id] = state
+            return
+        self.logger.warning(
+            f"Slurm did not know job {job_id} for {self._unknown_polls[job_id]} polls, "
+            f"no longer polling it"
+        )
+        self._tracked.discard(job_id)
+        self._states.pop(job_id, None)
+        del self._unknown_polls[job_id]
+
+    def _squeue(self, job_ids: list[str]) -> dict[str, JobState]:
+        cmd = subprocess.run(
+            [
+                "squeue",
+                "--noheader",
+                "--states=all",
+                "--format=%i|%T",
+                "--jobs=" + ",".join(job_ids),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if cmd.returncode != 0:
+            # squeue refuses the whole query when one of the jobs is no longer in the queue.
+            self.logger.debug(f"squeue failed, asking sacct: {cmd.stderr}")
+            return {}
+        return parse_job_states(cmd.stdout)
+
+    def _sacct(self, job_ids: list[str]) -> dict[str, JobState]:
+        cmd = subprocess.run(
+            [
+                "sacct",
+                "--noheader",
+                "--parsable2",
+                "--allocations",
+                "--format=JobID,State",
+                "--jobs=" + ",".join(job_ids),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if cmd.returncode != 0:
+            self.logger.warning(f"sacct failed: {cmd.stderr}")
+            return {}
+        return parse_job_states(cmd.stdout)
+
+
+def parse_job_states(output: str) -> dict[str, JobState]:
+    """The states in lines of <job id>|<state>, with the ranges of pending array tasks expanded."""
+    states = {}
+    for line in output.splitlines():
+        job_id, separator, state = line.strip().partition("|")
+        # Job steps such as 449.batch are part of their job.
+        if not separator or "." in job_id:
+            continue
+        array_tasks = ARRAY_TASK_RANGE.fullmatch(job_id)
+        if array_tasks is None:
+            states[job_id] = JobState.parse(state)
+            continue
+        for task in expand_task_ids(array_tasks.group("task_ids")):
+            states[f"{array_tasks.group('job_id')}_{task}"] = JobState.parse(state)
+    return states
+
+
+def expand_task_ids(task_ids: str) -> list[int]:
+    """The array task ids in a Slurm range such as 0-3,8,10-20:2%1."""
+    tasks = []
+    for part in task_ids.split("%")[0].split(","):
+        first, _, last = part.partition("-")
+        last, _, step = last.partition(":")
+        tasks.extend(range(int(first), int(last or first) + 1, int(step or 1)))
+    return tasks
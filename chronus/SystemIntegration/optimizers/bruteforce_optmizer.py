@@ -1,16 +1,26 @@
+from typing import TYPE_CHECKING
+
 import dataclasses
 import json
 import logging
 
 from chronus.domain.configuration import Configuration
-from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
-from chronus.domain.Run import Run
+from chronus.domain.job import JobRequest
+
+if TYPE_CHECKING:
+    from chronus.domain.cpu_info import SystemInfo
+    from chronus.domain.Run import Run
+    from chronus.domain.search_space import SearchSpace
 
 
 class BruteForceOptimizer(OptimizerInterface):
+    """Predicts the best measured GFLOPS/W of every benchmarked configuration, and nothing of the
+    configurations that were not benchmarked."""
+
     def __init__(self):
         self.__logger = logging.getLogger(__name__)
+        self.__efficiencies: dict[tuple, float] = {}
 
     @staticmethod
     def name() -> str:
@@ -18,12 +28,15 @@ class BruteForceOptimizer(OptimizerInterface):
 
     __best_run: Configuration = None
 
-    def make_model(self, runs: list[Run]) -> None:
+    def make_model(self, runs: list["Run"], system_info: "SystemInfo" = None) -> None:
         self.__best_run = Configuration()
+        self.__efficiencies = {}
         best_efficiency = 0.0
 
         for run in runs:
             efficiency = energy_efficiency(run)
+            key = Configuration(run.cores, run.frequency, run.threads_per_core).key()
+            self.__efficiencies[key] = max(efficiency, self.__efficiencies.get(key, efficiency))
             if efficiency > best_efficiency:
                 best_efficiency = efficiency
                 self.__best_run.cores = run.cores
@@ -34,19 +47,61 @@ class BruteForceOptimizer(OptimizerInterface):
         # save to a file in the path
         with open(path_without_file_extension + ".json", "w") as file:
             self.__logger.info(f"Saving model to {path_without_file_extension}.json")
-            file.write(json.dumps(dataclasses.asdict(self.__best_run)))
+            model = {
+                "best": dataclasses.asdict(self.__best_run),
+                "measured": [
+                    {
+                        "cores": cores,
+                        "threads_per_core": threads_per_core,
+                        "frequency": frequency,
+                        "gflops_per_watt": efficiency,
+                    }
+                    for (cores, threads_per_core, frequency), efficiency in (
+                        self.__efficiencies.items()
+                    )
+                ],
+            }
+            file.write(json.dumps(model))
 
     def load(self, path: str, path_to_save_locally) -> None:
-        with open(path + ".json") as file:
-            run = json.loads(file.read())
-        self.__best_run = Configuration(**run)
+        self.__read(path)
         self.save(path_to_save_locally)
 
     def run(self, path_local_model: str) -> Configuration:
-        with open(path_local_model + ".json") as file:
-            run = json.loads(file.read())
-        return Configuration(**run)
+        self.__read(path_local_model)
+        return self.__best_run
+
+    def predict(self, configurations: list[Configuration]) -> list[float]:
+        return [self.__efficiencies.get(conf.key(), 0.0) for conf in configurations]
+
+    def best_configurations(
+        self, search_space: "SearchSpace", jobs: list[JobRequest]
+    ) -> list[Configuration]:
+        """The best run for every job when no measured configuration is in the search space, e.g.
+        when they were benchmarked at frequencies the system does not list, as every prediction
+        would tie."""
+        if not any(conf.key() in self.__efficiencies for conf in search_space):
+            self.__logger.warning(
+                f"No measured configuration is in the search space, every job gets the best run "
+                f"{self.__best_run}"
+            )
+            return [self.__best_run] * len(jobs)
+        return super().best_configurations(search_space, jobs)
+
+    def __read(self, path_without_file_extension: str) -> None:
+        with open(path_without_file_extension + ".json") as file:
+            model = json.loads(file.read())
+        if "best" not in model:
+            # Models saved before the measured configurations were kept only have the best run.
+            model = {"best": model, "measured": [{**model, "gflops_per_watt": 1.0}]}
+        self.__best_run = Configuration(**model["best"])
+        self.__efficiencies = {
+            Configuration(
+                measured["cores"], measured["frequency"], measured["threads_per_core"]
+            ).key(): measured["gflops_per_watt"]
+            for measured in model["measured"]
+        }
 
 
-def energy_efficiency(run: Run) -> float:
+def energy_efficiency(run: "Run") -> float:
     return run.gflops_per_watt
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import pickle
+import shutil
+from dataclasses import dataclass
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+
+MAGIC = b"chronus-model\n"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".model"
+# How many of the best configurations are kept in the artifact next to the estimator.
+RANKING_SIZE = 32
+
+
+class ModelArtifactError(Exception):
+    pass
+
+
+@dataclass
+class ModelArtifact:
+    """A trained estimator together with the ranking of the configurations it predicted best.
+
+    The file is a magic line, one line of JSON with the format version, the optimizer, the
+    ranking and the SHA-256 digest of the estimator, followed by the pickled estimator. The digest
+    addresses the estimator and is checked when it is unpickled. Reading the best configuration
+    only parses the header, so it needs neither the estimator nor the libraries it was made with.
+    """
+
+    optimizer: str
+    ranking: list[tuple[Configuration, float]]
+    estimator: object = None
+    digest: str = None
+    path: str = None
+
+    @property
+    def best_configuration(self) -> Configuration:
+        if not self.ranking:
+            raise ModelArtifactError("The model has no ranked configurations")
+        return self.ranking[0][0]
+
+    def save(self, path: str) -> str:
+        payload = pickle.dumps(self.estimator, protocol=pickle.HIGHEST_PROTOCOL)
+        self.digest = hashlib.sha256(payload).hexdigest()
+        header = {
+            "format_version": FORMAT_VERSION,
+            "optimizer": self.optimizer,
+            "digest": self.digest,
+            "ranking": [
+                {
+                    "cores": conf.cores,
+                    "frequency": conf.frequency,
+                    "threads_per_core": conf.threads_per_core,
+                    "predicted_gflops_per_watt": predicted,
+                }
+                for conf, predicted in self.ranking
+            ],
+        }
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(payload)
+        self.path = path
+        return self.digest
+
+    @classmethod
+    def load(cls, path: str, with_estimator: bool = True) -> "ModelArtifact":
+        with open(path, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ModelArtifactError(f"{path} is not a chronus model")
+            header = json.loads(f.readline())
+            if header["format_version"] != FORMAT_VERSION:
+                raise ModelArtifactError(
+                    f"{path} has model format {header['format_version']}, "
+                    f"this version of chronus reads format {FORMAT_VERSION}"
+                )
+            artifact = cls(
+                optimizer=header["optimizer"],
+                ranking=[
+                    (
+                        Configuration(
+                            cores=entry["cores"],
+                            frequency=entry["frequency"],
+                            threads_per_core=entry["threads_per_core"],
+                        ),
+                        entry["predicted_gflops_per_watt"],
+                    )
+                    for entry in header["ranking"]
+                ],
+                digest=header["digest"],
+                path=path,
+            )
+            if with_estimator:
+                artifact.estimator = _unpickle(f.read(), artifact.digest, path)
+        return artifact
+
+    def load_estimator(self) -> object:
+        if self.estimator is None:
+            with open(self.path, "rb") as f:
+                f.readline()
+                f.readline()
+                self.estimator = _unpickle(f.read(), self.digest, self.path)
+        return self.estimator
+
+
+def _unpickle(payload: bytes, digest: str, path: str) -> object:
+    if hashlib.sha256(payload).hexdigest() != digest:
+        raise ModelArtifactError(f"The estimator in {path} does not match its digest")
+    return pickle.loads(payload)
+
+
+class EstimatorOptimizer(OptimizerInterface):
+    """An optimizer that predicts GFLOPS/W with a scikit-learn estimator.
+
+    Subclasses train ``_estimator`` in ``make_model`` and rank the search space with
+    ``_rank``. Saving, loading and predicting are shared, and run on numpy arrays so a loaded
+    model answers without importing pandas.
+    """
+
+    _estimator = None
+    _artifact: ModelArtifact = None
+    _ranking: list[tuple[Configuration, float]] = None
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+
+    def _rank(self, search_space) -> list[tuple[Configuration, float]]:
+        self._ranking = search_space.rank(self.predict, k=RANKING_SIZE)
+        return self._ranking
+
+    def save(self, path_without_file_extension: str) -> None:
+        if self._estimator is None:
+            raise ModelArtifactError("There is no trained model to save")
+        artifact = ModelArtifact(self.name(), self._ranking or [], self._estimator)
+        digest = artifact.save(path_without_file_extension + FILE_EXTENSION)
+        self._logger.info(
+            f"Saved model {digest[:12]} to {path_without_file_extension}{FILE_EXTENSION}"
+        )
+
+    def load(self, path: str, path_to_save_locally) -> None:
+        self._use(ModelArtifact.load(path + FILE_EXTENSION))
+        shutil.copyfile(path + FILE_EXTENSION, path_to_save_locally + FILE_EXTENSION)
+
+    def run(self, path_local_model: str) -> Configuration:
+        if self._artifact is None or self._artifact.path != path_local_model + FILE_EXTENSION:
+            self._use(ModelArtifact.load(path_local_model + FILE_EXTENSION, with_estimator=False))
+        return self._artifact.best_configuration
+
+    def predict(self, configurations: list[Configuration]) -> list[float]:
+        import numpy as np
+
+        if self._estimator is None and self._artifact is not None:
+            self._estimator = self._artifact.load_estimator()
+        if self._estimator is None:
+            raise ModelArtifactError("There is no trained or loaded model to predict with")
+        candidates = np.array(
+            [[conf.cores, conf.threads_per_core, conf.frequency] for conf in configurations],
+            dtype=float,
+        )
+        return self._estimator.predict(candidates).tolist()
+
+    def _use(self, artifact: ModelArtifact) -> None:
+        if artifact.optimizer != self.name():
+            raise ModelArtifactError(
+                f"{artifact.path} is a {artifact.optimizer} model, not {self.name()}"
+            )
+        self._artifact = artifact
+        self._estimator = artifact.estimator
+        self._ranking = artifact.ranking
@@ -1,19 +1,25 @@
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import GridSearchCV
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+from typing import TYPE_CHECKING
 
-from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+from chronus.SystemIntegration.optimizers.estimator_optimizer import EstimatorOptimizer
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-class LinearRegressionOptimizer(OptimizerInterface):
+# pandas and sklearn are only imported to train, a saved model is loaded and used without them.
+FEATURES = ["cores", "threads_per_core", "frequency"]
+
+
+class LinearRegressionOptimizer(EstimatorOptimizer):
     @staticmethod
     def name() -> str:
         return "linear-regression"
 
-    def make_model(self, runs: list[Run]):
+    def make_model(self, runs: list[Run], system_info: SystemInfo = None):
+        import pandas as pd
+
         df = runs_to_dataframe(runs)
 
         # Convert the columns to appropriate data types
@@ -23,12 +29,13 @@ class LinearRegressionOptimizer(OptimizerInterface):
         print(df)
 
         # Preprocess the data
-        X = df.drop(columns=["gflops_per_watt"])  # Input features
-        y = df["gflops_per_watt"]  # Target variable
+        X = df[FEATURES].to_numpy(dtype=float)  # Input features
+        y = df["gflops_per_watt"].to_numpy(dtype=float)  # Target variable
 
         # Create and train the model
         model = create_model()
         model.fit(X, y)
+        self._estimator = model.best_estimator_
 
         # Find the best configuration
         best_config = model.best_estimator_
@@ -38,14 +45,19 @@ class LinearRegressionOptimizer(OptimizerInterface):
         best_hyperparameters = model.best_params_
         print("Best hyperparameters:", best_hyperparameters)
 
-        configurations = generate_configurations()
-        best_config, best_efficiency = find_best_configuration(model, configurations)
+        if system_info is None:
+            search_space = SearchSpace.from_runs(runs)
+        else:
+            search_space = SearchSpace.full_grid(system_info)
+        best_config, best_efficiency = self._rank(search_space)[0]
 
         print("Best configuration:", best_config)
         print("Best energy efficiency (gflops_per_watt):", best_efficiency)
 
 
-def runs_to_dataframe(runs: list[Run]) -> pd.DataFrame:
+def runs_to_dataframe(runs: list[Run]) -> "pd.DataFrame":
+    import pandas as pd
+
     data = []
     for run in runs:
         data.append(
@@ -59,15 +71,12 @@ def runs_to_dataframe(runs: list[Run]) -> pd.DataFrame:
     return pd.DataFrame(data)
 
 
-def preprocess_data(df):
-    # Extract the features and the target
-    X = df[["cores", "thread_per_core", "frequency"]]
-    y = df["gflops_per_watt"]
-
-    return X, y
-
-
 def create_model():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
     # Create a pipeline with polynomial features, standard scaler, and linear regression
     pipeline = Pipeline(
         [
@@ -86,35 +95,3 @@ def create_model():
     model = GridSearchCV(pipeline, param_grid, cv=5, scoring="neg_mean_squared_error")
 
     return model
-
-
-def generate_configurations():
-    # Define the range of cores, threads_per_core, and frequencies you want to test
-    cores_range = range(1, 33)
-    threads_per_core_range = range(1, 3)
-    frequencies_range = [1500000.0, 2200000.0, 2500000.0]
-
-    # Generate all possible combinations of configurations
-    configurations = [
-        {"cores": cores, "threads_per_core": tpc, "frequency": freq}
-        for cores in cores_range
-        for tpc in threads_per_core_range
-        for freq in frequencies_range
-    ]
-
-    return configurations
-
-
-def find_best_configuration(model, configurations):
-    best_config = None
-    best_efficiency = -1
-
-    for config in configurations:
-        X_test = pd.DataFrame([config])  # Convert the configuration into a DataFrame
-        predicted_efficiency = model.predict(X_test)[0]  # Predict the energy efficiency
-
-        if predicted_efficiency > best_efficiency:
-            best_config = config
-            best_efficiency = predicted_efficiency
-
-    return best_config, best_efficiency
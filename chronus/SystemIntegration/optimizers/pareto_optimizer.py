@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING
+
+import json
+import logging
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+from chronus.domain.job import JobRequest, fits
+from chronus.domain.pareto import ParetoFront, ParetoPoint, points_from_runs
+
+if TYPE_CHECKING:
+    from chronus.domain.cpu_info import SystemInfo
+    from chronus.domain.Run import Run
+    from chronus.domain.search_space import SearchSpace
+
+
+class ParetoOptimizer(OptimizerInterface):
+    """Trades energy for time with the Pareto front of the time and energy per GFLOP of the
+    benchmarked runs.
+
+    The front is computed by init-model and saved with the model. A job gets the configuration
+    using the least energy within its slowdown bound, or the fastest within its energy budget
+    in joules per GFLOP.
+    Jobs asking for more tasks than a configuration has threads choose from the front of the
+    configurations that fit, which is computed once per number of tasks.
+    """
+
+    def __init__(self):
+        self.__logger = logging.getLogger(__name__)
+        self.__points: list[ParetoPoint] = []
+        self.__fronts: dict[int, ParetoFront] = {}
+
+    @staticmethod
+    def name() -> str:
+        return "pareto-front"
+
+    def make_model(self, runs: list["Run"], system_info: "SystemInfo" = None) -> None:
+        self.__points = points_from_runs(runs)
+        self.__fronts = {0: ParetoFront.from_points(self.__points)}
+        self.__logger.info(
+            f"{len(self.__fronts[0])} of {len(self.__points)} configurations are on the front"
+        )
+
+    def save(self, path_without_file_extension: str) -> None:
+        with open(path_without_file_extension + ".json", "w") as file:
+            self.__logger.info(f"Saving model to {path_without_file_extension}.json")
+            file.write(
+                json.dumps(
+                    {
+                        "points": [point.to_dict() for point in self.__points],
+                        "front": [point.to_dict() for point in self.__fronts[0].points],
+                    }
+                )
+            )
+
+    def load(self, path: str, path_to_save_locally) -> None:
+        self.__read(path)
+        self.save(path_to_save_locally)
+
+    def run(self, path_local_model: str) -> Configuration:
+        self.__read(path_local_model)
+        point = self.__fronts[0].choose()
+        return point.configuration if point is not None else Configuration()
+
+    def predict(self, configurations: list[Configuration]) -> list[float]:
+        # GFLOP per joule is GFLOPS/W.
+        efficiencies = {
+            point.configuration.key(): 1 / point.joules_per_gflop
+            for point in self.__points
+            if point.joules_per_gflop > 0
+        }
+        return [efficiencies.get(conf.key(), 0.0) for conf in configurations]
+
+    def best_configurations(
+        self, search_space: "SearchSpace", jobs: list[JobRequest]
+    ) -> list[Configuration]:
+        """The configuration on the front for each job, the runs define the space searched."""
+        configurations = []
+        for job in jobs:
+            point = self.front(job.tasks_per_node).choose(job.max_slowdown, job.energy_budget)
+            if point is None:
+                point = max(
+                    self.__points,
+                    key=lambda p: p.configuration.cores * p.configuration.threads_per_core,
+                    default=None,
+                )
+            configurations.append(point.configuration if point is not None else Configuration())
+        return configurations
+
+    def front(self, tasks_per_node: int = 0) -> ParetoFront:
+        if tasks_per_node not in self.__fronts:
+            job = JobRequest(ntasks=tasks_per_node)
+            self.__fronts[tasks_per_node] = ParetoFront.from_points(
+                [point for point in self.__points if fits(point.configuration, job)]
+            )
+        return self.__fronts[tasks_per_node]
+
+    def __read(self, path_without_file_extension: str) -> None:
+        with open(path_without_file_extension + ".json") as file:
+            model = json.loads(file.read())
+        if any("seconds_per_gflop" not in point for point in model["points"]):
+            raise ValueError(
+                f"{path_without_file_extension}.json measures whole runs instead of a GFLOP of "
+                f"work, make the model again with init-model"
+            )
+        self.__points = [ParetoPoint.from_dict(point) for point in model["points"]]
+        self.__fronts = {0: ParetoFront([ParetoPoint.from_dict(point) for point in model["front"]])}
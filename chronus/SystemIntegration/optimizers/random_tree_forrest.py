@@ -1,17 +1,57 @@
-from sklearn.model_selection import GridSearchCV
-
-from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+from chronus.SystemIntegration.optimizers.estimator_optimizer import EstimatorOptimizer
+
+# "auto" meant all features for a regressor, sklearn 1.3 removed it in favour of 1.0.
+PARAM_GRID = {
+    "n_estimators": [10, 50, 100, 200],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": [1.0, "sqrt"],
+    "bootstrap": [True, False],
+}
+CV_FOLDS = 5
+SEARCHES = ("halving", "random", "grid")
+# The number of hyperparameter settings tried when no budget is given.
+DEFAULT_BUDGET = 64
+# Successive halving grows the forests of the settings that are left, instead of refitting
+# every setting with all trees.
+MIN_ESTIMATORS = 10
+HALVING_FACTOR = 3
+
+
+class RandomTreeOptimizer(EstimatorOptimizer):
+    """A random forest, with its hyperparameters chosen by cross validation.
+
+    The search is one of:
+
+    - ``halving``: successive halving over ``budget`` random settings, where every round keeps
+      the best third of the settings and fits them with three times as many trees.
+    - ``random``: ``budget`` random settings, each fitted with its own number of trees.
+    - ``grid``: every setting of ``PARAM_GRID``, 576 settings and 2,880 fits, the budget is not
+      used.
+    """
+
+    def __init__(self, search: str = "halving", budget: int = None):
+        super().__init__()
+        if search not in SEARCHES:
+            raise ValueError(f"Unknown search '{search}', choose one of {', '.join(SEARCHES)}")
+        if budget is not None and budget < 1:
+            raise ValueError("The budget must be at least one hyperparameter setting")
+        self.search = search
+        self.budget = budget
 
-
-class RandomTreeOptimizer(OptimizerInterface):
     @staticmethod
     def name() -> str:
         return "random-tree"
 
-    def make_model(self, runs: list[Run]):
+    def hyperparameters(self) -> dict:
+        return {"param_grid": PARAM_GRID, "search": self.search, "budget": self.budget}
+
+    def make_model(self, runs: list[Run], system_info: SystemInfo = None):
         import numpy as np
-        from sklearn.model_selection import train_test_split
 
         X = []
         y = []
@@ -23,55 +63,69 @@ class RandomTreeOptimizer(OptimizerInterface):
         X = np.array(X)
         y = np.array(y)
 
-        param_grid = {
-            "n_estimators": [10, 50, 100, 200],
-            "max_depth": [None, 10, 20, 30],
-            "min_samples_split": [2, 5, 10],
-            "min_samples_leaf": [1, 2, 4],
-            "max_features": ["auto", "sqrt"],
-            "bootstrap": [True, False],
-        }
-        from sklearn.ensemble import RandomForestRegressor
-
-        rf = RandomForestRegressor(random_state=42)
-        grid_search = GridSearchCV(estimator=rf, param_grid=param_grid, cv=5, n_jobs=-1, verbose=2)
-
-        grid_search.fit(X, y)
-        best_params = grid_search.best_params_
+        search = self._create_search()
+        search.fit(X, y)
 
         print("Best hyperparameters:")
-        print(best_params)
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        print(search.best_params_)
 
-        # random forrest regressor with these paremters {'bootstrap': False, 'max_depth': None, 'max_features': 'auto', 'min_samples_leaf': 1, 'min_samples_split': 2, 'n_estimators': 10}
-        model = RandomForestRegressor(**best_params, random_state=42)
-        model.fit(X, y)
+        # The search refits the best setting on all runs.
+        self._estimator = search.best_estimator_
 
-        from sklearn.metrics import mean_squared_error, r2_score
-
-        # Define the range of cores, threads_per_core, and frequencies you want to test
-        cores_range = range(1, 33)
-        threads_per_core_range = range(1, 3)
-        frequencies_range = [1500000.0, 2200000.0, 2500000.0]
-
-        # Generate all possible combinations of configurations
-        configurations = [
-            {"cores": cores, "threads_per_core": tpc, "frequency": freq}
-            for cores in cores_range
-            for tpc in threads_per_core_range
-            for freq in frequencies_range
-        ]
-
-        configurations_np = np.array([list(config.values()) for config in configurations])
-        predicted_efficiencies = model.predict(configurations_np)
-        best_config_index = np.argmax(predicted_efficiencies)
-
-        best_config = configurations[best_config_index]
-        best_efficiency_pred = predicted_efficiencies[best_config_index]
+        if system_info is None:
+            search_space = SearchSpace.from_runs(runs)
+        else:
+            search_space = SearchSpace.full_grid(system_info)
+        best_config, best_efficiency_pred = self._rank(search_space)[0]
 
         print("Best predicted configuration:")
-        print(f"Cores: {best_config['cores']}")
-        print(f"Threads per core: {best_config['threads_per_core']}")
-        print(f"Frequency: {best_config['frequency']} Hz")
+        print(f"Cores: {best_config.cores}")
+        print(f"Threads per core: {best_config.threads_per_core}")
+        print(f"Frequency: {best_config.frequency} Hz")
         print(f"Predicted energy efficiency: {best_efficiency_pred} GFLOPS/Watt")
+
+    def _create_search(self):
+        from sklearn.ensemble import RandomForestRegressor
+
+        rf = RandomForestRegressor(random_state=42)
+        budget = self.budget or DEFAULT_BUDGET
+
+        if self.search == "grid":
+            from sklearn.model_selection import GridSearchCV
+
+            return GridSearchCV(
+                estimator=rf, param_grid=PARAM_GRID, cv=CV_FOLDS, n_jobs=-1, verbose=1
+            )
+
+        if self.search == "random":
+            from sklearn.model_selection import RandomizedSearchCV
+
+            return RandomizedSearchCV(
+                estimator=rf,
+                param_distributions=PARAM_GRID,
+                n_iter=budget,
+                cv=CV_FOLDS,
+                n_jobs=-1,
+                verbose=1,
+                random_state=42,
+            )
+
+        # The halving searches are experimental in sklearn and have to be enabled to be imported.
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingRandomSearchCV
+
+        return HalvingRandomSearchCV(
+            estimator=rf,
+            param_distributions={
+                name: values for name, values in PARAM_GRID.items() if name != "n_estimators"
+            },
+            n_candidates=budget,
+            resource="n_estimators",
+            min_resources=MIN_ESTIMATORS,
+            max_resources=max(PARAM_GRID["n_estimators"]),
+            factor=HALVING_FACTOR,
+            cv=CV_FOLDS,
+            n_jobs=-1,
+            verbose=1,
+            random_state=42,
+        )
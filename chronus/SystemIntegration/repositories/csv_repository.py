@@ -1,7 +1,12 @@
+from typing import Iterator
+
 import logging
+from itertools import islice
 
+from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
 from chronus.domain.Run import Run
+from chronus.domain.system_sample import SystemSample
 
 CSV_HEADERS = "cpu,cores,thread_per_core,frequency,gflops,gflop,energy_used,gflops_per_watt,start_time,end_time\n"
 
@@ -10,35 +15,57 @@ class CsvRunRepository(RepositoryInterface):
     date_time_format = "%Y-%m-%d %H:%M:%S"
 
     def get_all_runs(self) -> list[Run]:
-        # make datetime parse 2023-04-27 16:00:36.435748
+        return list(self.iter_runs())
+
+    def iter_runs(
+        self, system_info: SystemInfo = None, batch_size: int = None, include_samples: bool = True
+    ) -> Iterator[Run]:
+        """Streams the runs in the file, reading ``batch_size`` lines at a time.
+
+        The file has no system column, so a system filter matches on the cpu name of the runs.
+        Samples are not stored in the file, so runs never have samples.
+        """
+        batch_size = batch_size or self.batch_size
         with open(self.path) as f:
-            rows = f.readlines()
-            runs = []
-            for row in rows[1:]:
-                run = Run()
-                (
-                    cpu,
-                    cores,
-                    thread_per_core,
-                    frequency,
-                    gflops,
-                    gflop,
-                    energy_used,
-                    gflops_per_watt,
-                    start_time,
-                    end_time,
-                ) = row.split(",")
-
-                run.cpu = cpu
-                run.cores = int(cores)
-                run.threads_per_core = int(thread_per_core)
-                run.frequency = float(frequency)
-                run.gflops = float(gflops)
-                run.flop = float(gflop) * 1.0e9
-                run.__energy_used_joules = float(energy_used)
-                run.__gflops_per_watt = float(gflops_per_watt)
-                runs.append(run)
-        return runs
+            f.readline()  # headers
+            while True:
+                rows = list(islice(f, batch_size))
+                if not rows:
+                    return
+                for row in rows:
+                    run = self.__create_run_from_row(row)
+                    if system_info is None or run.cpu == system_info.cpu_name:
+                        yield run
+
+    def iter_samples(
+        self, run_ids: list[int] = None, batch_size: int = None
+    ) -> Iterator[tuple[int, SystemSample]]:
+        return iter(())
+
+    def __create_run_from_row(self, row: str) -> Run:
+        # make datetime parse 2023-04-27 16:00:36.435748
+        run = Run()
+        (
+            cpu,
+            cores,
+            thread_per_core,
+            frequency,
+            gflops,
+            gflop,
+            energy_used,
+            gflops_per_watt,
+            start_time,
+            end_time,
+        ) = row.split(",")
+
+        run.cpu = cpu
+        run.cores = int(cores)
+        run.threads_per_core = int(thread_per_core)
+        run.frequency = float(frequency)
+        run.gflops = float(gflops)
+        run.flop = float(gflop) * 1.0e9
+        run.set_saved_totals(float(energy_used), float(gflops_per_watt))
+        return run
 
     def save_run(self, run: Run) -> None:
         with open(self.path, "a") as f:
@@ -48,9 +75,10 @@ class CsvRunRepository(RepositoryInterface):
             )
         self.logger.info(f"Run data has been saved to {self.path}.")
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, batch_size: int = 1000):
         self.logger = logging.getLogger(__name__)
         self.path = path
+        self.batch_size = batch_size
         if self._file_exists():
             self._backup_file()
         self._create_file()
@@ -1,16 +1,22 @@
+from typing import Iterator, Optional
+
 import json
 import logging
 import os
 import sqlite3
+import threading
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlannedConfiguration, PlanStatus
+from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
 from chronus.domain.model import Model
 from chronus.domain.Run import Run
-from chronus.domain.system_sample import SystemSample
+from chronus.domain.system_sample import SystemSample, SystemSamples
 
 CREATE_BENCHMARKS_TABLE_QUERY = """
 CREATE TABLE IF NOT EXISTS benchmarks (
@@ -65,9 +71,17 @@ CREATE TABLE IF NOT EXISTS models (
 INSERT_BENCHMARK_QUERY = """
 INSERT INTO benchmarks (
     system_info,
+    system_id,
     application,
     created_at
-) VALUES (?, ?, ?);
+) VALUES (?, ?, ?, ?);
+"""
+
+INSERT_SYSTEM_QUERY = """
+INSERT OR IGNORE INTO systems (
+    id,
+    system_info
+) VALUES (?, ?);
 """
 
 INSERT_RUN_QUERY = """
@@ -93,14 +107,81 @@ INSERT INTO system_samples (
     current_power_draw,
     cpu_power,
     cpu_temp,
-    cpu_freq
-) VALUES (?, ?, ?, ?, ?, ?);
+    cpu_freq,
+    energy
+) VALUES (?, ?, ?, ?, ?, ?, ?);
 """
 
 ADD_CPUFREQ_TO_SYSTEM_SAMPLE_MIGRATION_QUERY = """
 ALTER TABLE system_samples ADD COLUMN cpu_freq TEXT;
 """
 
+CREATE_SYSTEMS_TABLE_MIGRATION_QUERY = """
+CREATE TABLE IF NOT EXISTS systems (
+    id TEXT PRIMARY KEY,
+    system_info TEXT
+);
+"""
+
+ADD_SYSTEM_ID_TO_BENCHMARKS_MIGRATION_QUERY = """
+ALTER TABLE benchmarks ADD COLUMN system_id TEXT REFERENCES systems(id);
+"""
+
+FILL_SYSTEMS_TABLE_MIGRATION_QUERY = """
+INSERT OR IGNORE INTO systems (id, system_info)
+SELECT system_info_digest(system_info), system_info FROM benchmarks ORDER BY id;
+"""
+
+FILL_BENCHMARK_SYSTEM_ID_MIGRATION_QUERY = """
+UPDATE benchmarks SET system_id = system_info_digest(system_info) WHERE system_id IS NULL;
+"""
+
+CREATE_BENCHMARKS_SYSTEM_ID_INDEX_MIGRATION_QUERY = """
+CREATE INDEX IF NOT EXISTS benchmarks_system_id_idx ON benchmarks(system_id);
+"""
+
+CREATE_RUNS_BENCHMARK_ID_INDEX_MIGRATION_QUERY = """
+CREATE INDEX IF NOT EXISTS runs_benchmark_id_idx ON runs(benchmark_id);
+"""
+
+CREATE_SYSTEM_SAMPLES_RUN_ID_INDEX_MIGRATION_QUERY = """
+CREATE INDEX IF NOT EXISTS system_samples_run_id_timestamp_idx ON system_samples(run_id, timestamp);
+"""
+
+ADD_ENERGY_TO_SYSTEM_SAMPLE_MIGRATION_QUERY = """
+ALTER TABLE system_samples ADD COLUMN energy REAL;
+"""
+
+CREATE_BENCHMARK_PLANS_TABLE_MIGRATION_QUERY = """
+CREATE TABLE IF NOT EXISTS benchmark_plans (
+    benchmark_id INTEGER,
+    position INTEGER,
+    cores INTEGER,
+    thread_per_core INTEGER,
+    frequency REAL,
+    status TEXT,
+    PRIMARY KEY (benchmark_id, position),
+    FOREIGN KEY(benchmark_id) REFERENCES benchmarks(id)
+);
+"""
+
+# Schema migrations, applied in order. The database's ``user_version`` is the number of
+# migrations that have been applied to it.
+MIGRATIONS = [
+    [ADD_CPUFREQ_TO_SYSTEM_SAMPLE_MIGRATION_QUERY],
+    [
+        CREATE_SYSTEMS_TABLE_MIGRATION_QUERY,
+        ADD_SYSTEM_ID_TO_BENCHMARKS_MIGRATION_QUERY,
+        FILL_SYSTEMS_TABLE_MIGRATION_QUERY,
+        FILL_BENCHMARK_SYSTEM_ID_MIGRATION_QUERY,
+        CREATE_BENCHMARKS_SYSTEM_ID_INDEX_MIGRATION_QUERY,
+        CREATE_RUNS_BENCHMARK_ID_INDEX_MIGRATION_QUERY,
+        CREATE_SYSTEM_SAMPLES_RUN_ID_INDEX_MIGRATION_QUERY,
+    ],
+    [ADD_ENERGY_TO_SYSTEM_SAMPLE_MIGRATION_QUERY],
+    [CREATE_BENCHMARK_PLANS_TABLE_MIGRATION_QUERY],
+]
+
 INSERT_MODEL_QUERY = """
 INSERT INTO models (
     name,
@@ -111,18 +192,118 @@ INSERT INTO models (
 ) VALUES (?, ?, ?, ?, ?);
 """
 
-GET_ALL_BENCHMARKS_QUERY = "SELECT * FROM benchmarks;"
+INSERT_PLANNED_CONFIGURATION_QUERY = """
+INSERT INTO benchmark_plans (
+    benchmark_id,
+    position,
+    cores,
+    thread_per_core,
+    frequency,
+    status
+) VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+UPDATE_PLAN_STATUS_QUERY = (
+    "UPDATE benchmark_plans SET status = ? WHERE benchmark_id = ? AND position = ?;"
+)
+
+GET_LATEST_PLAN_QUERY = """
+SELECT benchmark_id, position, cores, thread_per_core, frequency, status
+FROM benchmark_plans
+WHERE benchmark_id = (
+    SELECT MAX(b.id) FROM benchmarks b
+    JOIN benchmark_plans p ON p.benchmark_id = b.id
+    WHERE b.system_id = ?
+)
+ORDER BY position;
+"""
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+
+GET_ALL_BENCHMARKS_QUERY = "SELECT id, system_info, application, created_at FROM benchmarks;"
 GET_BENCHMARK_RUNS_QUERY = "SELECT * FROM runs WHERE benchmark_id = ?;"
 GET_ALL_RUNS_QUERY = "SELECT * FROM runs;"
 GET_ALL_SYSTEM_SAMPLES_BY_RUN_ID_QUERY = "SELECT * FROM system_samples WHERE run_id = ?;"
 GET_ALL_SYSTEM_SAMPLES_QUERY = "SELECT * FROM system_samples;"
+GET_ALL_SYSTEM_SAMPLES_ORDERED_BY_RUN_QUERY = "SELECT * FROM system_samples ORDER BY run_id, id;"
+GET_BENCHMARK_SYSTEM_SAMPLES_QUERY = """
+SELECT s.* FROM system_samples s
+JOIN runs r ON r.id = s.run_id
+WHERE r.benchmark_id = ?
+ORDER BY s.run_id, s.id;
+"""
 GET_ALL_RUNS_QUERY_FILTER_SYSTEM = (
-    "SELECT r.* FROM runs r JOIN benchmarks b on b.id = r.benchmark_id WHERE b.system_info = ?;"
+    "SELECT r.* FROM runs r JOIN benchmarks b on b.id = r.benchmark_id WHERE b.system_id = ?;"
+)
+GET_ALL_SYSTEM_SAMPLES_QUERY_FILTER_SYSTEM = """
+SELECT s.* FROM system_samples s
+JOIN runs r ON r.id = s.run_id
+JOIN benchmarks b ON b.id = r.benchmark_id
+WHERE b.system_id = ?
+ORDER BY s.run_id, s.id;
+"""
+GET_ALL_SYSTEMS_QUERY = "SELECT system_info FROM systems ORDER BY rowid;"
+ITER_RUNS_QUERY = "SELECT * FROM runs ORDER BY id;"
+ITER_RUNS_QUERY_FILTER_SYSTEM = """
+SELECT r.* FROM runs r
+JOIN benchmarks b ON b.id = r.benchmark_id
+WHERE b.system_id = ?
+ORDER BY r.id;
+"""
+ITER_SYSTEM_SAMPLES_BY_RUN_IDS_QUERY = (
+    "SELECT * FROM system_samples WHERE run_id IN ({}) ORDER BY run_id, id;"
 )
-GET_ALL_SYSTEMS_QUERY = "SELECT DISTINCT system_info FROM benchmarks;"
+# Stays well below SQLITE_MAX_VARIABLE_NUMBER on every sqlite version.
+MAX_RUN_IDS_PER_QUERY = 500
 GET_ALL_MODELS_QUERY = "SELECT * FROM models;"
 GET_MODEL_BY_ID_QUERY = "SELECT * FROM models WHERE id = ?;"
 
+CREATE_RUN_ENERGY_TEMP_TABLE_QUERY = """
+CREATE TEMP TABLE IF NOT EXISTS run_energy (
+    run_id INTEGER PRIMARY KEY,
+    energy_used REAL NOT NULL
+);
+"""
+
+# sqlite keeps datetimes with millisecond precision, but julianday() returns them as a day based
+# double that is off by tens of microseconds, so differences are rounded back to milliseconds.
+SECONDS_BETWEEN_SQL = "ROUND((julianday({0}) - julianday({1})) * 86400.0, 3)"
+
+# Trapezoidal integration of the power draw between consecutive samples of each run, or the
+# difference of the energy counter readings when both samples have one, like SampleStatistics.
+INSERT_RUN_ENERGY_QUERY = f"""
+INSERT INTO temp.run_energy (run_id, energy_used)
+SELECT run_id, TOTAL(COALESCE(counted_energy, seconds * average_power))
+FROM (
+    SELECT
+        run_id,
+        {SECONDS_BETWEEN_SQL.format("timestamp", "LAG(timestamp) OVER samples")} AS seconds,
+        (current_power_draw + LAG(current_power_draw) OVER samples) / 2.0 AS average_power,
+        energy - LAG(energy) OVER samples AS counted_energy
+    FROM system_samples
+    WINDOW samples AS (PARTITION BY run_id ORDER BY id)
+)
+GROUP BY run_id;
+"""
+
+# Mirrors Run.gflops_per_watt: runs without samples are assumed to draw 1 W.
+UPDATE_RUNS_ENERGY_QUERY = f"""
+UPDATE runs SET
+    energy_used = COALESCE(
+        (SELECT energy_used FROM temp.run_energy WHERE run_id = runs.id), 0.0
+    ),
+    gflops_per_watt = CASE
+        WHEN id NOT IN (SELECT run_id FROM temp.run_energy) THEN gflops
+        ELSE gflops / (
+            (SELECT energy_used FROM temp.run_energy WHERE run_id = runs.id)
+            / {SECONDS_BETWEEN_SQL.format("end_time", "start_time")}
+        )
+    END;
+"""
+
+DROP_RUN_ENERGY_TEMP_TABLE_QUERY = "DROP TABLE IF EXISTS temp.run_energy;"
+
 GET_BEST_RUNS_QUERY = """
 SELECT
     runs.id,
@@ -139,6 +320,15 @@ LIMIT 15
 """
 
 
+def _already_migrated(error: sqlite3.OperationalError) -> bool:
+    message = str(error)
+    return "duplicate column" in message or "already exists" in message
+
+
+def _system_info_digest(system_info_json: str) -> str:
+    return SystemInfo.from_json(system_info_json).digest()
+
+
 @dataclass
 class RunEfficiency:
     run_id: int
@@ -152,19 +342,19 @@ class RunEfficiency:
 
 class SqliteRepository(RepositoryInterface):
     def get_model(self, model_id: int) -> Model:
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(GET_MODEL_BY_ID_QUERY, (model_id,))
             return self.__create_model_from_row(cursor.fetchone())
 
     def get_all_models(self) -> list[Model]:
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(GET_ALL_MODELS_QUERY)
             return [self.__create_model_from_row(row) for row in cursor.fetchall()]
 
     def save_model(self, model: Model) -> int:
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 INSERT_MODEL_QUERY,
@@ -182,10 +372,13 @@ class SqliteRepository(RepositoryInterface):
         return model_id
 
     def get_all_runs_from_system(self, system_info) -> list[Run]:
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.cursor()
-            rows = cursor.execute(GET_ALL_RUNS_QUERY_FILTER_SYSTEM, (system_info.to_json(),))
-            return [self.__create_run_from_row(row) for row in rows]
+        with self._connection() as conn:
+            return self.__load_runs(
+                conn,
+                GET_ALL_RUNS_QUERY_FILTER_SYSTEM,
+                GET_ALL_SYSTEM_SAMPLES_QUERY_FILTER_SYSTEM,
+                (system_info.digest(),),
+            )
 
     def __create_model_from_row(self, row) -> Model:
         (
@@ -206,35 +399,84 @@ class SqliteRepository(RepositoryInterface):
         )
 
     def save_benchmark(self, benchmark: Benchmark) -> int:
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
+            system_id = benchmark.system_info.digest()
+            cursor.execute(INSERT_SYSTEM_QUERY, (system_id, benchmark.system_info.to_json()))
             cursor.execute(
                 INSERT_BENCHMARK_QUERY,
                 (
                     benchmark.system_info.to_json(),
+                    system_id,
                     benchmark.application,
                     benchmark.created_at.isoformat(),
                 ),
             )
             benchmark_id = cursor.lastrowid
-            conn.commit()
 
             # Save runs associated with the benchmark
             for run in benchmark.runs:
-                self.save_run(run)
+                self.__insert_run(cursor, run)
 
         self.logger.info(f"Benchmark data has been saved to {self.path}.")
         return benchmark_id
 
+    def save_plan(self, plan: BenchmarkPlan) -> None:
+        with self._connection() as conn:
+            conn.executemany(
+                INSERT_PLANNED_CONFIGURATION_QUERY,
+                [
+                    (
+                        plan.benchmark_id,
+                        planned.position,
+                        planned.configuration.cores,
+                        planned.configuration.threads_per_core,
+                        planned.configuration.frequency,
+                        planned.status.value,
+                    )
+                    for planned in plan.configurations
+                ],
+            )
+
+    def set_plan_status(self, benchmark_id: int, position: int, status: PlanStatus) -> None:
+        with self._connection() as conn:
+            conn.execute(UPDATE_PLAN_STATUS_QUERY, (status.value, benchmark_id, position))
+
+    def get_latest_plan(self, system_info: SystemInfo) -> Optional[BenchmarkPlan]:
+        """The plan of the last benchmark of the system that has one."""
+        with self._connection() as conn:
+            rows = conn.execute(GET_LATEST_PLAN_QUERY, (system_info.digest(),)).fetchall()
+        if not rows:
+            return None
+        return BenchmarkPlan(
+            rows[0][0],
+            [
+                PlannedConfiguration(
+                    position,
+                    Configuration(
+                        cores=int(cores), frequency=frequency, threads_per_core=int(thread_per_core)
+                    ),
+                    PlanStatus(status),
+                )
+                for _, position, cores, thread_per_core, frequency, status in rows
+            ],
+        )
+
     def get_all_system_info(self) -> list[SystemInfo]:
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(GET_ALL_SYSTEMS_QUERY)
             return [SystemInfo.from_json(row[0]) for row in cursor.fetchall()]
 
     def get_all_benchmarks(self) -> list[Benchmark]:
         benchmarks = []
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
+            runs_by_benchmark = defaultdict(list)
+            for run in self.__load_runs(
+                conn, GET_ALL_RUNS_QUERY, GET_ALL_SYSTEM_SAMPLES_ORDERED_BY_RUN_QUERY
+            ):
+                runs_by_benchmark[run.benchmark_id].append(run)
+
             cursor = conn.cursor()
             for row in cursor.execute(GET_ALL_BENCHMARKS_QUERY):
                 benchmark_id, system_info, application, created_at = row
@@ -244,34 +486,148 @@ class SqliteRepository(RepositoryInterface):
                     id=benchmark_id,
                     created_at=datetime.fromisoformat(created_at),
                 )
-                benchmark.runs = self.get_all_runs(benchmark_id)
+                benchmark.runs = runs_by_benchmark[benchmark_id]
                 benchmarks.append(benchmark)
         return benchmarks
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = "NORMAL",
+        journal_mode: str = "WAL",
+        batch_size: int = 1000,
+    ):
         self.logger = logging.getLogger(__name__)
         self.path = path
+        self.batch_size = batch_size
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {SYNCHRONOUS_MODES}, got {synchronous}")
+        if journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode must be one of {JOURNAL_MODES}, got {journal_mode}")
+        self.synchronous = synchronous.upper()
+        self.journal_mode = journal_mode.upper()
+
+        # One long-lived connection per calling thread, so multithreaded callers each get their
+        # own connection while single threaded callers reuse one for the repository's lifetime.
+        self.__local = threading.local()
+        self.__connections: list[sqlite3.Connection] = []
+        self.__connections_lock = threading.Lock()
 
         self._create_table()
 
-    def get_all_runs(self, benchmark_id: int = None) -> list[Run]:
-        runs = []
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode};")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous};")
+            conn.create_function("system_info_digest", 1, _system_info_digest, deterministic=True)
+            self.__local.conn = conn
+            with self.__connections_lock:
+                self.__connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self.__connections_lock:
+            for conn in self.__connections:
+                conn.close()
+            self.__connections.clear()
+        self.__local = threading.local()
 
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.cursor()
+    def get_all_runs(self, benchmark_id: int = None) -> list[Run]:
+        with self._connection() as conn:
             if benchmark_id is None:
-                rows = cursor.execute(GET_ALL_RUNS_QUERY)
-            else:
-                rows = cursor.execute(GET_BENCHMARK_RUNS_QUERY, (benchmark_id,))
-            for row in rows:
-                run = self.__create_run_from_row(row)
-                runs.append(run)
-        return runs
-
-    def __create_run_from_row(self, row):
+                return self.__load_runs(
+                    conn, GET_ALL_RUNS_QUERY, GET_ALL_SYSTEM_SAMPLES_ORDERED_BY_RUN_QUERY
+                )
+            return self.__load_runs(
+                conn,
+                GET_BENCHMARK_RUNS_QUERY,
+                GET_BENCHMARK_SYSTEM_SAMPLES_QUERY,
+                (benchmark_id,),
+            )
+
+    def __load_runs(
+        self, conn: sqlite3.Connection, runs_query: str, samples_query: str, parameters=()
+    ) -> list[Run]:
+        """Loads runs and their samples with two queries over the same connection.
+
+        The samples query must select the samples of exactly the runs selected by the runs query,
+        ordered by run id, so they can be grouped in memory instead of queried per run.
+        """
+        run_rows = conn.execute(runs_query, parameters).fetchall()
+
+        samples_by_run = defaultdict(list)
+        for row in conn.execute(samples_query, parameters):
+            samples_by_run[row[1]].append(self.__create_system_sample_from_row(row))
+
+        return [self.__create_run_from_row(row, samples_by_run[row[0]]) for row in run_rows]
+
+    def iter_runs(
+        self, system_info: SystemInfo = None, batch_size: int = None, include_samples: bool = True
+    ) -> Iterator[Run]:
+        """Streams runs, optionally of one system, in id order.
+
+        Runs and samples are read from two cursors with ``fetchmany`` and merged on the run id,
+        so only one batch of rows and the samples of a single run are held in memory at a time.
+        """
+        if system_info is None:
+            runs_query = ITER_RUNS_QUERY
+            samples_query = GET_ALL_SYSTEM_SAMPLES_ORDERED_BY_RUN_QUERY
+            parameters = ()
+        else:
+            runs_query = ITER_RUNS_QUERY_FILTER_SYSTEM
+            samples_query = GET_ALL_SYSTEM_SAMPLES_QUERY_FILTER_SYSTEM
+            parameters = (system_info.digest(),)
+
+        conn = self._connection()
+        run_rows = self.__fetch_in_batches(conn.execute(runs_query, parameters), batch_size)
+        if not include_samples:
+            for row in run_rows:
+                yield self.__create_run_from_row(row, [])
+            return
+
+        sample_rows = self.__fetch_in_batches(conn.execute(samples_query, parameters), batch_size)
+        sample_row = next(sample_rows, None)
+        for row in run_rows:
+            run_id = row[0]
+            samples = []
+            while sample_row is not None and (sample_row[1] is None or sample_row[1] <= run_id):
+                if sample_row[1] == run_id:
+                    samples.append(self.__create_system_sample_from_row(sample_row))
+                sample_row = next(sample_rows, None)
+            yield self.__create_run_from_row(row, samples)
+
+    def iter_samples(
+        self, run_ids: list[int] = None, batch_size: int = None
+    ) -> Iterator[tuple[int, SystemSample]]:
+        """Streams ``(run_id, sample)`` pairs, optionally of some runs, ordered by run id."""
+        conn = self._connection()
+        if run_ids is None:
+            cursor = conn.execute(GET_ALL_SYSTEM_SAMPLES_ORDERED_BY_RUN_QUERY)
+            for row in self.__fetch_in_batches(cursor, batch_size):
+                yield row[1], self.__create_system_sample_from_row(row)
+            return
+
+        run_ids = sorted(set(run_ids))
+        for start in range(0, len(run_ids), MAX_RUN_IDS_PER_QUERY):
+            chunk = run_ids[start : start + MAX_RUN_IDS_PER_QUERY]
+            query = ITER_SYSTEM_SAMPLES_BY_RUN_IDS_QUERY.format(", ".join("?" * len(chunk)))
+            for row in self.__fetch_in_batches(conn.execute(query, chunk), batch_size):
+                yield row[1], self.__create_system_sample_from_row(row)
+
+    def __fetch_in_batches(self, cursor: sqlite3.Cursor, batch_size: int = None) -> Iterator[tuple]:
+        batch_size = batch_size or self.batch_size
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def __create_run_from_row(self, row, samples: list[SystemSample]):
         (
             run_id,
-            _,
+            benchmark_id,
             cpu,
             cores,
             thread_per_core,
@@ -285,15 +641,15 @@ class SqliteRepository(RepositoryInterface):
         ) = row
         run = Run()
         run.id = run_id
+        run.benchmark_id = benchmark_id
         run.cpu = cpu
         run.cores = int(cores)
         run.threads_per_core = int(thread_per_core)
         run.frequency = float(frequency)
         run.gflops = float(gflops)
         run.flop = float(flop)
-        run.__energy_used_joules = float(energy_used)
-        run.__gflops_per_watt = float(gflops_per_watt)
-        run.samples = self.get_system_samples(run_id=run_id)
+        run.set_saved_totals(float(energy_used), float(gflops_per_watt))
+        run.samples = SystemSamples(samples)
         run.start_time = datetime.fromisoformat(start_time)
         run.end_time = datetime.fromisoformat(end_time) if end_time else None
         return run
@@ -301,69 +657,72 @@ class SqliteRepository(RepositoryInterface):
     def save_run(self, run: Run) -> None:
         if run.benchmark_id is None:
             raise ValueError("The run must be associated with a benchmark.")
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                INSERT_RUN_QUERY,
-                (
-                    run.benchmark_id,
-                    run.cpu,
-                    run.cores,
-                    run.threads_per_core,
-                    run.frequency,
-                    run.gflops,
-                    run.flop,
-                    run.energy_used_joules,
-                    run.gflops_per_watt,
-                    run.start_time,
-                    run.end_time,
-                ),
-            )
-            run_id = cursor.lastrowid
-
-            # Save system samples associated with the run
-            conn.commit()
-            for sample in run.samples:
-                self.save_system_sample(run_id, sample)
+        with self._connection() as conn:
+            self.__insert_run(conn.cursor(), run)
         self.logger.info(f"Run data has been saved to {self.path}.")
 
-    def save_system_sample(self, run_id, sample):
-        conn = sqlite3.connect(self.path)
-        cursor = conn.cursor()
+    def __insert_run(self, cursor: sqlite3.Cursor, run: Run) -> int:
         cursor.execute(
-            INSERT_SYSTEM_SAMPLE_QUERY,
+            INSERT_RUN_QUERY,
             (
-                run_id,
-                sample.timestamp,
-                sample.current_power_draw,
-                sample.cpu_power,
-                sample.cpu_temp,
-                json.dumps(sample.cpu_freq),
+                run.benchmark_id,
+                run.cpu,
+                run.cores,
+                run.threads_per_core,
+                run.frequency,
+                run.gflops,
+                run.flop,
+                run.energy_used_joules,
+                run.gflops_per_watt,
+                run.start_time,
+                run.end_time,
             ),
         )
-        conn.commit()
-        conn.close()
+        run_id = cursor.lastrowid
+
+        # Save system samples associated with the run
+        cursor.executemany(
+            INSERT_SYSTEM_SAMPLE_QUERY,
+            [self.__system_sample_to_row(run_id, sample) for sample in run.samples],
+        )
+        return run_id
+
+    def save_system_sample(self, run_id, sample):
+        with self._connection() as conn:
+            conn.execute(INSERT_SYSTEM_SAMPLE_QUERY, self.__system_sample_to_row(run_id, sample))
+
+    @staticmethod
+    def __system_sample_to_row(run_id: int, sample: SystemSample) -> tuple:
+        return (
+            run_id,
+            sample.timestamp,
+            sample.current_power_draw,
+            sample.cpu_power,
+            sample.cpu_temp,
+            json.dumps(sample.cpu_freq),
+            sample.energy,
+        )
 
     def _create_table(self) -> None:
         if not self.__check_db_exists():
             self.logger.debug(f"Database already exists at {self.path}.")
             if not self.__ask_to_create_one():
                 raise Exception("Database does not exist, and user chose not to create one.")
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(CREATE_BENCHMARKS_TABLE_QUERY)
             cursor.execute(CREATE_RUNS_TABLE_QUERY)
             cursor.execute(CREATE_SYSTEM_SAMPLES_TABLE_QUERY)
             cursor.execute(CREATE_MODEL_TABLE_QUERY)
 
-        self.__run_migration(ADD_CPUFREQ_TO_SYSTEM_SAMPLE_MIGRATION_QUERY)
+        self.__run_migrations()
         self.logger.debug(
             f"Tables 'benchmarks', 'runs', and 'system_samples' have been created in {self.path}."
         )
 
     def get_system_samples(self, run_id: int) -> list[SystemSample]:
         samples = []
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             for row in cursor.execute(GET_ALL_SYSTEM_SAMPLES_BY_RUN_ID_QUERY, (run_id,)):
                 sample = self.__create_system_sample_from_row(row)
@@ -372,7 +731,7 @@ class SqliteRepository(RepositoryInterface):
 
     def get_all_system_samples(self) -> list[SystemSample]:
         samples = []
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             for row in cursor.execute(GET_ALL_SYSTEM_SAMPLES_QUERY):
                 sample = self.__create_system_sample_from_row(row)
@@ -380,13 +739,14 @@ class SqliteRepository(RepositoryInterface):
         return samples
 
     def __create_system_sample_from_row(self, row) -> SystemSample:
-        _, _, timestamp, current_power_draw, cpu_power, cpu_temp, cpu_freq = row
+        _, _, timestamp, current_power_draw, cpu_power, cpu_temp, cpu_freq, energy = row
         sample = SystemSample(
             timestamp=datetime.fromisoformat(timestamp),
             current_power_draw=current_power_draw,
             cpu_power=cpu_power,
             cpu_temp=cpu_temp,
             cpu_freq=json.loads(cpu_freq),
+            energy=energy,
         )
 
         return sample
@@ -398,20 +758,17 @@ class SqliteRepository(RepositoryInterface):
         return input(f"Create database at {self.path}? (y/n): ").lower() == "y"
 
     def fix_gflops_per_watt(self):
-        runs = self.get_all_runs()
-        with sqlite3.connect(self.path) as conn:
-            for run in runs:
-                glfops_per_watt = run.gflops_per_watt
-                SQL_UPDATE = (
-                    f"UPDATE runs SET gflops_per_watt = {glfops_per_watt} WHERE id = {run.id}"
-                )
-                cursor = conn.cursor()
-                cursor.execute(SQL_UPDATE)
-                conn.commit()
+        """Recomputes the energy and GFLOPS/W of every run from its samples inside sqlite."""
+        with self._connection() as conn:
+            conn.execute(DROP_RUN_ENERGY_TEMP_TABLE_QUERY)
+            conn.execute(CREATE_RUN_ENERGY_TEMP_TABLE_QUERY)
+            conn.execute(INSERT_RUN_ENERGY_QUERY)
+            conn.execute(UPDATE_RUNS_ENERGY_QUERY)
+            conn.execute(DROP_RUN_ENERGY_TEMP_TABLE_QUERY)
         self.logger.info(f"gflops_per_watt has been fixed.")
 
     def fix_system_samples(self):
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             system_samples = conn.execute("SELECT id, cpu_freq FROM system_samples")
@@ -426,7 +783,7 @@ class SqliteRepository(RepositoryInterface):
 
     def get_best_runs(self) -> list[RunEfficiency]:
         runs_with_efficiency = []
-        with sqlite3.connect(self.path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             for row in cursor.execute(GET_BEST_RUNS_QUERY):
                 run_id, cores, threads_per_core, frequency, start_time, end_time, efficiency = row
@@ -443,12 +800,28 @@ class SqliteRepository(RepositoryInterface):
                 )
         return runs_with_efficiency
 
+    def __run_migrations(self):
+        with self._connection() as conn:
+            version = conn.execute("PRAGMA user_version;").fetchone()[0]
+        for target_version, queries in enumerate(MIGRATIONS, start=1):
+            if version >= target_version:
+                continue
+            self.logger.debug(f"Migrating database to schema version {target_version}")
+            # A step that fails raises before the version is set, so it is retried next time.
+            for query in queries:
+                self.__run_migration(query)
+            with self._connection() as conn:
+                conn.execute(f"PRAGMA user_version = {target_version};")
+
     def __run_migration(self, SQL_QUERY: str):
+        """Runs a step of a migration, a step that was already run by a version that did not
+        count the migrations is skipped."""
         try:
-            with sqlite3.connect(self.path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(SQL_QUERY)
                 conn.commit()
         except sqlite3.OperationalError as e:
-            self.logger.debug(f"Mirgration already run: {e}")
-            return False
+            if not _already_migrated(e):
+                raise
+            self.logger.debug(f"Migration already run: {e}")
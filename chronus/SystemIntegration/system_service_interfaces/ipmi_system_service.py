@@ -2,6 +2,7 @@ import datetime
 from dataclasses import dataclass
 
 import psutil
+import pyghmi.exceptions as ipmi_exceptions
 import pyghmi.ipmi.command as ipmi
 from dataclasses_json import dataclass_json
 from pyghmi.ipmi.sdr import SensorReading
@@ -23,21 +24,67 @@ class SensorData:
     health: int
 
 
+# The SystemSample field each IPMI sensor is read into.
+DEFAULT_SENSORS = {
+    "current_power_draw": "Total_Power",
+    "cpu_temp": "CPU_Temp",
+    "cpu_power": "CPU_Power",
+}
+
+GET_SENSOR_READING_NETFN = 0x04
+GET_SENSOR_READING_COMMAND = 0x2D
+
+
 def _get_cpu_freq() -> [CpuFreq]:
     return psutil.cpu_freq(percpu=True)
 
 
 class IpmiSystemService(SystemServiceInterface):
+    """Samples power and temperature from the BMC over IPMI.
+
+    With ``cache_sdr`` the sensor data repository is resolved once when the service is created and
+    the records of the wanted sensors are kept, so a sample is one Get Sensor Reading request per
+    sensor in ``sensors`` and nothing else. IPMI has no request that reads several sensors at
+    once, so reading fewer sensors is what makes a sample cheaper.
+
+    Without ``bmc`` the BMC of this node is read through the local interface. With the address
+    of another node's BMC it is read over the network, and the samples have no cpu frequencies
+    since those are only known on the node itself.
+    """
+
     _conn: ipmi.Command
 
-    def __init__(self):
-        self._conn = ipmi.Command()
+    def __init__(
+        self,
+        sensors: dict[str, str] = None,
+        cache_sdr: bool = False,
+        bmc: str = None,
+        userid: str = None,
+        password: str = None,
+    ):
+        if bmc is None:
+            self._conn = ipmi.Command()
+        else:
+            self._conn = ipmi.Command(bmc=bmc, userid=userid, password=password)
+        self._is_local = bmc is None
+        self._sensors = DEFAULT_SENSORS if sensors is None else sensors
+        unknown_fields = set(self._sensors) - set(DEFAULT_SENSORS)
+        if unknown_fields:
+            raise ValueError(f"Sensors can only be read into {list(DEFAULT_SENSORS)}")
+        self._sensor_records = self._resolve_sensor_records() if cache_sdr else None
 
     def sample(self) -> SystemSample:
+        if self._sensor_records is not None:
+            return SystemSample(
+                datetime.datetime.now(),
+                **{field: self._read_sensor(name) for field, name in self._sensors.items()},
+                cpu_freq=self._get_cpu_freq(),
+            )
+
         current_power_draw = self._get_system_power_draw()
         cpu_temp = self._get_cpu_temp()
         cpu_power = self._get_cpu_power()
-        cpu_freq = _get_cpu_freq()
+        cpu_freq = self._get_cpu_freq()
 
         return SystemSample(
             datetime.datetime.now(),
@@ -47,6 +94,9 @@ class IpmiSystemService(SystemServiceInterface):
             cpu_freq=cpu_freq,
         )
 
+    def _get_cpu_freq(self) -> [CpuFreq]:
+        return _get_cpu_freq() if self._is_local else None
+
     def _get_system_power_draw(self) -> float:
         # Create an IPMI connection
 
@@ -66,3 +116,29 @@ class IpmiSystemService(SystemServiceInterface):
         cpu_power_raw: SensorReading = self._conn.get_sensor_reading("CPU_Power")
 
         return cpu_power_raw.value
+
+    def _resolve_sensor_records(self) -> dict:
+        sdr = self._conn.init_sdr()
+        wanted = set(self._sensors.values())
+        records = {}
+        for number in sdr.get_sensor_numbers():
+            record = sdr.sensors[number]
+            if record.name in wanted:
+                records[record.name] = record
+        return records
+
+    def _read_sensor(self, name: str) -> float:
+        record = self._sensor_records.get(name)
+        if record is None:
+            # Not in the SDR, e.g. an OEM sensor, so let pyghmi look it up.
+            return self._conn.get_sensor_reading(name).value
+
+        response = self._conn.raw_command(
+            netfn=GET_SENSOR_READING_NETFN,
+            command=GET_SENSOR_READING_COMMAND,
+            rslun=record.sensor_lun,
+            data=(record.sensor_number,),
+        )
+        if "error" in response:
+            raise ipmi_exceptions.IpmiException(response["error"], response["code"])
+        return record.decode_sensor_reading(self._conn, response["data"]).value
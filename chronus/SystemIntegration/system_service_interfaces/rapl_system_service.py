@@ -0,0 +1,94 @@
+import datetime
+import glob
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import psutil
+
+from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.system_sample import CpuFreq, SystemSample
+
+POWERCAP_ROOT = "/sys/class/powercap"
+DEFAULT_DOMAINS = ("package", "dram")
+
+
+def _get_cpu_freq() -> [CpuFreq]:
+    return psutil.cpu_freq(percpu=True)
+
+
+@dataclass
+class RaplZone:
+    path: str
+    name: str
+    max_energy_range_uj: int
+    last_energy_uj: int = 0
+    total_energy_uj: int = 0
+
+    def read_energy_uj(self) -> int:
+        with open(os.path.join(self.path, "energy_uj")) as f:
+            return int(f.read())
+
+    def update(self) -> int:
+        """Reads the counter and returns the microjoules used since the last reading."""
+        energy_uj = self.read_energy_uj()
+        delta = energy_uj - self.last_energy_uj
+        if delta < 0:
+            # The counter wrapped around after reaching max_energy_range_uj.
+            delta += self.max_energy_range_uj
+        self.last_energy_uj = energy_uj
+        self.total_energy_uj += delta
+        return delta
+
+
+class RaplSystemService(SystemServiceInterface):
+    """Samples the cumulative RAPL energy counters exposed by the powercap driver.
+
+    The samples carry the energy used in the package and DRAM domains since the service was
+    created, so the energy of a run is the exact difference of two readings instead of an
+    integral over power readings. The power in a sample is the average since the previous sample.
+    """
+
+    def __init__(self, powercap_root: str = POWERCAP_ROOT, domains=DEFAULT_DOMAINS):
+        self.logger = logging.getLogger(__name__)
+        self._zones = self._find_zones(powercap_root, domains)
+        if not self._zones:
+            raise RuntimeError(f"Found no RAPL {', '.join(domains)} zones in {powercap_root}")
+        for zone in self._zones:
+            zone.last_energy_uj = zone.read_energy_uj()
+        self._last_time = time.monotonic()
+
+    def sample(self) -> SystemSample:
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        self._last_time = now
+
+        total_power = 0.0
+        package_power = 0.0
+        for zone in self._zones:
+            power = zone.update() / 1.0e6 / elapsed if elapsed > 0 else 0.0
+            total_power += power
+            if zone.name.startswith("package"):
+                package_power += power
+
+        return SystemSample(
+            datetime.datetime.now(),
+            current_power_draw=total_power,
+            cpu_power=package_power,
+            cpu_freq=_get_cpu_freq(),
+            energy=sum(zone.total_energy_uj for zone in self._zones) / 1.0e6,
+        )
+
+    def _find_zones(self, powercap_root: str, domains) -> list[RaplZone]:
+        zones = []
+        for path in sorted(glob.glob(os.path.join(powercap_root, "intel-rapl:*"))):
+            with open(os.path.join(path, "name")) as f:
+                name = f.read().strip()
+            if not name.startswith(tuple(domains)):
+                continue
+            with open(os.path.join(path, "max_energy_range_uj")) as f:
+                max_energy_range_uj = int(f.read())
+            self.logger.debug(f"Using RAPL zone {name} at {path}")
+            zones.append(RaplZone(path, name, max_energy_range_uj))
+        return zones
@@ -1,14 +1,19 @@
 """A energy scheduling model, build for HPC."""
 
 import sys
-from importlib import metadata as importlib_metadata
 
 
 def get_version() -> str:
+    from importlib import metadata as importlib_metadata
+
     try:
         return importlib_metadata.version(__name__)
     except importlib_metadata.PackageNotFoundError:  # pragma: no cover
         return "unknown"
 
 
-version: str = get_version()
+def __getattr__(name: str):
+    # importlib.metadata is slow to import, so the version is only looked up when it is used.
+    if name == "version":
+        return get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
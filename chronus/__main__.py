@@ -1,35 +1,30 @@
+from typing import TYPE_CHECKING
+
 import dataclasses
 import json
 import logging
 import os
 from enum import Enum
+from functools import lru_cache
 from random import choice
 from time import sleep
 
 import typer
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.table import Table
-
-from chronus import version
-from chronus.application.benchmark_service import BenchmarkService
-from chronus.application.init_model_service import InitModelService
-from chronus.application.load_model_service import LoadModelService
-from chronus.application.run_model_service import RunModelService
-from chronus.domain.configuration import Configuration
-from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
-from chronus.domain.interfaces.repository_interface import RepositoryInterface
-from chronus.domain.interfaces.settings_interface import Permission
-from chronus.SystemIntegration.application_runners.hpcg import HpcgService
-from chronus.SystemIntegration.cpu_info_services.cpu_info_service import LsCpuInfoService
-from chronus.SystemIntegration.optimizers.bruteforce_optmizer import BruteForceOptimizer
-from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
-from chronus.SystemIntegration.optimizers.random_tree_forrest import RandomTreeOptimizer
-from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
-from chronus.SystemIntegration.settings_interface.etc_storage import EtcLocalStorage
-from chronus.SystemIntegration.system_service_interfaces.ipmi_system_service import (
-    IpmiSystemService,
-)
+
+from chronus import get_version
+from chronus.cli.setup import OPTIMIZERS, get_optimizer
+from chronus.client import DEFAULT_SOCKET_PATH
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from chronus.domain.configuration import Configuration
+    from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+    from chronus.domain.interfaces.repository_interface import RepositoryInterface
+
+# Commands import what they use when they run. `slurm-config` is called on every job
+# submission, so it must not pay for rich, pandas, sklearn, pyghmi and psutil.
+LIGHTWEIGHT_COMMANDS = ("slurm-config", "slurm-config-batch")
 
 name = "chronus"
 
@@ -51,14 +46,25 @@ class FileWithTimeStampHandlerAndLevel(logging.FileHandler):
         super().emit(record)
 
 
-console = Console()
+@lru_cache(maxsize=None)
+def get_console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
 FORMAT = "%(message)s"
-logging.basicConfig(
-    level="INFO",
-    format=FORMAT,
-    datefmt="[%X]",
-    handlers=[RichHandler(), FileWithTimeStampHandlerAndLevel("chronus.log")],
-)
+
+
+def setup_logging(lightweight: bool) -> None:
+    if lightweight:
+        handlers = [logging.StreamHandler()]
+    else:
+        from rich.logging import RichHandler
+
+        handlers = [RichHandler(), FileWithTimeStampHandlerAndLevel("chronus.log")]
+    logging.basicConfig(level="INFO", format=FORMAT, datefmt="[%X]", handlers=handlers)
+
 
 app = typer.Typer(
     name=name,
@@ -78,7 +84,7 @@ def version_callback(print_version: bool) -> None:
     )
 
     if print_version:
-        print(version_string + "\x1B[38;2;247;201;120m" + version + "\x1B[39m")
+        print(version_string + "\x1B[38;2;247;201;120m" + get_version() + "\x1B[39m")
         raise typer.Exit()
 
 
@@ -111,13 +117,12 @@ class StandardConfig:
         return self._color
 
 
-FORMAT = "%(message)s"
-logging.basicConfig(level="INFO", format=FORMAT, datefmt="[%X]", handlers=[RichHandler()])
 logger = logging.getLogger("main")
 
 
 @app.callback()
 def main(
+    ctx: typer.Context,
     print_version: bool = typer.Option(
         None,
         "-v",
@@ -132,23 +137,16 @@ def main(
         help="Print debug information to logs.",
     ),
 ) -> None:
+    setup_logging(lightweight=ctx.invoked_subcommand in LIGHTWEIGHT_COMMANDS)
     if debug:
         logger.setLevel(logging.DEBUG)
 
 
-class Model(str, Enum):
-    brute_force = BruteForceOptimizer.name()
-    linear_regression = LinearRegressionOptimizer.name()
-    random_tree = RandomTreeOptimizer.name()
+Model = Enum("Model", {name.replace("-", "_"): name for name in OPTIMIZERS}, type=str)
 
 
-def _choose_optimizer(model: str) -> OptimizerInterface:
-    switcher = {
-        BruteForceOptimizer.name(): BruteForceOptimizer(),
-        LinearRegressionOptimizer.name(): LinearRegressionOptimizer(),
-        RandomTreeOptimizer.name(): RandomTreeOptimizer(),
-    }
-    return switcher.get(model, BruteForceOptimizer())
+def _choose_optimizer(model: str, **options) -> "OptimizerInterface":
+    return get_optimizer(model if model in OPTIMIZERS else "brute-force", **options)
 
 
 @app.command(name="init-model")
@@ -165,39 +163,69 @@ def init_model(
         "--system",
         help="The id of the system to use.",
     ),
+    search: str = typer.Option(
+        "halving",
+        "--search",
+        help="How the random tree searches its hyperparameters: halving, random or grid.",
+    ),
+    budget: int = typer.Option(
+        None,
+        "--budget",
+        help="The number of hyperparameter settings the random tree tries.",
+    ),
 ):
+    from chronus.application.init_model_service import InitModelService
+    from chronus.application.model_store import ModelStore
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+
     repo = SqliteRepository(db_path)
     if system_id == -1:
-        console.print("[yellow]You need to choose a system to train a model.[/yellow]")
-        console.print("[green]Here are the available systems:[/green]")
+        get_console().print("[yellow]You need to choose a system to train a model.[/yellow]")
+        get_console().print("[green]Here are the available systems:[/green]")
         present_systems(repo)
 
         raise typer.Exit()
 
+    options = {}
+    if model == Model.random_tree:
+        options = {"search": search, "budget": budget}
+    elif budget is not None:
+        logger.warning("Only the random tree has a hyperparameter budget, ignoring --budget")
+
+    try:
+        optimizer = _choose_optimizer(model, **options)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
     logger.info("Initializing model of type '%s'", model.name)
     making_model = InitModelService(
         system_id=system_id,
         repository=repo,
-        optimizer=_choose_optimizer(model),
+        optimizer=optimizer,
+        model_store=ModelStore.for_database(db_path),
     )
 
-    with console.status("training model", spinner="dots12"):
+    with get_console().status("training model", spinner="dots12"):
         new_model_id = making_model.run()
 
     logger.info("Model trained with id %s", new_model_id)
 
 
 def present_systems(repo):
+    from rich.table import Table
+
     systems = repo.get_all_system_info()
     table = Table(title="Available Systems", style="green")
     table.add_column("ID", justify="center", style="cyan")
     table.add_column("DataClass", justify="center", style="magenta")
     for i, system in enumerate(systems):
         table.add_row(str(i), str(system))
-    console.print(table)
+    get_console().print(table)
+
 
+def present_models(repo: "RepositoryInterface"):
+    from rich.table import Table
 
-def present_models(repo: RepositoryInterface):
     models = repo.get_all_models()
     table = Table(title="Available Models", style="green")
     table.add_column("ID", justify="center", style="cyan")
@@ -208,7 +236,7 @@ def present_models(repo: RepositoryInterface):
         table.add_row(
             str(model.id), model.type, model.created_at.strftime("%d/%m/%Y"), str(model.system_info)
         )
-    console.print(table)
+    get_console().print(table)
 
 
 @app.command(name="load-model")
@@ -225,13 +253,19 @@ def load_model(
         help="The path to the database.",
     ),
 ):
+    from chronus.application.load_model_service import LoadModelService
+    from chronus.domain.interfaces.settings_interface import Permission
+    from chronus.SystemIntegration.cpu_info_services.cpu_info_service import LsCpuInfoService
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+    from chronus.SystemIntegration.settings_interface.etc_storage import EtcLocalStorage
+
     repo = SqliteRepository(db_path)
     if model_id == -1:
-        console.print("[yellow]You need to choose a model to load.[/yellow]")
-        console.print("[green]Here are the available models:[/green]")
+        get_console().print("[yellow]You need to choose a model to load.[/yellow]")
+        get_console().print("[green]Here are the available models:[/green]")
         present_models(repo)
 
-        console.print("[yellow]Specify the model id with --model <id>[/yellow]")
+        get_console().print("[yellow]Specify the model id with --model <id>[/yellow]")
 
         raise typer.Exit()
 
@@ -242,6 +276,7 @@ def load_model(
         repository=repo,
         optimizer=_choose_optimizer(model.type),
         local_storage=EtcLocalStorage(Permission.WRITE),
+        cpu_info_service=LsCpuInfoService(),
     )
     _load_model.run()
 
@@ -254,13 +289,46 @@ class ConfigDto:
 
 
 @app.command(name="slurm-config")
-def get_config(cpu: str = typer.Argument(..., help="The cpu model to get the config for")):
-    local_storage = EtcLocalStorage(Permission.READ)
-    optimizer_type = local_storage.get_settings().loaded_model.type
-    run_model = RunModelService(
-        optimizer=_choose_optimizer(optimizer_type), local_storage=local_storage
+def get_config(
+    cpu: str = typer.Argument(..., help="The cpu model to get the config for"),
+    requested_tasks: int = typer.Option(
+        0,
+        "--tasks",
+        help="The number of tasks the job asks for, 0 if it does not ask.",
+    ),
+    nodes: int = typer.Option(1, "--nodes", help="The number of nodes the job asks for."),
+    time_limit: int = typer.Option(
+        None,
+        "--time-limit",
+        help="The time limit of the job in minutes.",
+    ),
+    application: str = typer.Option(
+        None,
+        "--application",
+        help="The application tag of the job.",
+    ),
+    max_slowdown: float = typer.Option(
+        None,
+        "--max-slowdown",
+        help="How many times longer than the fastest configuration the job may take.",
+    ),
+    energy_budget: float = typer.Option(
+        None,
+        "--energy-budget",
+        help="The energy in joules per GFLOP of work the job may use.",
+    ),
+):
+    from chronus.domain.job import JobRequest
+
+    job = JobRequest(
+        ntasks=requested_tasks,
+        nodes=nodes,
+        time_limit=time_limit,
+        application=application,
+        max_slowdown=max_slowdown,
+        energy_budget=energy_budget,
     )
-    conf = run_model.run()
+    conf = _run_model_service().query(job, cpu)
     disabled = False
     if disabled:
         outgoing = ConfigDto(
@@ -274,7 +342,59 @@ def get_config(cpu: str = typer.Argument(..., help="The cpu model to get the con
             frequency=int(conf.frequency),
             threads_per_core=conf.threads_per_core,
         )
-    console.print(json.dumps(dataclasses.asdict(outgoing)))
+    typer.echo(json.dumps(dataclasses.asdict(outgoing)))
+
+
+@app.command(name="slurm-config-batch")
+def get_configs(
+    cpu: str = typer.Argument(..., help="The cpu model to get the configs for"),
+    jobs_path: str = typer.Option(
+        "-",
+        "--jobs",
+        help="A JSON list of jobs with the fields of a job request, '-' for stdin.",
+    ),
+):
+    """Answers a burst of pending jobs with one evaluation of the model."""
+    import sys
+
+    from chronus.application.config_server import config_to_dict
+    from chronus.domain.job import JobRequest
+
+    if jobs_path == "-":
+        jobs = json.loads(sys.stdin.read())
+    else:
+        with open(jobs_path) as f:
+            jobs = json.loads(f.read())
+    configurations = _run_model_service().query_batch([JobRequest(**job) for job in jobs], cpu)
+    typer.echo(json.dumps([config_to_dict(conf) for conf in configurations]))
+
+
+def _run_model_service():
+    from chronus.application.run_model_service import RunModelService
+    from chronus.domain.interfaces.settings_interface import Permission
+    from chronus.SystemIntegration.settings_interface.etc_storage import EtcLocalStorage
+
+    return RunModelService(
+        local_storage=EtcLocalStorage(Permission.READ), get_optimizer=_choose_optimizer
+    )
+
+
+@app.command(name="serve")
+def serve(
+    socket_path: str = typer.Option(
+        DEFAULT_SOCKET_PATH,
+        "--socket",
+        help="The path of the Unix socket to answer config requests on.",
+    ),
+):
+    from chronus.application.config_server import ConfigServer
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    server = ConfigServer(_run_model_service(), socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopped serving configs")
 
 
 # add partician compute
@@ -287,8 +407,9 @@ def run(
     frequency: int = typer.Argument(..., help="The frequency to run on."),
     threads_per_core: int = typer.Argument(..., help="The number of threads to run on."),
 ):
+    from chronus.SystemIntegration.application_runners.hpcg import HpcgService
+
     hpcg = HpcgService(hpcg_path)
-    import asyncio
 
     hpcg.run(cores, frequency, threads_per_core)
     while hpcg.is_running():
@@ -312,26 +433,198 @@ def benchmark(
         "--database",
         help="The path to the database.",
     ),
+    sample_interval: float = typer.Option(
+        3.0,
+        "--sample-interval",
+        help="Seconds between system samples while a benchmark is running.",
+    ),
+    power_source: str = typer.Option(
+        "ipmi",
+        "--power-source",
+        help="Where to read power from, 'ipmi' for the BMC or 'rapl' for the energy counters.",
+    ),
+    array_size: int = typer.Option(
+        0,
+        "--array-size",
+        help="Configurations to run in one Slurm job array, 0 submits a job per configuration.",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Go on with the last benchmark of this system, running only the configurations "
+        "that failed or have not been measured.",
+    ),
+    search: str = typer.Option(
+        "grid",
+        "--search",
+        help="'grid' runs every configuration, 'adaptive' runs the configurations a model of "
+        "the runs so far expects the most of, until its predicted best stops changing.",
+    ),
+    max_runs: int = typer.Option(
+        None,
+        "--max-runs",
+        help="The most configurations an adaptive search runs.",
+    ),
 ):
+    from chronus.application.benchmark_service import BenchmarkService
+    from chronus.SystemIntegration.application_runners.hpcg import HpcgService
+    from chronus.SystemIntegration.cpu_info_services.cpu_info_service import LsCpuInfoService
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+
     full_path = os.path.abspath(hpcg_path)
+    if power_source == "rapl":
+        from chronus.SystemIntegration.system_service_interfaces.rapl_system_service import (
+            RaplSystemService,
+        )
+
+        system_service = RaplSystemService()
+    elif power_source == "ipmi":
+        from chronus.SystemIntegration.system_service_interfaces.ipmi_system_service import (
+            IpmiSystemService,
+        )
+
+        system_service = IpmiSystemService(cache_sdr=True)
+    else:
+        raise typer.BadParameter(f"Unknown power source {power_source}, use 'ipmi' or 'rapl'")
+    if search == "adaptive":
+        from chronus.SystemIntegration.configuration_searches.surrogate_search import (
+            SurrogateSearch,
+        )
+
+        configuration_search = SurrogateSearch(max_runs=max_runs)
+    elif search == "grid":
+        configuration_search = None
+    else:
+        raise typer.BadParameter(f"Unknown search {search}, use 'grid' or 'adaptive'")
     benchmark_service = BenchmarkService(
         cpu_info_service=LsCpuInfoService(),
         application_runner=HpcgService(full_path),
         benchmark_repository=SqliteRepository(db_path),
-        system_service=IpmiSystemService(),
+        system_service=system_service,
+        sample_interval=sample_interval,
+        array_size=array_size,
+        resume=resume,
+        search=configuration_search,
     )
 
     if configurations_path:
-        configurations = []
-        with open(configurations_path) as f:
-            configurations = json.loads(f.read())
-        configurations = [Configuration(**c) for c in configurations]
-
-        benchmark_service.set_configurations(configurations)
+        benchmark_service.set_configurations(_read_configurations(configurations_path))
 
     benchmark_service.run()
 
 
+def _read_configurations(configurations_path: str) -> list["Configuration"]:
+    from chronus.domain.configuration import Configuration
+
+    with open(configurations_path) as f:
+        configurations = json.loads(f.read())
+    return [Configuration(**c) for c in configurations]
+
+
+@app.command(name="benchmark-campaign")
+def benchmark_campaign(
+    hpcg_path: str,
+    nodes: str = typer.Option(
+        None,
+        "--nodes",
+        help="A comma separated list of the nodes to benchmark on.",
+    ),
+    partition: str = typer.Option(
+        None,
+        "--partition",
+        help="Benchmark on every node of this Slurm partition.",
+    ),
+    bmc: str = typer.Option(
+        "{node}-bmc",
+        "--bmc",
+        help="The address of a node's BMC, where {node} is replaced by the name of the node.",
+    ),
+    bmc_user: str = typer.Option(None, "--bmc-user", help="The user to log in to the BMCs as."),
+    bmc_password: str = typer.Option(
+        None,
+        "--bmc-password",
+        envvar="CHRONUS_BMC_PASSWORD",
+        help="The password of the BMC user.",
+    ),
+    configurations_path: str = typer.Option(
+        None,
+        "--configurations",
+        "-c",
+        help="The path to the file containing the configurations.",
+    ),
+    db_path: str = typer.Option(
+        "data.db",
+        "-db",
+        "--database",
+        help="The path to the database.",
+    ),
+    output_dir: str = typer.Option(
+        "campaign",
+        "--output-dir",
+        help="The directory the nodes run the benchmark in, a directory per node.",
+    ),
+    sample_interval: float = typer.Option(
+        3.0,
+        "--sample-interval",
+        help="Seconds between system samples while a benchmark is running.",
+    ),
+    array_size: int = typer.Option(
+        0,
+        "--array-size",
+        help="Configurations to run in one Slurm job array, 0 submits a job per configuration.",
+    ),
+):
+    """Benchmarks on several nodes at once, sampling each node through its BMC."""
+    from chronus.application.campaign_service import CampaignService
+    from chronus.SystemIntegration.application_runners.hpcg import HpcgService
+    from chronus.SystemIntegration.application_runners.slurm_nodes import list_partition_nodes
+    from chronus.SystemIntegration.cpu_info_services.cpu_info_service import LsCpuInfoService
+    from chronus.SystemIntegration.job_state_trackers.slurm_job_state_tracker import (
+        SlurmJobStateTracker,
+    )
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+    from chronus.SystemIntegration.system_service_interfaces.ipmi_system_service import (
+        IpmiSystemService,
+    )
+
+    if (nodes is None) == (partition is None):
+        raise typer.BadParameter("Give either --nodes or --partition")
+    node_names = nodes.split(",") if nodes else list_partition_nodes(partition)
+    full_path = os.path.abspath(hpcg_path)
+    # One tracker, so the jobs of all nodes are polled together.
+    job_state_tracker = SlurmJobStateTracker()
+
+    def make_application_runner(node: str) -> HpcgService:
+        node_dir = os.path.join(os.path.abspath(output_dir), node)
+        os.makedirs(node_dir, exist_ok=True)
+        return HpcgService(
+            full_path, output_dir=node_dir, job_state_tracker=job_state_tracker, node=node
+        )
+
+    def make_system_service(node: str) -> IpmiSystemService:
+        return IpmiSystemService(
+            cache_sdr=True,
+            bmc=bmc.format(node=node),
+            userid=bmc_user,
+            password=bmc_password,
+        )
+
+    campaign = CampaignService(
+        nodes=node_names,
+        cpu_info_service=LsCpuInfoService(),
+        make_application_runner=make_application_runner,
+        make_system_service=make_system_service,
+        benchmark_repository=SqliteRepository(db_path),
+        sample_interval=sample_interval,
+        array_size=array_size,
+    )
+    if configurations_path:
+        campaign.set_configurations(_read_configurations(configurations_path))
+
+    logger.info("Benchmarking on %s", ", ".join(node_names))
+    campaign.run()
+
+
 @app.command(name="fix-db")
 def fix_db(
     db_path: str = typer.Option(
@@ -341,9 +634,11 @@ def fix_db(
         help="The path to the database.",
     ),
 ):
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+
     repo = SqliteRepository(db_path)
 
-    with console.status("fixing db", spinner="dots12") as status:
+    with get_console().status("fixing db", spinner="dots12") as status:
         status.update("fixing system samples")
         repo.fix_system_samples()
         status.update("fixing gflops per watt")
@@ -359,6 +654,10 @@ def best_runs(
         help="The path to the database.",
     )
 ):
+    from rich.table import Table
+
+    from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+
     repo = SqliteRepository(db_path)
     runs = repo.get_best_runs()
     table = Table(title="Best Runs", style="green")
@@ -391,7 +690,7 @@ def best_runs(
             f"{time_pct:.2f}",
         )
 
-    console.print(table)
+    get_console().print(table)
 
 
 # delete output dir if exception
@@ -1,13 +1,24 @@
+from typing import Iterable, Iterator
+
+import datetime
+import itertools
 import logging
 import time
 
+from chronus.application.sampler import FixedRateSampler
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlannedConfiguration, PlanStatus
 from chronus.domain.configuration import Configuration, Configurations
 from chronus.domain.interfaces.application_runner_interface import ApplicationRunnerInterface
+from chronus.domain.interfaces.configuration_search_interface import (
+    ConfigurationSearchInterface,
+)
 from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
 from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.job_state import JobState
 from chronus.domain.Run import Run
+from chronus.domain.system_sample import SystemSample
 
 
 class JobFailedException(Exception):
@@ -29,7 +40,19 @@ class BenchmarkService:
         application_runner: ApplicationRunnerInterface,
         system_service: SystemServiceInterface,
         benchmark_repository: RepositoryInterface,
+        power_budget: float = None,
+        sample_interval: float = 3.0,
+        job_poll_interval: float = 3.0,
+        array_size: int = 0,
+        resume: bool = False,
+        save_plan: bool = True,
+        search: ConfigurationSearchInterface = None,
     ):
+        """With an array size, that many configurations are run by one job array, instead of
+        submitting a job for every configuration. With ``resume`` the last benchmark of the
+        system goes on where it stopped. Without ``save_plan`` the configurations are taken one
+        at a time, so they can be shared with other benchmarks, and cannot be resumed. With a
+        ``search`` only the configurations it picks from the measurements so far are run."""
         self.__configurations: list[Configuration] = None
         self.energy_used = 0.0
         self.cpu_info_service = cpu_info_service
@@ -37,54 +60,273 @@ class BenchmarkService:
         self.system_service = system_service
         self.repository = benchmark_repository
         self.gflops = 0.0
+        self.power_budget = power_budget
+        self.sample_interval = sample_interval
+        self.job_poll_interval = job_poll_interval
+        self.array_size = array_size
+        self.resume = resume
+        self.save_plan = save_plan
+        self.search = search
+        self.__plan: BenchmarkPlan = None
+        self.__taken: list[PlannedConfiguration] = []
+        self.__running_task: int = None
         self.logger = logging.getLogger(__name__)
 
     def run(self):
         cpu = self.cpu_info_service.get_cpu_info()
+        benchmark_id, planned = self._plan(cpu)
+        planned = self._take(planned)
 
-        benchmark = Benchmark(system_info=cpu, application="HPCG")
-        benchmark_id = self.repository.save_benchmark(benchmark)
+        if self.array_size:
+            # Taken a job array at a time, so configurations shared with other nodes are not
+            # claimed before they can run.
+            planned = iter(planned)
+            while array := list(itertools.islice(planned, self.array_size)):
+                self._run_array(array, cpu, benchmark_id)
+            return
 
-        if self.__configurations is None:
-            self.__configurations = Configurations(cpu)
-        for configuration in self.__configurations:
+        for entry in planned:
+            configuration = entry.configuration
             self.logger.info(
                 f"Starting benchmark for {cpu.cpu_name} with {configuration.cores} cores, {configuration.frequency / 1.0e6} GHz and {configuration.threads_per_core} threads per core"
             )
-            run = Run(
-                cpu=cpu.cpu_name,
-                cores=configuration.cores,
-                frequency=configuration.frequency,
-                threads_per_core=configuration.threads_per_core,
-                benchmark_id=benchmark_id,
-            )
+            run = self._make_run(configuration, cpu, benchmark_id)
             self.application_runner.prepare()
-            self.application_runner.run(configuration.cores, configuration.frequency)
+            self.application_runner.run(
+                configuration.cores, configuration.frequency, configuration.threads_per_core
+            )
             try:
-                self._wait_for_application_to_finish_and_save_run(configuration, cpu, run)
+                if self._wait_for_application_to_finish_and_save_run(configuration, cpu, run):
+                    self._record_outcome(entry, run)
+                else:
+                    self._record_outcome(entry)
             except JobFailedException:
                 self.logger.error(
                     f"Job failed with config {configuration.cores} cores, {configuration.frequency / 1.0e6} GHz and {configuration.threads_per_core} threads per core"
                 )
+                self._record_outcome(entry)
             finally:
                 self.application_runner.cleanup()
 
+    def _plan(self, cpu) -> tuple[int, Iterable[PlannedConfiguration]]:
+        """The id of the benchmark and the configurations it has left to run.
+
+        A new benchmark saves its plan, unless the configurations are not known up front. A
+        resumed benchmark runs the configurations of the last plan of the system that neither
+        completed nor have a finished run of the system. A resumed search starts from the
+        finished runs of the system.
+        """
+        self.__plan = None
+        configurations = self.__configurations
+        if configurations is None:
+            configurations = Configurations(cpu)
+        if self.search is not None:
+            benchmark_id = self.repository.save_benchmark(
+                Benchmark(system_info=cpu, application="HPCG")
+            )
+            return benchmark_id, self._searched(cpu, configurations)
+        if not self.save_plan:
+            benchmark_id = self.repository.save_benchmark(
+                Benchmark(system_info=cpu, application="HPCG")
+            )
+            return benchmark_id, (
+                PlannedConfiguration(position, configuration)
+                for position, configuration in enumerate(configurations)
+            )
+
+        plan = self.repository.get_latest_plan(cpu) if self.resume else None
+        if plan is None:
+            if self.resume:
+                self.logger.warning(f"There is no benchmark of {cpu.cpu_name} to resume")
+            benchmark_id = self.repository.save_benchmark(
+                Benchmark(system_info=cpu, application="HPCG")
+            )
+            plan = BenchmarkPlan.make(benchmark_id, configurations)
+            self.repository.save_plan(plan)
+        else:
+            self.logger.info(f"Resuming benchmark {plan.benchmark_id}")
+        self.__plan = plan
+        if not self.resume:
+            return plan.benchmark_id, plan.configurations
+
+        remaining = plan.remaining(self.repository.iter_runs(cpu, include_samples=False))
+        self.logger.info(
+            f"{len(plan.configurations) - len(remaining)} of {len(plan.configurations)} "
+            f"configurations are already measured, {len(remaining)} are left"
+        )
+        return plan.benchmark_id, remaining
+
+    def _searched(self, cpu, configurations) -> Iterator[PlannedConfiguration]:
+        self.search.start(list(configurations))
+        if self.resume:
+            # The runs are read without their samples, so they have the GFLOPS/W they were saved
+            # with, the same as was observed while they ran.
+            for run in self.repository.iter_runs(cpu, include_samples=False):
+                if run.end_time is not None:
+                    self.search.observe(
+                        Configuration(run.cores, run.frequency, run.threads_per_core),
+                        run.gflops_per_watt,
+                    )
+        for position in itertools.count():
+            configuration = self.search.next_configuration()
+            if configuration is None:
+                return
+            yield PlannedConfiguration(position, configuration)
+
+    def _take(self, planned: Iterable[PlannedConfiguration]) -> Iterator[PlannedConfiguration]:
+        self.__taken = []
+        for entry in planned:
+            self.__taken.append(entry)
+            yield entry
+
+    @property
+    def unfinished_configurations(self) -> list[Configuration]:
+        """The configurations taken to run that neither completed nor failed, e.g. those of the
+        job array running when the benchmark stopped with an exception."""
+        return [entry.configuration for entry in self.__taken if entry.status is PlanStatus.PENDING]
+
+    def _record_outcome(self, entry: PlannedConfiguration, run: Run = None):
+        """Records that the configuration completed with the run, or failed without one."""
+        entry.status = PlanStatus.FAILED if run is None else PlanStatus.COMPLETED
+        if self.__plan is not None:
+            self.repository.set_plan_status(self.__plan.benchmark_id, entry.position, entry.status)
+        if self.search is not None:
+            self.search.observe(entry.configuration, None if run is None else run.gflops_per_watt)
+
     def set_configurations(self, configurations: [Configuration]):
         self.__configurations = configurations
 
-    def _wait_for_application_to_finish_and_save_run(self, configuration, cpu, run):
-        while self.application_runner.is_running():
-            sample = self.system_service.sample()
-            run.add_sample(sample)
-            time.sleep(3)
-        run.add_sample(self.system_service.sample())
+    def _make_run(self, configuration: Configuration, cpu, benchmark_id: int) -> Run:
+        return Run(
+            cpu=cpu.cpu_name,
+            cores=configuration.cores,
+            frequency=configuration.frequency,
+            threads_per_core=configuration.threads_per_core,
+            benchmark_id=benchmark_id,
+        )
+
+    def _run_array(self, planned: list[PlannedConfiguration], cpu, benchmark_id: int):
+        """Runs the configurations as one job array and saves a run for every task that completes.
+
+        The tasks run one at a time, so every sample is added to the run of the task running
+        when it was taken. Samples taken between tasks belong to no run. A run starts at the
+        first poll that sees its task running, or, when a task completes between two polls, at
+        the earlier of them.
+        """
+        configurations = [entry.configuration for entry in planned]
+        self.logger.info(f"Starting a job array of {len(configurations)} configurations")
+        runs = [
+            self._make_run(configuration, cpu, benchmark_id) for configuration in configurations
+        ]
+        unfinished = set(range(len(runs)))
+        started = set()
+        self.__running_task = None
+        sampler = FixedRateSampler(
+            self.system_service,
+            on_sample=lambda sample: self._add_array_sample(runs, sample),
+            interval_seconds=self.sample_interval,
+        )
+        self.application_runner.prepare()
+        self.application_runner.run_array(configurations)
+        previous_poll = datetime.datetime.now()
+        try:
+            with sampler:
+                while unfinished:
+                    states = self.application_runner.array_task_states()
+                    polled_at = datetime.datetime.now()
+                    for task in sorted(unfinished):
+                        state = states.get(task, JobState.PENDING)
+                        if state is JobState.COMPLETED:
+                            self.__running_task = None
+                            if task not in started:
+                                started.add(task)
+                                runs[task].start_time = previous_poll
+                            saved = self._finish_run(
+                                runs[task],
+                                self.application_runner.array_task_gflops(task),
+                                self.application_runner.array_task_result(task),
+                                sampler,
+                            )
+                            unfinished.discard(task)
+                            self._record_outcome(planned[task], runs[task] if saved else None)
+                        elif state.is_failed:
+                            self.logger.error(
+                                f"Job failed with config {configurations[task].cores} cores, "
+                                f"{configurations[task].frequency / 1.0e6} GHz and "
+                                f"{configurations[task].threads_per_core} threads per core"
+                            )
+                            unfinished.discard(task)
+                            self._record_outcome(planned[task])
+                    running = [
+                        task for task in sorted(unfinished) if states.get(task) is JobState.RUNNING
+                    ]
+                    if running and running[0] not in started:
+                        started.add(running[0])
+                        runs[running[0]].start_time = polled_at
+                    self.__running_task = running[0] if running else None
+                    previous_poll = polled_at
+                    if unfinished:
+                        time.sleep(self.job_poll_interval)
+        finally:
+            self.__running_task = None
+            self.application_runner.cleanup()
+
+    def _add_array_sample(self, runs: list[Run], sample: SystemSample):
+        task = self.__running_task
+        if task is not None:
+            self._add_sample(runs[task], sample)
+
+    def _finish_run(self, run: Run, gflops: float, flop: float, sampler: FixedRateSampler) -> bool:
+        """Saves the run with a last sample, taken through the sampler so it is not read at the
+        same time as a scheduled sample. A run with fewer than two samples has no energy to
+        speak of and is not saved."""
+        run.add_sample(sampler.sample())
         run.finish()
-        run.gflops = self.application_runner.gflops
-        run.flop = self.application_runner.result
+        if len(run.samples) < 2:
+            self.logger.error(
+                f"The run with {run.cores} cores, {run.frequency / 1.0e6} GHz and "
+                f"{run.threads_per_core} threads per core has {len(run.samples)} sample, "
+                f"counting it as failed"
+            )
+            return False
+        run.gflops = gflops
+        run.flop = flop
         self.repository.save_run(run)
         self.logger.info(
-            f"Benchmark for {cpu} with {configuration.cores} cores and {configuration.frequency} MHz complete, GFLOPS: {run.gflops}"
+            f"Benchmark for {run.cpu} with {run.cores} cores and {run.frequency} MHz complete, "
+            f"GFLOPS: {run.gflops}"
         )
+        return True
+
+    def _wait_for_application_to_finish_and_save_run(self, configuration, cpu, run) -> bool:
+        sampler = FixedRateSampler(
+            self.system_service,
+            on_sample=lambda sample: self._add_sample(run, sample),
+            interval_seconds=self.sample_interval,
+        )
+        with sampler:
+            while self.application_runner.is_running():
+                time.sleep(self.job_poll_interval)
+        return self._finish_run(
+            run, self.application_runner.gflops, self.application_runner.result, sampler
+        )
+
+    def _add_sample(self, run: Run, sample: SystemSample):
+        run.add_sample(sample)
+        self._log_live_statistics(run)
+
+    def _log_live_statistics(self, run: Run):
+        statistics = run.statistics
+        self.logger.debug(
+            f"Run so far: {statistics.energy_joules:.1f} J over {statistics.duration_seconds:.1f} s, "
+            f"power mean {statistics.mean_power_draw:.1f} W, min {statistics.min_power_draw:.1f} W, "
+            f"max {statistics.max_power_draw:.1f} W, cpu temp mean {statistics.mean_cpu_temp:.1f}"
+        )
+        if self.power_budget is not None and statistics.mean_power_draw > self.power_budget:
+            self.logger.warning(
+                f"Mean power draw {statistics.mean_power_draw:.1f} W is over the power budget of "
+                f"{self.power_budget:.1f} W"
+            )
 
     def _save_benchmark(self, benchmark: Benchmark):
         self.repository.save_benchmark(benchmark)
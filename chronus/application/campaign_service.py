@@ -0,0 +1,118 @@
+from typing import Callable, Iterator
+
+import logging
+import queue
+import threading
+
+from chronus.application.benchmark_service import BenchmarkService
+from chronus.domain.configuration import Configuration, Configurations
+from chronus.domain.interfaces.application_runner_interface import ApplicationRunnerInterface
+from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
+from chronus.domain.interfaces.repository_interface import RepositoryInterface
+from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+
+
+class CampaignFailedException(Exception):
+    pass
+
+
+class CampaignService:
+    """Benchmarks the configurations on several nodes at once, a benchmark service per node.
+
+    The nodes take the configurations from one queue when they are ready for the next, so a
+    slow node runs fewer of them and a node that fails leaves the rest to the other nodes,
+    including those it was running when it failed. Each
+    node has its own application runner, which pins the jobs to it, and its own system service,
+    which samples it, e.g. through its BMC. The nodes are expected to have the same cpu.
+    """
+
+    def __init__(
+        self,
+        nodes: list[str],
+        cpu_info_service: CpuInfoServiceInterface,
+        make_application_runner: Callable[[str], ApplicationRunnerInterface],
+        make_system_service: Callable[[str], SystemServiceInterface],
+        benchmark_repository: RepositoryInterface,
+        sample_interval: float = 3.0,
+        job_poll_interval: float = 3.0,
+        array_size: int = 0,
+    ):
+        if not nodes:
+            raise ValueError("A campaign needs at least one node")
+        self.nodes = nodes
+        self.cpu_info_service = cpu_info_service
+        self.make_application_runner = make_application_runner
+        self.make_system_service = make_system_service
+        self.repository = benchmark_repository
+        self.sample_interval = sample_interval
+        self.job_poll_interval = job_poll_interval
+        self.array_size = array_size
+        self.__configurations: list[Configuration] = None
+        self.logger = logging.getLogger(__name__)
+
+    def set_configurations(self, configurations: list[Configuration]):
+        self.__configurations = configurations
+
+    def run(self):
+        configurations = self.__configurations
+        if configurations is None:
+            configurations = Configurations(self.cpu_info_service.get_cpu_info())
+        pending = queue.SimpleQueue()
+        for configuration in configurations:
+            pending.put(configuration)
+
+        nodes = list(self.nodes)
+        # A node that fails puts its configurations back, possibly after the other nodes ran
+        # out of them, so the nodes left go on until none are left.
+        while nodes and not pending.empty():
+            failed_nodes = []
+            threads = [
+                threading.Thread(
+                    target=self._run_node,
+                    args=(node, pending, failed_nodes),
+                    name=f"campaign-{node}",
+                )
+                for node in nodes
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            nodes = [node for node in nodes if node not in failed_nodes]
+
+        if not nodes:
+            raise CampaignFailedException(
+                f"Every node failed, {pending.qsize()} configurations were not benchmarked"
+            )
+
+    def _run_node(self, node: str, pending: queue.SimpleQueue, failed_nodes: list[str]):
+        benchmark_service = None
+        try:
+            benchmark_service = BenchmarkService(
+                cpu_info_service=self.cpu_info_service,
+                application_runner=self.make_application_runner(node),
+                system_service=self.make_system_service(node),
+                benchmark_repository=self.repository,
+                sample_interval=self.sample_interval,
+                job_poll_interval=self.job_poll_interval,
+                array_size=self.array_size,
+                save_plan=False,
+            )
+            benchmark_service.set_configurations(_take(pending))
+            self.logger.info(f"Starting benchmarks on {node}")
+            benchmark_service.run()
+        except Exception:
+            self.logger.exception(f"Benchmarking on {node} failed, the other nodes go on")
+            if benchmark_service is not None:
+                for configuration in benchmark_service.unfinished_configurations:
+                    pending.put(configuration)
+            # list.append is atomic, so the nodes can report without a lock.
+            failed_nodes.append(node)
+
+
+def _take(pending: queue.SimpleQueue) -> Iterator[Configuration]:
+    while True:
+        try:
+            yield pending.get_nowait()
+        except queue.Empty:
+            return
@@ -0,0 +1,127 @@
+import dataclasses
+import json
+import logging
+import os
+import socketserver
+import threading
+
+from chronus.application.run_model_service import RunModelService
+from chronus.domain.configuration import Configuration
+from chronus.domain.job import JobRequest
+
+
+def config_to_dict(conf: Configuration) -> dict:
+    return {
+        "cores": conf.cores,
+        "frequency": int(conf.frequency),
+        "threads_per_core": conf.threads_per_core,
+    }
+
+
+def config_to_json(conf: Configuration) -> str:
+    return json.dumps(config_to_dict(conf))
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_UnixServer"
+
+    def handle(self):
+        request = self.rfile.readline().decode().strip()
+        try:
+            response = self.server.config_server.handle_request(request)
+        except Exception as e:
+            self.server.config_server.logger.exception(f"Failed to answer request '{request}'")
+            response = f"error {e}"
+        self.wfile.write(response.encode() + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, config_server: "ConfigServer"):
+        self.config_server = config_server
+        super().__init__(socket_path, _RequestHandler)
+
+
+class ConfigServer:
+    """Answers configuration requests over a Unix domain socket from a model kept in memory.
+
+    The protocol is one line per request and one line per response:
+
+    - ``config <cpu>`` answers the configuration as the JSON printed by `chronus slurm-config`.
+      The number of tasks the job asks for can follow the cpu, separated by a tab as cpu names
+      contain spaces.
+    - ``batch <cpu>`` followed by a tab and a JSON list of jobs, as accepted by ``JobRequest``,
+      answers a JSON list of configurations from one evaluation of the model.
+    - ``reload`` reads the loaded model again, e.g. after `chronus load-model`, and answers ``ok``.
+
+    Failures are answered with ``error <message>``.
+    """
+
+    def __init__(self, run_model_service: RunModelService, socket_path: str):
+        self.logger = logging.getLogger(__name__)
+        self.run_model_service = run_model_service
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        self._configs: dict[tuple[str, int], str] = {}
+        self._server: _UnixServer = None
+
+    def reload(self) -> None:
+        self.run_model_service.reload()
+        config_json = config_to_json(self.run_model_service.run())
+        with self._lock:
+            self._configs = {}
+        self.logger.info(f"Serving configuration {config_json}")
+
+    def config(self, cpu: str, requested_tasks: int = 0) -> str:
+        key = (cpu, requested_tasks)
+        with self._lock:
+            config_json = self._configs.get(key)
+        if config_json is None:
+            config_json = config_to_json(self.run_model_service.run(cpu, requested_tasks))
+            with self._lock:
+                self._configs[key] = config_json
+        return config_json
+
+    def handle_request(self, request: str) -> str:
+        command, _, argument = request.partition(" ")
+        if command == "config":
+            cpu, _, requested_tasks = argument.partition("\t")
+            return self.config(cpu, int(requested_tasks or 0))
+        if command == "batch":
+            cpu, _, jobs = argument.partition("\t")
+            jobs = [JobRequest(**job) for job in json.loads(jobs)]
+            configurations = self.run_model_service.query_batch(jobs, cpu)
+            return json.dumps([config_to_dict(conf) for conf in configurations])
+        if command == "reload":
+            self.reload()
+            return "ok"
+        raise ValueError(f"Unknown request '{command}'")
+
+    def start(self) -> None:
+        self.reload()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _UnixServer(self.socket_path, self)
+        # The job-submit hook does not run as the user that owns the daemon.
+        os.chmod(self.socket_path, 0o666)
+        self.logger.info(f"Listening on {self.socket_path}")
+
+    def serve_forever(self) -> None:
+        if self._server is None:
+            self.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stops serve_forever from another thread."""
+        self._server.shutdown()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
@@ -6,9 +6,9 @@
 #  - train model
 # - pure ModelService
 import logging
-import os
 from datetime import datetime
 
+from chronus.application.model_store import ModelStore
 from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
 from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
@@ -26,23 +26,33 @@ class InitModelService:
         repository: RepositoryInterface,
         optimizer: OptimizerInterface,
         system_id: int,
+        model_store: ModelStore = None,
     ):
         self.repository = repository
         self.optimizer = optimizer
         self.system_id = system_id
+        self.model_store = ModelStore() if model_store is None else model_store
         self.__logger = logging.getLogger(__name__)
-        self.__optimizer_dir = "optimizer"
 
     def run(self) -> int:
         self.__logger.info("Initializing model getting data")
         system = self.__get_system()
         runs = self.repository.get_all_runs_from_system(system)
 
-        self.__logger.info("Initializing model training model")
-        self.__ensure_optimizer_dir()
-        self.optimizer.make_model(runs)
-        full_path_to_model = os.path.abspath(self.__optimizer_dir + "/" + str(hash(self.optimizer)))
-        self.optimizer.save(full_path_to_model)
+        key = self.model_store.key(
+            self.optimizer.name(), self.optimizer.hyperparameters(), system, runs
+        )
+        full_path_to_model = self.model_store.path(key)
+        if self.model_store.contains(key):
+            model_id = self.__registered_model_id(full_path_to_model)
+            if model_id is not None:
+                self.__logger.info(f"The runs have not changed, using model with id {model_id}")
+                return model_id
+            self.__logger.info("The runs have not changed, using the model already trained")
+        else:
+            self.__logger.info("Initializing model training model")
+            self.optimizer.make_model(runs, system)
+            self.optimizer.save(full_path_to_model)
 
         model = Model(
             name="model_name",
@@ -54,6 +64,9 @@ class InitModelService:
 
         model_id = self.repository.save_model(model)
         self.__logger.info(f"Initializing model saving model with id {model_id}")
+        self.model_store.garbage_collect(
+            {model.path_to_model for model in self.repository.get_all_models()}
+        )
 
         return model_id
 
@@ -69,6 +82,8 @@ class InitModelService:
 
         raise ValueError(f"System with id {self.system_id} not found")
 
-    def __ensure_optimizer_dir(self):
-        if not os.path.isdir(self.__optimizer_dir):
-            os.mkdir(self.__optimizer_dir)
+    def __registered_model_id(self, path_to_model: str):
+        for model in self.repository.get_all_models():
+            if model.path_to_model == path_to_model and model.type == self.optimizer.name():
+                return model.id
+        return None
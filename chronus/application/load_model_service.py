@@ -4,10 +4,15 @@
 import logging
 import os
 
+from chronus.domain.configuration_table import FILE_NAME as CONFIGURATION_TABLE_FILE_NAME
+from chronus.domain.configuration_table import ConfigurationTable
+from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
 from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
 from chronus.domain.interfaces.settings_interface import LocalStorageInterface
+from chronus.domain.job import JobRequest
 from chronus.domain.LocalSettings import LocalSettings
+from chronus.domain.search_space import SearchSpace
 
 
 class LoadModelService:
@@ -17,8 +22,10 @@ class LoadModelService:
         optimizer: OptimizerInterface,
         local_storage: LocalStorageInterface,
         model_id: int,
+        cpu_info_service: CpuInfoServiceInterface = None,
     ):
         self.repository = repository
+        self.cpu_info_service = cpu_info_service
         self.optimizer = optimizer
         self.model_id = model_id
         self.local_storage = local_storage
@@ -39,3 +46,30 @@ class LoadModelService:
         settings_to_load = LocalSettings(loaded_model=model)
 
         self.local_storage.save_settings(settings_to_load)
+        self.__save_configuration_table(model)
+
+    def __save_configuration_table(self, model):
+        table_path = self.local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME)
+        # A table from the previous model must not outlive it.
+        if os.path.exists(table_path):
+            os.remove(table_path)
+
+        if self.cpu_info_service is not None:
+            system_info = self.cpu_info_service.get_cpu_info()
+        else:
+            system_info = model.system_info
+        search_space = SearchSpace.full_grid(system_info)
+        # The table holds what the optimizer answers a job asking for that many tasks.
+        max_tasks = max((conf.cores * conf.threads_per_core for conf in search_space), default=-1)
+        jobs = [JobRequest(ntasks=requested_tasks) for requested_tasks in range(max_tasks + 1)]
+        try:
+            configurations = self.optimizer.best_configurations(search_space, jobs)
+        except NotImplementedError:
+            self.__logger.warning(
+                f"Models of type {model.type} can not be precompiled, they run on every query"
+            )
+            return
+
+        table = ConfigurationTable.from_configurations(system_info.cpu_name, configurations)
+        table.save(table_path)
+        self.__logger.info(f"Precompiled {len(table)} configurations to {table_path}")
@@ -0,0 +1,92 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.Run import Run
+
+
+def training_digest(runs: list[Run]) -> str:
+    """A digest of what a model learns from the runs, independent of the order of the runs."""
+    rows = sorted(
+        (run.cpu, run.cores, run.threads_per_core, float(run.frequency), run.gflops_per_watt)
+        for run in runs
+    )
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+
+
+class ModelStore:
+    """Trained models in a directory, named by what they were trained from.
+
+    A model is addressed by the optimizer type, its hyperparameters, the system and the digest of
+    the runs it was trained on. Training the same optimizer on unchanged runs again gives the
+    same address, so the model already in the store can be used instead.
+
+    The store keeps a manifest of the models it wrote, and only ever collects those, so files
+    other stores or checkouts put in the same directory are left alone.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: str = "optimizer"):
+        self.__logger = logging.getLogger(__name__)
+        self.directory = os.path.abspath(directory)
+
+    @classmethod
+    def for_database(cls, database_path: str) -> "ModelStore":
+        """A store in a directory next to the database that belongs to that database alone."""
+        return cls(os.path.splitext(os.path.abspath(database_path))[0] + "_models")
+
+    def key(
+        self, optimizer_type: str, hyperparameters: dict, system: SystemInfo, runs: list[Run]
+    ) -> str:
+        address = {
+            "optimizer": optimizer_type,
+            "hyperparameters": hyperparameters,
+            "system": system.digest(),
+            "runs": training_digest(runs),
+        }
+        return hashlib.sha256(json.dumps(address, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        """The path of the model without a file extension, as optimizers save and load it."""
+        os.makedirs(self.directory, exist_ok=True)
+        keys = self.__read_manifest()
+        if key not in keys:
+            self.__write_manifest(keys | {key})
+        return os.path.join(self.directory, key)
+
+    def contains(self, key: str) -> bool:
+        return len(self.__files(os.path.join(self.directory, key))) > 0
+
+    def garbage_collect(self, referenced_paths: set[str]) -> list[str]:
+        """Removes the models this store wrote that are not at one of the referenced paths."""
+        referenced = {os.path.abspath(path) for path in referenced_paths if path}
+        keys = self.__read_manifest()
+        unreferenced = {key for key in keys if os.path.join(self.directory, key) not in referenced}
+        removed = []
+        for key in sorted(unreferenced):
+            for file in self.__files(os.path.join(self.directory, key)):
+                os.remove(file)
+                removed.append(file)
+        if unreferenced:
+            self.__write_manifest(keys - unreferenced)
+        if removed:
+            self.__logger.info(f"Removed {len(removed)} unused models from {self.directory}")
+        return removed
+
+    def __read_manifest(self) -> set[str]:
+        try:
+            with open(os.path.join(self.directory, self.MANIFEST)) as f:
+                return set(json.load(f))
+        except FileNotFoundError:
+            return set()
+
+    def __write_manifest(self, keys: set[str]) -> None:
+        with open(os.path.join(self.directory, self.MANIFEST), "w") as f:
+            json.dump(sorted(keys), f)
+
+    def __files(self, pattern: str) -> list[str]:
+        return [path for path in glob.glob(pattern + ".*") if os.path.isfile(path)]
@@ -1,17 +1,85 @@
+from typing import Callable, Optional
+
 import logging
+import os
+import threading
 
+from chronus.domain.configuration import Configuration
+from chronus.domain.configuration_table import FILE_NAME as CONFIGURATION_TABLE_FILE_NAME
+from chronus.domain.configuration_table import ConfigurationTable
 from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
 from chronus.domain.interfaces.settings_interface import LocalStorageInterface
+from chronus.domain.job import JobRequest
+from chronus.domain.search_space import SearchSpace
 
 
 class RunModelService:
-    def __init__(self, local_storage: LocalStorageInterface, optimizer: OptimizerInterface):
+    def __init__(
+        self,
+        local_storage: LocalStorageInterface,
+        optimizer: OptimizerInterface = None,
+        get_optimizer: Callable[[str], OptimizerInterface] = None,
+    ):
+        """Without an optimizer, one is made with ``get_optimizer`` from the type of the loaded
+        model, the first time a query is not answered by the precompiled table.
+
+        The model is read once and kept in memory until ``reload``."""
         self.__logger = logging.getLogger(__name__)
         self.local_storage = local_storage
         self.optimizer = optimizer
+        self.get_optimizer = get_optimizer
+        self.__lock = threading.Lock()
+        self.__best: Optional[Configuration] = None
+
+    def run(self, cpu: str = None, requested_tasks: int = 0) -> Configuration:
+        return self.query(JobRequest(ntasks=requested_tasks), cpu)
+
+    def reload(self) -> None:
+        """Forgets the model read so far, the next query reads the model loaded by load-model.
+
+        The optimizer is made again from the type of the loaded model, as it may have changed.
+        """
+        with self.__lock:
+            if self.get_optimizer is not None:
+                self.optimizer = None
+            self.__best = None
+
+    def run_optimizer(self) -> Configuration:
+        with self.__lock:
+            if self.__best is None:
+                if self.optimizer is None:
+                    model_type = self.local_storage.get_settings().loaded_model.type
+                    self.optimizer = self.get_optimizer(model_type)
+                self.__best = self.optimizer.run(self.local_storage.get_full_path("/model"))
+            return self.__best
+
+    def query(self, job: JobRequest, cpu: str = None) -> Configuration:
+        return self.query_batch([job], cpu)[0]
+
+    def query_batch(self, jobs: list[JobRequest], cpu: str = None) -> list[Configuration]:
+        """The most efficient configuration for each of the jobs.
 
-    def run(self):
-        model = self.local_storage.get_settings().loaded_model
-        conf = self.optimizer.run(self.local_storage.get_full_path("/model"))
+        A burst of submissions is answered from the precompiled table, or else from a single
+        evaluation of the model over the configuration space of the loaded model's system. The
+        table only knows the most efficient configurations, so jobs with a slowdown bound or an
+        energy budget are answered by the optimizer.
+        """
+        table_path = self.local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME)
+        if os.path.exists(table_path) and not any(job.has_bounds for job in jobs):
+            table = ConfigurationTable.open(table_path)
+            configurations = [table.lookup(cpu, job.tasks_per_node) for job in jobs]
+            if None not in configurations:
+                return configurations
+            self.__logger.warning(f"The configuration table has no configuration for {cpu}")
 
-        return conf
+        best = self.run_optimizer()
+        system_info = self.local_storage.get_settings().loaded_model.system_info
+        search_space = SearchSpace.full_grid(system_info)
+        try:
+            if len(search_space) > 0:
+                return self.optimizer.best_configurations(search_space, jobs)
+        except NotImplementedError:
+            self.__logger.warning(
+                f"{self.optimizer.name()} can not rank configurations, every job gets {best}"
+            )
+        return [best] * len(jobs)
@@ -0,0 +1,85 @@
+from typing import Callable
+
+import logging
+import threading
+import time
+
+from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.system_sample import SystemSample
+
+
+class FixedRateSampler:
+    """Samples a system service at a fixed rate in a background thread.
+
+    Sample times are scheduled from the start time on a monotonic clock, instead of sleeping a
+    fixed time after each sample, so the time a sample takes does not make the period drift.
+    When a sample takes longer than the interval, the ticks it overran are skipped. The first
+    sample is taken when the sampler starts, even when it is stopped right away. ``sample`` takes
+    a sample outside the schedule, one at a time with the background thread, since the system
+    services are not safe to use from two threads at once.
+    """
+
+    def __init__(
+        self,
+        system_service: SystemServiceInterface,
+        on_sample: Callable[[SystemSample], None],
+        interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if interval_seconds <= 0:
+            raise ValueError(f"The sample interval must be positive, got {interval_seconds}")
+        self.system_service = system_service
+        self.on_sample = on_sample
+        self.interval_seconds = interval_seconds
+        self.missed_ticks = 0
+        self._clock = clock
+        self._stopped = threading.Event()
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_until_stopped, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def sample(self) -> SystemSample:
+        with self._lock:
+            return self.system_service.sample()
+
+    def _sample_until_stopped(self):
+        start = self._clock()
+        tick = 0
+        while True:
+            self._sample()
+
+            tick += 1
+            now = self._clock()
+            behind = now - (start + tick * self.interval_seconds)
+            if behind > 0:
+                skipped = int(behind // self.interval_seconds) + 1
+                self.logger.debug(f"Sampling took too long, skipping {skipped} sample(s)")
+                self.missed_ticks += skipped
+                tick += skipped
+            if self._stopped.wait(start + tick * self.interval_seconds - now):
+                return
+
+    def _sample(self):
+        try:
+            self.on_sample(self.sample())
+        except Exception:
+            # A single failed reading, e.g. a BMC timeout, should not end the sampling of a run.
+            self.logger.exception("Failed to sample the system")
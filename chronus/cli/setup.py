@@ -1,15 +1,38 @@
-from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
-from chronus.SystemIntegration.optimizers.bruteforce_optmizer import BruteForceOptimizer
-from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
-from chronus.SystemIntegration.optimizers.random_tree_forrest import RandomTreeOptimizer
-
-
-def get_optimizer(model_type: str) -> OptimizerInterface:
-    if model_type == LinearRegressionOptimizer.name():
-        return LinearRegressionOptimizer()
-    elif model_type == BruteForceOptimizer.name():
-        return BruteForceOptimizer()
-    elif model_type == RandomTreeOptimizer.name():
-        return RandomTreeOptimizer()
-    else:
+from typing import TYPE_CHECKING
+
+import importlib
+
+if TYPE_CHECKING:
+    from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+
+# Optimizers are imported when they are asked for, so a command using the brute force optimizer
+# does not pay for importing pandas and sklearn.
+OPTIMIZERS = {
+    "brute-force": (
+        "chronus.SystemIntegration.optimizers.bruteforce_optmizer",
+        "BruteForceOptimizer",
+    ),
+    "pareto-front": (
+        "chronus.SystemIntegration.optimizers.pareto_optimizer",
+        "ParetoOptimizer",
+    ),
+    "linear-regression": (
+        "chronus.SystemIntegration.optimizers.linear_regression",
+        "LinearRegressionOptimizer",
+    ),
+    "random-tree": (
+        "chronus.SystemIntegration.optimizers.random_tree_forrest",
+        "RandomTreeOptimizer",
+    ),
+}
+
+
+def get_optimizer_class(model_type: str) -> type["OptimizerInterface"]:
+    if model_type not in OPTIMIZERS:
         raise Exception("Unknown optimizer type")
+    module_name, class_name = OPTIMIZERS[model_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_optimizer(model_type: str, **options) -> "OptimizerInterface":
+    return get_optimizer_class(model_type)(**options)
@@ -0,0 +1,57 @@
+"""Minimal client for the `chronus serve` daemon.
+
+Only the standard library is imported here, so a job-submit hook can ask for a configuration
+without paying for the imports of the full command line interface.
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = "/run/chronus/chronus.sock"
+
+
+class ConfigServerError(Exception):
+    pass
+
+
+def send_request(request: str, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 5.0) -> str:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(request.encode() + b"\n")
+        response = client.makefile("rb").readline().decode().rstrip("\n")
+    if response.startswith("error "):
+        raise ConfigServerError(response[len("error ") :])
+    return response
+
+
+def request_config(
+    cpu: str, socket_path: str = DEFAULT_SOCKET_PATH, requested_tasks: int = 0
+) -> str:
+    """Returns the configuration for the cpu as the JSON printed by `chronus slurm-config`."""
+    return send_request(f"config {cpu}\t{requested_tasks}", socket_path)
+
+
+def request_configs(cpu: str, jobs: list[dict], socket_path: str = DEFAULT_SOCKET_PATH) -> str:
+    """Returns the configurations for a burst of jobs as a JSON list, in the order of the jobs."""
+    return send_request(f"batch {cpu}\t{json.dumps(jobs)}", socket_path)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="chronus-config")
+    parser.add_argument("cpu", help="The cpu model to get the config for")
+    parser.add_argument("socket_path", nargs="?", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--tasks", type=int, default=0, help="The number of tasks of the job")
+    args = parser.parse_args(argv)
+    try:
+        print(request_config(args.cpu, args.socket_path, args.tasks))
+    except (OSError, ConfigServerError) as e:
+        print(f"chronus-config: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
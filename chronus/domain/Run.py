@@ -3,13 +3,13 @@ from dataclasses import dataclass
 
 from dataclasses_json import dataclass_json
 
-from chronus.domain.system_sample import SystemSample
+from chronus.domain.system_sample import SampleStatistics, SystemSample, SystemSamples
 
 
 @dataclass_json
 @dataclass(init=True, repr=True, eq=True, order=True)
 class Run:
-    samples: list[SystemSample] = None
+    samples: SystemSamples = None
     cpu: str = ""
     cores: int = 0
     threads_per_core: int = 1
@@ -23,7 +23,7 @@ class Run:
     __energy_used_joules: float = None
 
     def __post_init__(self):
-        self.samples = []
+        self.samples = SystemSamples()
         self.start_time = datetime.datetime.now()
 
     @property
@@ -50,15 +50,25 @@ class Run:
         return self.__energy_used_joules
 
     def _calculate_energy_used_joules(self) -> float:
-        energy = 0.0
-        previous_timestamp = self.samples[0].timestamp if len(self.samples) > 0 else None
-        previous_power_draw = self.samples[0].current_power_draw if len(self.samples) > 0 else None
-        for sample in self.samples:
-            time_delta = (sample.timestamp - previous_timestamp).total_seconds()
-            average_power = (sample.current_power_draw + previous_power_draw) / 2
-            energy += average_power * time_delta
-            previous_timestamp = sample.timestamp
-        return energy
+        return self.samples.energy_joules()
+
+    @property
+    def peak_power_draw(self) -> float:
+        return self.samples.peak_power_draw()
+
+    @property
+    def statistics(self) -> SampleStatistics:
+        """Live totals over the samples added so far, also while the run is in flight."""
+        return self.samples.statistics
+
+    def set_saved_totals(self, energy_used_joules: float, gflops_per_watt: float):
+        """Takes the energy and GFLOPS/W saved with the run, so they are known without loading
+        its samples. A sample added afterwards recomputes them from the samples."""
+        self.__energy_used_joules = energy_used_joules
+        self.__gflops_per_watt = gflops_per_watt
 
     def add_sample(self, sample: SystemSample):
         self.samples.append(sample)
+        # A new sample changes the energy, so values cached from earlier samples are stale.
+        self.__energy_used_joules = None
+        self.__gflops_per_watt = None
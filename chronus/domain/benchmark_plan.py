@@ -0,0 +1,58 @@
+from typing import Iterable
+
+from dataclasses import dataclass
+from enum import Enum
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.Run import Run
+
+
+class PlanStatus(str, Enum):
+    """How far a benchmark got with a configuration of its plan."""
+
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+@dataclass
+class PlannedConfiguration:
+    position: int
+    configuration: Configuration
+    status: PlanStatus = PlanStatus.PENDING
+
+
+@dataclass
+class BenchmarkPlan:
+    """The configurations a benchmark runs, in order, and the status of each.
+
+    The plan is saved before the first configuration runs and updated after each, so a benchmark
+    that was interrupted can be resumed from it instead of starting over.
+    """
+
+    benchmark_id: int
+    configurations: list[PlannedConfiguration]
+
+    @classmethod
+    def make(cls, benchmark_id: int, configurations: Iterable[Configuration]) -> "BenchmarkPlan":
+        return cls(
+            benchmark_id,
+            [
+                PlannedConfiguration(position, configuration)
+                for position, configuration in enumerate(configurations)
+            ],
+        )
+
+    def remaining(self, runs: Iterable[Run] = ()) -> list[PlannedConfiguration]:
+        """The configurations that have not completed, leaving out those with a finished run."""
+        measured = {
+            Configuration(run.cores, run.frequency, run.threads_per_core).key()
+            for run in runs
+            if run.end_time is not None
+        }
+        return [
+            planned
+            for planned in self.configurations
+            if planned.status is not PlanStatus.COMPLETED
+            and planned.configuration.key() not in measured
+        ]
@@ -13,6 +13,11 @@ class Configuration:
     frequency: int = 0
     threads_per_core: int = 0
 
+    def key(self) -> tuple:
+        """Cores, threads per core and frequency, which compares equal whether the frequency was
+        read as an int or a float."""
+        return self.cores, self.threads_per_core, float(self.frequency)
+
 
 def make_core_interval(cores_number: int):
     cores = []
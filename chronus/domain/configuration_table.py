@@ -0,0 +1,97 @@
+from typing import Optional
+
+import mmap
+import os
+import struct
+
+from chronus.domain.configuration import Configuration
+
+FILE_NAME = "configurations.table"
+
+MAGIC = b"CHRT"
+FORMAT_VERSION = 1
+CPU_NAME_BYTES = 64
+# magic, format version, record size, cpu name, number of records
+HEADER = struct.Struct(f"<4sHH{CPU_NAME_BYTES}sI")
+# cores, frequency, threads per core
+RECORD = struct.Struct("<III")
+
+
+class ConfigurationTable:
+    """The best configuration of one system for every number of requested tasks.
+
+    The table is a fixed size header followed by one fixed width record per number of requested
+    tasks, from 0 (the job did not ask for a number of tasks) up to all hardware threads of the
+    system. Looking up a configuration is reading one record at a known offset, so a table opened
+    from a file is memory-mapped instead of read.
+    """
+
+    def __init__(self, buffer):
+        magic, version, record_size, cpu_name, self._count = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            raise ValueError("Not a configuration table of a supported version")
+        self._cpu_name = cpu_name.rstrip(b"\0")
+        self._buffer = buffer
+
+    @classmethod
+    def from_configurations(
+        cls, cpu_name: str, configurations: list[Configuration]
+    ) -> "ConfigurationTable":
+        """Makes a table where ``configurations[n]`` is the configuration for n requested tasks."""
+        buffer = bytearray(HEADER.size + RECORD.size * len(configurations))
+        HEADER.pack_into(
+            buffer,
+            0,
+            MAGIC,
+            FORMAT_VERSION,
+            RECORD.size,
+            _encode_cpu_name(cpu_name),
+            len(configurations),
+        )
+        for i, conf in enumerate(configurations):
+            RECORD.pack_into(
+                buffer,
+                HEADER.size + i * RECORD.size,
+                conf.cores,
+                int(conf.frequency),
+                conf.threads_per_core,
+            )
+        return cls(bytes(buffer))
+
+    @classmethod
+    def open(cls, path: str) -> "ConfigurationTable":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path: str) -> None:
+        # Written next to the table and renamed, so readers never see half a table.
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(self._buffer)
+        os.replace(temporary_path, path)
+
+    @property
+    def cpu_name(self) -> str:
+        return self._cpu_name.decode(errors="ignore")
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, cpu_name: str = None, requested_tasks: int = 0) -> Optional[Configuration]:
+        """The configuration for the job, or None if the table is for another cpu.
+
+        Jobs asking for more tasks than the system has threads get the largest configuration.
+        """
+        if self._count == 0 or (
+            cpu_name is not None and _encode_cpu_name(cpu_name) != self._cpu_name
+        ):
+            return None
+        index = min(max(requested_tasks, 0), self._count - 1)
+        cores, frequency, threads_per_core = RECORD.unpack_from(
+            self._buffer, HEADER.size + index * RECORD.size
+        )
+        return Configuration(cores=cores, frequency=frequency, threads_per_core=threads_per_core)
+
+
+def _encode_cpu_name(cpu_name: str) -> bytes:
+    return cpu_name.encode()[:CPU_NAME_BYTES]
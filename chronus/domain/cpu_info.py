@@ -1,5 +1,7 @@
 from typing import List
 
+import hashlib
+import json
 from dataclasses import dataclass
 
 import dataclasses_json
@@ -18,3 +20,8 @@ class SystemInfo:
 
     def __hash__(self):
         return hash((self.cpu_name, self.cores, self.threads_per_core, tuple(self.frequencies)))
+
+    def digest(self) -> str:
+        """A hash of the system that, unlike ``hash``, is stable across processes."""
+        canonical = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()
@@ -1,3 +1,7 @@
+from chronus.domain.configuration import Configuration
+from chronus.domain.job_state import JobState
+
+
 class ApplicationRunnerInterface:
     gflops: float
     result: float
@@ -21,3 +25,17 @@ class ApplicationRunnerInterface:
 
     def cleanup(self):
         raise NotImplementedError()
+
+    def run_array(self, configurations: list[Configuration]) -> None:
+        """Runs every configuration in one job array, a task per configuration, one at a time."""
+        raise NotImplementedError()
+
+    def array_task_states(self) -> dict[int, JobState]:
+        """The state of each task of the job array, by the index of its configuration."""
+        raise NotImplementedError()
+
+    def array_task_gflops(self, task: int) -> float:
+        raise NotImplementedError()
+
+    def array_task_result(self, task: int) -> float:
+        raise NotImplementedError()
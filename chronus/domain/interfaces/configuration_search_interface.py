@@ -0,0 +1,17 @@
+from typing import Optional
+
+from chronus.domain.configuration import Configuration
+
+
+class ConfigurationSearchInterface:
+    def start(self, candidates: list[Configuration]) -> None:
+        """Starts a search of the candidates, forgetting what an earlier search measured."""
+        raise NotImplementedError()
+
+    def next_configuration(self) -> Optional[Configuration]:
+        """The configuration to measure next, or None when the search is done."""
+        raise NotImplementedError()
+
+    def observe(self, configuration: Configuration, gflops_per_watt: Optional[float]) -> None:
+        """The efficiency measured with a configuration, None when its job failed."""
+        raise NotImplementedError()
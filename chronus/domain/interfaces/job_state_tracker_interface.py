@@ -0,0 +1,10 @@
+from chronus.domain.job_state import JobState
+
+
+class JobStateTrackerInterface:
+    def states(self, job_ids: list[str]) -> dict[str, JobState]:
+        """The state of every job, array tasks are named <array job id>_<task id>."""
+        raise NotImplementedError()
+
+    def state(self, job_id: str) -> JobState:
+        return self.states([job_id])[job_id]
@@ -1,6 +1,12 @@
+from typing import TYPE_CHECKING
+
 from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
-from chronus.domain.Run import Run
+from chronus.domain.job import JobRequest, best_configurations
+
+if TYPE_CHECKING:
+    from chronus.domain.Run import Run
+    from chronus.domain.search_space import SearchSpace
 
 
 class OptimizerInterface:
@@ -11,9 +17,14 @@ class OptimizerInterface:
     def name(self) -> str:
         return self.__class__.name()
 
-    def make_model(self, runs: list[Run]) -> None:
+    def make_model(self, runs: list["Run"], system_info: SystemInfo = None) -> None:
+        """Trains the model, ``system_info`` is the system the runs were benchmarked on."""
         raise NotImplementedError()
 
+    def hyperparameters(self) -> dict:
+        """The settings that change the trained model, a new model is trained when they change."""
+        return {}
+
     def save(self, path_without_file_extension: str) -> None:
         raise NotImplementedError()
 
@@ -21,8 +32,24 @@ class OptimizerInterface:
         raise NotImplementedError()
 
     def run(self, path_local_model: str) -> Configuration:
+        """Loads the model saved locally by ``load`` and returns its best configuration."""
         raise NotImplementedError()
 
+    def predict(self, configurations: list[Configuration]) -> list[float]:
+        """Predicts the GFLOPS/W of each configuration with the trained or loaded model."""
+        raise NotImplementedError()
+
+    def best_configurations(
+        self, search_space: "SearchSpace", jobs: list[JobRequest]
+    ) -> list[Configuration]:
+        """The most efficient configuration for each job, from one pass of the model over the
+        search space."""
+        configurations, predicted_efficiencies = [], []
+        for conf, predicted_efficiency in search_space.rank(self.predict):
+            configurations.append(conf)
+            predicted_efficiencies.append(predicted_efficiency)
+        return best_configurations(configurations, predicted_efficiencies, jobs)
+
 
 class OptimizerRepositoryInterface:
     def save(self, optimizer: OptimizerInterface) -> str:
@@ -1,7 +1,11 @@
+from typing import Iterator, Optional
+
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlanStatus
 from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.model import Model
 from chronus.domain.Run import Run
+from chronus.domain.system_sample import SystemSample
 
 
 class RepositoryInterface:
@@ -14,12 +18,31 @@ class RepositoryInterface:
     def get_all_runs_from_system(self, system_info) -> list[Run]:
         raise NotImplementedError()
 
+    def iter_runs(
+        self, system_info: SystemInfo = None, batch_size: int = None, include_samples: bool = True
+    ) -> Iterator[Run]:
+        raise NotImplementedError()
+
+    def iter_samples(
+        self, run_ids: list[int] = None, batch_size: int = None
+    ) -> Iterator[tuple[int, SystemSample]]:
+        raise NotImplementedError()
+
     def save_benchmark(self, benchmark: Benchmark) -> int:
         raise NotImplementedError()
 
     def get_all_benchmarks(self) -> list[Benchmark]:
         raise NotImplementedError()
 
+    def save_plan(self, plan: BenchmarkPlan) -> None:
+        raise NotImplementedError()
+
+    def set_plan_status(self, benchmark_id: int, position: int, status: PlanStatus) -> None:
+        raise NotImplementedError()
+
+    def get_latest_plan(self, system_info: SystemInfo) -> Optional[BenchmarkPlan]:
+        raise NotImplementedError()
+
     def get_all_system_info(self) -> list[SystemInfo]:
         raise NotImplementedError()
 
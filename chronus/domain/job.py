@@ -0,0 +1,63 @@
+from typing import Iterable
+
+import math
+from dataclasses import dataclass
+
+import dataclasses_json
+
+from chronus.domain.configuration import Configuration
+
+
+@dataclasses_json.dataclass_json
+@dataclass
+class JobRequest:
+    """What a pending job asks the scheduler for.
+
+    The time limit (in minutes) and the application tag are passed on to the optimizers, the
+    models trained so far do not predict run time or tell applications apart and only use the
+    number of tasks and nodes.
+
+    The slowdown bound (runtime relative to the fastest configuration) and the energy budget (in
+    joules per GFLOP of work) trade energy for time, only the pareto-front optimizer knows the
+    runtimes to use them.
+    """
+
+    ntasks: int = 0
+    nodes: int = 1
+    time_limit: int = None
+    application: str = None
+    max_slowdown: float = None
+    energy_budget: float = None
+
+    @property
+    def tasks_per_node(self) -> int:
+        return math.ceil(self.ntasks / max(self.nodes, 1))
+
+    @property
+    def has_bounds(self) -> bool:
+        return self.max_slowdown is not None or self.energy_budget is not None
+
+
+def fits(configuration: Configuration, job: JobRequest) -> bool:
+    """Whether the configuration has a hardware thread for every task the job runs on a node."""
+    return configuration.cores * configuration.threads_per_core >= job.tasks_per_node
+
+
+def best_configurations(
+    configurations: list[Configuration],
+    predicted_efficiencies: Iterable[float],
+    jobs: list[JobRequest],
+) -> list[Configuration]:
+    """Picks the configuration with the highest predicted GFLOPS/W that fits each job.
+
+    Jobs that fit no configuration get the one with the most hardware threads, and None when
+    there are no configurations at all.
+    """
+    ranked = [
+        conf
+        for conf, _ in sorted(
+            zip(configurations, predicted_efficiencies), key=lambda pair: pair[1], reverse=True
+        )
+    ]
+    largest = max(configurations, key=lambda conf: conf.cores * conf.threads_per_core, default=None)
+    return [next((conf for conf in ranked if fits(conf, job)), largest) for job in jobs]
@@ -0,0 +1,62 @@
+from enum import Enum
+
+
+class JobState(str, Enum):
+    """The states of a Slurm job, as squeue and sacct name them."""
+
+    PENDING = "PENDING"
+    CONFIGURING = "CONFIGURING"
+    RUNNING = "RUNNING"
+    COMPLETING = "COMPLETING"
+    SUSPENDED = "SUSPENDED"
+    REQUEUED = "REQUEUED"
+    RESIZING = "RESIZING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+    TIMEOUT = "TIMEOUT"
+    NODE_FAIL = "NODE_FAIL"
+    OUT_OF_MEMORY = "OUT_OF_MEMORY"
+    PREEMPTED = "PREEMPTED"
+    BOOT_FAIL = "BOOT_FAIL"
+    DEADLINE = "DEADLINE"
+    REVOKED = "REVOKED"
+    SPECIAL_EXIT = "SPECIAL_EXIT"
+    # Slurm does not know the job (any more).
+    UNKNOWN = "UNKNOWN"
+
+    @classmethod
+    def parse(cls, state: str) -> "JobState":
+        """The state in the output of squeue or sacct, where cancelled jobs read 'CANCELLED by 1000'."""
+        words = state.split()
+        try:
+            return cls(words[0].rstrip("+")) if words else cls.UNKNOWN
+        except ValueError:
+            return cls.UNKNOWN
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the job has ended and its state will not change any more."""
+        return self in _TERMINAL_STATES
+
+    @property
+    def is_failed(self) -> bool:
+        """Whether the job ended without finishing its work."""
+        return self.is_terminal and self is not JobState.COMPLETED
+
+
+_TERMINAL_STATES = frozenset(
+    {
+        JobState.COMPLETED,
+        JobState.FAILED,
+        JobState.CANCELLED,
+        JobState.TIMEOUT,
+        JobState.NODE_FAIL,
+        JobState.OUT_OF_MEMORY,
+        JobState.PREEMPTED,
+        JobState.BOOT_FAIL,
+        JobState.DEADLINE,
+        JobState.REVOKED,
+        JobState.SPECIAL_EXIT,
+    }
+)
@@ -0,0 +1,104 @@
+from typing import TYPE_CHECKING, Optional
+
+import bisect
+from dataclasses import dataclass
+
+import dataclasses_json
+
+from chronus.domain.configuration import Configuration
+
+if TYPE_CHECKING:
+    from chronus.domain.Run import Run
+
+
+@dataclasses_json.dataclass_json
+@dataclass
+class ParetoPoint:
+    """The time and energy a configuration takes for a GFLOP of work, averaged over its runs.
+
+    HPCG runs for a fixed time, so the runtime and energy of whole runs would rank the
+    configurations by their power draw alone. Per GFLOP they are those of the same work.
+    """
+
+    configuration: Configuration
+    seconds_per_gflop: float
+    joules_per_gflop: float
+
+
+def points_from_runs(runs: list["Run"]) -> list[ParetoPoint]:
+    """One point per benchmarked configuration, skipping runs that did not finish or do work."""
+    measured = {}
+    for run in runs:
+        if run.end_time is None or run.gflops <= 0:
+            continue
+        runtime = (run.end_time - run.start_time).total_seconds()
+        if runtime <= 0:
+            continue
+        key = (run.cores, run.threads_per_core, run.frequency)
+        measured.setdefault(key, []).append(
+            (1 / run.gflops, run.energy_used_joules / (run.gflops * runtime))
+        )
+    return [
+        ParetoPoint(
+            configuration=Configuration(
+                cores=cores, frequency=frequency, threads_per_core=threads_per_core
+            ),
+            seconds_per_gflop=sum(seconds for seconds, _ in measurements) / len(measurements),
+            joules_per_gflop=sum(joules for _, joules in measurements) / len(measurements),
+        )
+        for (cores, threads_per_core, frequency), measurements in measured.items()
+    ]
+
+
+class ParetoFront:
+    """The configurations no other configuration beats on both time and energy per GFLOP.
+
+    The points are sorted fastest first, so energy falls along the front. Choosing a point for
+    a slowdown bound or an energy budget is a binary search.
+    """
+
+    def __init__(self, front: list[ParetoPoint]):
+        self.points = front
+        self._seconds = [point.seconds_per_gflop for point in front]
+        # Negated so the list is ascending like the seconds, as bisect needs.
+        self._negated_joules = [-point.joules_per_gflop for point in front]
+
+    @classmethod
+    def from_points(cls, points: list[ParetoPoint]) -> "ParetoFront":
+        front = []
+        for point in sorted(
+            points, key=lambda point: (point.seconds_per_gflop, point.joules_per_gflop)
+        ):
+            if not front or point.joules_per_gflop < front[-1].joules_per_gflop:
+                front.append(point)
+        return cls(front)
+
+    def __len__(self):
+        return len(self.points)
+
+    def choose(
+        self, max_slowdown: float = None, energy_budget: float = None
+    ) -> Optional[ParetoPoint]:
+        """The point that uses the least energy within the slowdown bound, or the fastest point
+        within the energy budget.
+
+        The slowdown is relative to the fastest configuration, 1.5 lets the job take half as long
+        again. The energy budget is in joules per GFLOP. With both, the least energy within the slowdown bound is chosen, and when that is
+        over the budget the fastest point within the budget. Without either the point using the
+        least energy is chosen. A budget below every point gets the point using the least energy.
+        """
+        if not self.points:
+            return None
+        least_energy = len(self.points) - 1
+        fastest_within_budget = least_energy
+        if energy_budget is not None:
+            within_budget = bisect.bisect_left(self._negated_joules, -energy_budget)
+            fastest_within_budget = min(within_budget, least_energy)
+        if max_slowdown is None:
+            return self.points[fastest_within_budget]
+
+        bound = self._seconds[0] * max(max_slowdown, 1.0)
+        least_energy_within_bound = bisect.bisect_right(self._seconds, bound) - 1
+        if energy_budget is None or fastest_within_budget <= least_energy_within_bound:
+            return self.points[least_energy_within_bound]
+        return self.points[fastest_within_budget]
@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+
+import heapq
+import itertools
+
+from chronus.domain.configuration import Configuration, make_core_interval
+from chronus.domain.cpu_info import SystemInfo
+
+if TYPE_CHECKING:
+    from chronus.domain.Run import Run
+
+CHUNK_SIZE = 4096
+
+
+class SearchSpace:
+    """The configurations of a system, generated lazily in the order of ``make_configurations``.
+
+    By default the space holds the core counts that are benchmarked, the powers of two. Models
+    can score many more configurations than can be benchmarked, so they search ``full_grid``.
+    Constraints narrow the space with ``where``, and ``rank`` scores it a chunk at a time so
+    memory stays bounded whatever the size of the space.
+    """
+
+    def __init__(
+        self,
+        system_info: SystemInfo,
+        cores: Sequence[int] = None,
+        frequencies: Sequence[float] = None,
+        constraints: tuple[Callable[[Configuration], bool], ...] = (),
+    ):
+        self.system_info = system_info
+        self.cores = list(make_core_interval(system_info.cores) if cores is None else cores)
+        self.threads_per_core = list(range(1, system_info.threads_per_core + 1))
+        self.frequencies = list(
+            (system_info.frequencies or []) if frequencies is None else frequencies
+        )
+        self.constraints = constraints
+
+    @classmethod
+    def full_grid(
+        cls, system_info: SystemInfo, core_stride: int = 1, frequency_stride: int = 1
+    ) -> "SearchSpace":
+        """Every core count and frequency of the system, or every n-th of them with a stride.
+
+        The largest core count and the highest frequency are always in the space.
+        """
+        frequencies = system_info.frequencies or []
+        return cls(
+            system_info,
+            cores=_every(list(range(1, system_info.cores + 1)), core_stride),
+            frequencies=_every(frequencies, frequency_stride),
+        )
+
+    @classmethod
+    def from_runs(cls, runs: list["Run"]) -> "SearchSpace":
+        """The full grid of the system the runs were benchmarked on, as far as they tell."""
+        system_info = SystemInfo(
+            cores=max((run.cores for run in runs), default=0),
+            threads_per_core=max((run.threads_per_core for run in runs), default=1),
+            frequencies=sorted({run.frequency for run in runs}),
+        )
+        return cls.full_grid(system_info)
+
+    def where(self, constraint: Callable[[Configuration], bool]) -> "SearchSpace":
+        """The configurations of this space that satisfy the constraint."""
+        return SearchSpace(
+            self.system_info, self.cores, self.frequencies, self.constraints + (constraint,)
+        )
+
+    def __iter__(self) -> Iterator[Configuration]:
+        for cores, threads_per_core, frequency in itertools.product(
+            self.cores, self.threads_per_core, self.frequencies
+        ):
+            conf = Configuration(cores, frequency, threads_per_core)
+            if all(constraint(conf) for constraint in self.constraints):
+                yield conf
+
+    def __len__(self):
+        if self.constraints:
+            return sum(1 for _ in self)
+        return len(self.cores) * len(self.threads_per_core) * len(self.frequencies)
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[list[Configuration]]:
+        configurations = iter(self)
+        while chunk := list(itertools.islice(configurations, chunk_size)):
+            yield chunk
+
+    def rank(
+        self,
+        predict: Callable[[list[Configuration]], Sequence[float]],
+        k: int = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> list[tuple[Configuration, float]]:
+        """Scores the space with ``predict`` a chunk at a time and returns the k best, best first.
+
+        Without k the whole space is returned ranked.
+        """
+        ranking = []
+        for chunk in self.chunks(chunk_size):
+            ranking.extend(zip(chunk, predict(chunk)))
+            if k is not None:
+                ranking = heapq.nlargest(k, ranking, key=lambda pair: pair[1])
+        if k is None:
+            ranking.sort(key=lambda pair: pair[1], reverse=True)
+        return ranking
+
+
+def _every(values: list, stride: int) -> list:
+    chosen = values[stride - 1 :: stride]
+    if values and values[-1] not in chosen:
+        chosen.append(values[-1])
+    return chosen
@@ -1,8 +1,11 @@
-from typing import TypedDict
+from typing import Iterable, Iterator, TypedDict
 
 import datetime
+import math
 from dataclasses import dataclass
 
+import numpy as np
+
 
 class CpuFreq(TypedDict):
     current: float
@@ -17,3 +20,189 @@ class SystemSample:
     cpu_power: float = 0.0
     cpu_temp: float = 0.0
     cpu_freq: [CpuFreq] = None
+    # Reading of a cumulative energy counter in joules, for sources that have one.
+    energy: float = None
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class SampleStatistics:
+    """Running totals over a series of samples, updated in O(1) for every added sample.
+
+    Energy and the means are trapezoidal integrals over time, so the means are time weighted.
+    Between two samples that both have an energy counter reading, the energy is the exact
+    difference of the readings instead.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.energy_joules = 0.0
+        self.duration_seconds = 0.0
+        self.min_power_draw = math.inf
+        self.max_power_draw = -math.inf
+        self.min_cpu_temp = math.inf
+        self.max_cpu_temp = -math.inf
+        self._cpu_temp_integral = 0.0
+        self._last_seconds = 0.0
+        self._last_power_draw = 0.0
+        self._last_cpu_temp = 0.0
+        self._last_energy = None
+
+    def add(self, seconds: float, power_draw: float, cpu_temp: float, energy: float = None) -> None:
+        if self.count > 0:
+            interval = seconds - self._last_seconds
+            self.duration_seconds += interval
+            if energy is not None and self._last_energy is not None:
+                self.energy_joules += energy - self._last_energy
+            else:
+                self.energy_joules += (power_draw + self._last_power_draw) / 2.0 * interval
+            self._cpu_temp_integral += (cpu_temp + self._last_cpu_temp) / 2.0 * interval
+        self.count += 1
+        self.min_power_draw = min(self.min_power_draw, power_draw)
+        self.max_power_draw = max(self.max_power_draw, power_draw)
+        self.min_cpu_temp = min(self.min_cpu_temp, cpu_temp)
+        self.max_cpu_temp = max(self.max_cpu_temp, cpu_temp)
+        self._last_seconds = seconds
+        self._last_power_draw = power_draw
+        self._last_cpu_temp = cpu_temp
+        self._last_energy = energy
+
+    @property
+    def mean_power_draw(self) -> float:
+        if self.duration_seconds == 0.0:
+            return self._last_power_draw
+        return self.energy_joules / self.duration_seconds
+
+    @property
+    def mean_cpu_temp(self) -> float:
+        if self.duration_seconds == 0.0:
+            return self._last_cpu_temp
+        return self._cpu_temp_integral / self.duration_seconds
+
+
+class SystemSamples:
+    """Columnar storage for the samples of a run.
+
+    Timestamps, power draw, cpu power and cpu temperature are kept in float64 arrays, while
+    indexing and iterating still gives SystemSample objects. Those are rebuilt on access, so
+    changing them does not change the stored sample. Aggregates are kept up to date in
+    ``statistics`` as samples are appended, so reading them never rescans the samples.
+    """
+
+    _INITIAL_CAPACITY = 16
+
+    def __init__(self, samples: Iterable[SystemSample] = ()):
+        self._size = 0
+        self._tzinfo = None
+        self._timestamps = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._power_draws = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._cpu_powers = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._cpu_temps = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._energies = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._cpu_freqs = []
+        self.statistics = SampleStatistics()
+        for sample in samples:
+            self.append(sample)
+
+    def append(self, sample: SystemSample) -> None:
+        if self._size == len(self._timestamps):
+            self._grow()
+        if self._size == 0:
+            self._tzinfo = sample.timestamp.tzinfo
+        seconds = self._to_seconds(sample.timestamp)
+        self._timestamps[self._size] = seconds
+        self._power_draws[self._size] = sample.current_power_draw
+        self._cpu_powers[self._size] = sample.cpu_power
+        self._cpu_temps[self._size] = sample.cpu_temp
+        self._energies[self._size] = np.nan if sample.energy is None else sample.energy
+        self._cpu_freqs.append(sample.cpu_freq)
+        self.statistics.add(seconds, sample.current_power_draw, sample.cpu_temp, sample.energy)
+        self._size += 1
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Seconds since the epoch of every sample."""
+        return self._timestamps[: self._size]
+
+    @property
+    def power_draws(self) -> np.ndarray:
+        return self._power_draws[: self._size]
+
+    @property
+    def cpu_powers(self) -> np.ndarray:
+        return self._cpu_powers[: self._size]
+
+    @property
+    def cpu_temps(self) -> np.ndarray:
+        return self._cpu_temps[: self._size]
+
+    @property
+    def energies(self) -> np.ndarray:
+        """Energy counter readings in joules, NaN for samples without one."""
+        return self._energies[: self._size]
+
+    def energy_joules(self) -> float:
+        """Trapezoidal integral of the power draw over the sample timestamps."""
+        return self.statistics.energy_joules
+
+    def duration_seconds(self) -> float:
+        return self.statistics.duration_seconds
+
+    def average_power_draw(self) -> float:
+        """Time weighted average of the power draw between the first and last sample."""
+        return self.statistics.mean_power_draw if self._size > 0 else 0.0
+
+    def peak_power_draw(self) -> float:
+        return self.statistics.max_power_draw if self._size > 0 else 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("sample index out of range")
+        return SystemSample(
+            timestamp=self._to_datetime(self._timestamps[index]),
+            current_power_draw=float(self._power_draws[index]),
+            cpu_power=float(self._cpu_powers[index]),
+            cpu_temp=float(self._cpu_temps[index]),
+            cpu_freq=self._cpu_freqs[index],
+            energy=None if np.isnan(self._energies[index]) else float(self._energies[index]),
+        )
+
+    def __iter__(self) -> Iterator[SystemSample]:
+        return (self[i] for i in range(self._size))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SystemSamples, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SystemSamples({list(self)!r})"
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._timestamps)
+        self._timestamps = np.resize(self._timestamps, capacity)
+        self._power_draws = np.resize(self._power_draws, capacity)
+        self._cpu_powers = np.resize(self._cpu_powers, capacity)
+        self._cpu_temps = np.resize(self._cpu_temps, capacity)
+        self._energies = np.resize(self._energies, capacity)
+
+    @staticmethod
+    def _to_seconds(timestamp: datetime.datetime) -> float:
+        # Naive timestamps are subtracted from a naive epoch, so the differences are the same as
+        # subtracting the datetimes, also across daylight saving changes.
+        if timestamp.tzinfo is None:
+            return (timestamp - _EPOCH).total_seconds()
+        return timestamp.timestamp()
+
+    def _to_datetime(self, seconds: float) -> datetime.datetime:
+        if self._tzinfo is None:
+            return _EPOCH + datetime.timedelta(seconds=float(seconds))
+        return datetime.datetime.fromtimestamp(float(seconds), tz=self._tzinfo)
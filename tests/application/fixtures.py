@@ -1,3 +1,6 @@
+from typing import Iterator, Optional
+
+import copy
 import subprocess
 from datetime import datetime
 
@@ -5,11 +8,19 @@ import pytest
 
 from chronus.application.benchmark_service import JobFailedException
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlanStatus
+from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.application_runner_interface import ApplicationRunnerInterface
+from chronus.domain.interfaces.configuration_search_interface import (
+    ConfigurationSearchInterface,
+)
 from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
+from chronus.domain.interfaces.settings_interface import LocalStorageInterface
 from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.job_state import JobState
+from chronus.domain.LocalSettings import LocalSettings
 from chronus.domain.model import Model
 from chronus.domain.Run import Run
 from chronus.domain.system_sample import SystemSample
@@ -109,6 +120,49 @@ class FakeApplication(ApplicationRunnerInterface):
         return is_running
 
 
+class FakeArrayApplication(FakeApplication):
+    """Answers each poll of the task states with the next states of the timeline, the last
+    states are repeated once the timeline is over."""
+
+    def __init__(self, timeline: list[dict[int, JobState]]):
+        super().__init__()
+        self.timeline = timeline
+        self.polls = 0
+        self.submitted: list[list[Configuration]] = []
+
+    @property
+    def states(self) -> dict[int, JobState]:
+        return self.timeline[min(self.polls, len(self.timeline)) - 1] if self.polls else {}
+
+    def run_array(self, configurations: list[Configuration]) -> None:
+        self.submitted.append(configurations)
+        self.polls = 0
+
+    def array_task_states(self) -> dict[int, JobState]:
+        self.polls += 1
+        return self.states
+
+    def array_task_gflops(self, task: int) -> float:
+        return 10.0 + task
+
+    def array_task_result(self, task: int) -> float:
+        return 100.0 + task
+
+
+class FakeArraySystemService(SystemServiceInterface):
+    """Draws the power of the running task of the application, 100 W times its index plus one."""
+
+    def __init__(self, application: FakeArrayApplication):
+        self.application = application
+
+    def sample(self) -> SystemSample:
+        running = [
+            task for task, state in self.application.states.items() if state is JobState.RUNNING
+        ]
+        power_draw = 100.0 * (running[0] + 1) if running else 0.0
+        return SystemSample(timestamp=datetime.now(), current_power_draw=power_draw)
+
+
 class FakeBencmarkRepository(RepositoryInterface):
     def get_all_system_info(self) -> list[SystemInfo]:
         return [
@@ -124,11 +178,12 @@ class FakeBencmarkRepository(RepositoryInterface):
     benchmarks: list[Benchmark]
     models: list[Model]
 
-    def __init__(self, benchmark: Benchmark = None):
+    def __init__(self, benchmark: Benchmark = None, plan: BenchmarkPlan = None):
         self.runs = []
         self.benchmarks = []
         self._benchmark = benchmark
         self.models = []
+        self.plans = [] if plan is None else [plan]
 
     def save_run(self, run: Run) -> None:
         self.called_save_run += 1
@@ -150,9 +205,64 @@ class FakeBencmarkRepository(RepositoryInterface):
     def get_all_benchmarks(self) -> list[Benchmark]:
         return []
 
+    def iter_runs(
+        self, system_info: SystemInfo = None, batch_size: int = None, include_samples: bool = True
+    ) -> Iterator[Run]:
+        return iter(list(self.runs))
+
+    def save_plan(self, plan: BenchmarkPlan) -> None:
+        self.plans.append(copy.deepcopy(plan))
+
+    def set_plan_status(self, benchmark_id: int, position: int, status: PlanStatus) -> None:
+        plan = next(plan for plan in self.plans if plan.benchmark_id == benchmark_id)
+        plan.configurations[position].status = status
+
+    def get_latest_plan(self, system_info: SystemInfo) -> Optional[BenchmarkPlan]:
+        return copy.deepcopy(self.plans[-1]) if self.plans else None
+
     def save_model(self, model: Model) -> int:
         self.models.append(model)
-        return 1
+        model.id = len(self.models)
+        return model.id
 
     def get_all_models(self) -> list[Model]:
         return self.models
+
+    def get_model(self, model_id: int) -> Model:
+        return self.models[model_id - 1]
+
+
+class FakeSearch(ConfigurationSearchInterface):
+    """Proposes the first ``runs`` candidates in order and records what it observes."""
+
+    def __init__(self, runs: int):
+        self.runs = runs
+        self.candidates = []
+        self.observed = []
+
+    def start(self, candidates: list[Configuration]) -> None:
+        self.candidates = candidates
+        self.observed = []
+
+    def next_configuration(self) -> Optional[Configuration]:
+        observed = [configuration for configuration, _ in self.observed]
+        proposed = [c for c in self.candidates[: self.runs] if c not in observed]
+        return proposed[0] if proposed else None
+
+    def observe(self, configuration: Configuration, gflops_per_watt: Optional[float]) -> None:
+        self.observed.append((configuration, gflops_per_watt))
+
+
+class FakeLocalStorage(LocalStorageInterface):
+    def __init__(self, root: str):
+        self.root = root
+        self.settings = None
+
+    def save_settings(self, settings: LocalSettings):
+        self.settings = settings
+
+    def get_settings(self) -> LocalSettings:
+        return self.settings
+
+    def get_full_path(self, relative_path: str):
+        return self.root + "/" + relative_path
@@ -8,15 +8,23 @@ from freezegun import freeze_time
 
 from chronus.application.benchmark_service import BenchmarkService
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlanStatus
+from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.application_runner_interface import ApplicationRunnerInterface
 from chronus.domain.interfaces.cpu_info_service_interface import CpuInfoServiceInterface
 from chronus.domain.interfaces.repository_interface import RepositoryInterface
 from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.job_state import JobState
+from chronus.domain.Run import Run
+from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
 from tests.application.fixtures import (
     FakeApplication,
+    FakeArrayApplication,
+    FakeArraySystemService,
     FakeBencmarkRepository,
     FakeCpuInfoService,
+    FakeSearch,
     FakeSystemService,
 )
 from tests.fixtures import datetime_from_string
@@ -109,7 +117,6 @@ def test_benchmark_have_result_after_run():
     assert run.flop == 100.0
 
 
-
 def test_benchmark_saved_after_each_configuration(skip_sleep):
     # Arrange
     mock_sleep = skip_sleep()
@@ -197,6 +204,25 @@ def test_calls_prepare_before_each_run(skip_sleep):
     assert application_runner.prepare_called == 2
 
 
+def test_runs_with_the_threads_per_core_of_the_configuration(skip_sleep):
+    # Arrange
+    class RecordingApplication(FakeApplication):
+        threads = []
+
+        def run(self, cores: int, frequency: float, thread_per_core=1):
+            self.threads.append(thread_per_core)
+
+    application_runner = RecordingApplication()
+    benchmark = benchmark_fixture(application=application_runner)
+    benchmark.set_configurations([Configuration(cores=1, frequency=1.0, threads_per_core=2)])
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert application_runner.threads == [2]
+
+
 @freezegun.freeze_time("2021-01-01 00:00:00")
 def test_benchmark_set_end_time_after_run_is_completed(skip_sleep):
     # Arrange
@@ -226,3 +252,308 @@ def test_saves_benchmark_benchmark_model_on_every_run(skip_sleep):
     # Assert
     assert repository.called_save_benchmark == 1
     assert len(repository.benchmarks) == 1
+
+
+def test_warns_when_mean_power_draw_is_over_budget(skip_sleep, caplog):
+    # Arrange
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0]),
+        application_runner=FakeApplication(2),
+        system_service=FakeSystemService(power_draw=300.0),
+        benchmark_repository=FakeBencmarkRepository(),
+        power_budget=200.0,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert "over the power budget of 200.0 W" in caplog.text
+
+
+def test_job_array_saves_a_run_for_every_completed_task():
+    # Arrange
+    repository = FakeBencmarkRepository()
+    states = [
+        {0: JobState.RUNNING, 1: JobState.PENDING, 2: JobState.PENDING},
+        {0: JobState.COMPLETED, 1: JobState.FAILED, 2: JobState.RUNNING},
+        {0: JobState.COMPLETED, 1: JobState.FAILED, 2: JobState.COMPLETED},
+    ]
+    application = FakeArrayApplication([state for state in states for _ in range(5)])
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0, 3.0]),
+        application_runner=application,
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        sample_interval=0.001,
+        job_poll_interval=0.01,
+        array_size=3,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert len(application.submitted) == 1
+    assert [run.frequency for run in repository.runs] == [1.0, 3.0]
+    assert [run.gflops for run in repository.runs] == [10.0, 12.0]
+    assert application.prepare_called == 1
+    assert application.cleanup_called == 1
+
+
+def test_job_arrays_hold_at_most_array_size_configurations(skip_sleep):
+    # Arrange
+    application = FakeArrayApplication([{0: JobState.COMPLETED, 1: JobState.COMPLETED}])
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0, 3.0]),
+        application_runner=application,
+        system_service=FakeSystemService(),
+        benchmark_repository=FakeBencmarkRepository(),
+        array_size=2,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert [len(configurations) for configurations in application.submitted] == [2, 1]
+
+
+def test_job_array_samples_belong_to_the_running_task():
+    # Arrange
+    repository = FakeBencmarkRepository()
+    # Every state is polled a few times, with a poll where no task runs between the tasks.
+    states = [
+        {0: JobState.RUNNING, 1: JobState.PENDING},
+        {0: JobState.COMPLETED, 1: JobState.PENDING},
+        {0: JobState.COMPLETED, 1: JobState.RUNNING},
+        {0: JobState.COMPLETED, 1: JobState.COMPLETED},
+    ]
+    application = FakeArrayApplication([state for state in states for _ in range(5)])
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0]),
+        application_runner=application,
+        system_service=FakeArraySystemService(application),
+        benchmark_repository=repository,
+        sample_interval=0.001,
+        job_poll_interval=0.01,
+        array_size=2,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    first, second = repository.runs
+    assert 100.0 in first.samples.power_draws
+    assert set(first.samples.power_draws) <= {0.0, 100.0}
+    assert 200.0 in second.samples.power_draws
+    assert set(second.samples.power_draws) <= {0.0, 200.0}
+
+
+def test_saves_the_plan_with_the_status_of_each_configuration(skip_sleep):
+    # Arrange
+    repository = FakeBencmarkRepository()
+    benchmark = benchmark_fixture(
+        cpu_info_service=FakeCpuInfoService(cores=2, frequencies=[1.0]),
+        benchmark_repository=repository,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    (plan,) = repository.plans
+    assert [planned.configuration.cores for planned in plan.configurations] == [1, 2]
+    assert all(planned.status is PlanStatus.COMPLETED for planned in plan.configurations)
+
+
+def test_plan_marks_failed_configurations(skip_sleep):
+    # Arrange
+    repository = FakeBencmarkRepository()
+    benchmark = benchmark_fixture(
+        application=FakeApplication(raise_job_error=True), benchmark_repository=repository
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert repository.plans[0].configurations[0].status is PlanStatus.FAILED
+
+
+def test_resume_runs_the_failed_and_unmeasured_configurations_of_the_last_plan(skip_sleep):
+    # Arrange
+    configurations = [Configuration(cores, 1.0, 1) for cores in (1, 2, 4, 8)]
+    plan = BenchmarkPlan.make(3, configurations)
+    plan.configurations[0].status = PlanStatus.COMPLETED
+    plan.configurations[1].status = PlanStatus.FAILED
+    repository = FakeBencmarkRepository(plan=plan)
+    measured = Run(cores=8, frequency=1.0, threads_per_core=1, benchmark_id=2)
+    measured.finish()
+    repository.runs.append(measured)
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=8, frequencies=[1.0]),
+        application_runner=FakeApplication(),
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        resume=True,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    resumed = repository.runs[1:]
+    assert [run.cores for run in resumed] == [2, 4]
+    assert all(run.benchmark_id == 3 for run in resumed)
+    assert repository.called_save_benchmark == 0
+    statuses = [planned.status for planned in repository.plans[0].configurations]
+    assert statuses[:3] == [PlanStatus.COMPLETED] * 3
+
+
+def test_resume_without_a_plan_starts_a_new_benchmark(skip_sleep):
+    # Arrange
+    repository = FakeBencmarkRepository()
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0]),
+        application_runner=FakeApplication(),
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        resume=True,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert repository.called_save_benchmark == 1
+    assert len(repository.plans) == 1
+    assert len(repository.runs) == 1
+
+
+def test_search_runs_only_the_configurations_it_picks(skip_sleep):
+    # Arrange
+    repository = FakeBencmarkRepository()
+    search = FakeSearch(runs=2)
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=8, frequencies=[1.0, 2.0]),
+        application_runner=FakeApplication(),
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        search=search,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert len(search.candidates) == 8
+    assert [(run.cores, run.frequency) for run in repository.runs] == [(1, 1.0), (1, 2.0)]
+    assert [gflops_per_watt for _, gflops_per_watt in search.observed] == [
+        run.gflops_per_watt for run in repository.runs
+    ]
+    assert repository.plans == []
+
+
+def test_search_observes_failed_configurations(skip_sleep):
+    # Arrange
+    search = FakeSearch(runs=1)
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0]),
+        application_runner=FakeApplication(raise_job_error=True),
+        system_service=FakeSystemService(),
+        benchmark_repository=FakeBencmarkRepository(),
+        search=search,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert search.observed == [(Configuration(1, 1.0, 1), None)]
+
+
+def test_resumed_search_starts_from_the_runs_of_the_system(skip_sleep):
+    # Arrange
+    repository = FakeBencmarkRepository()
+    measured = Run(cores=1, frequency=1.0, threads_per_core=1, gflops=10.0, benchmark_id=1)
+    measured.finish()
+    repository.runs.append(measured)
+    search = FakeSearch(runs=2)
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0]),
+        application_runner=FakeApplication(),
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        resume=True,
+        search=search,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert search.observed[0] == (Configuration(1, 1.0, 1), measured.gflops_per_watt)
+    assert [(run.cores, run.frequency) for run in repository.runs[1:]] == [(1, 2.0)]
+
+
+def test_job_array_task_that_completes_between_polls_is_not_saved_without_samples(
+    skip_sleep, tmp_path
+):
+    # Arrange
+    (tmp_path / "test.db").touch()
+    repository = SqliteRepository(tmp_path / "test.db")
+    application = FakeArrayApplication(
+        [
+            {0: JobState.PENDING, 1: JobState.PENDING},
+            {0: JobState.COMPLETED, 1: JobState.RUNNING},
+            {0: JobState.COMPLETED, 1: JobState.COMPLETED},
+        ]
+    )
+    search = FakeSearch(runs=2)
+    benchmark = BenchmarkService(
+        cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0]),
+        application_runner=application,
+        system_service=FakeSystemService(),
+        benchmark_repository=repository,
+        array_size=2,
+        search=search,
+    )
+
+    # Act
+    benchmark.run()
+
+    # Assert
+    assert search.observed[0] == (Configuration(1, 1.0, 1), None)
+    for run in repository.get_all_runs():
+        assert len(run.samples) >= 2
+        assert run.end_time > run.start_time
+
+
+def test_resumed_search_observes_the_saved_efficiency(skip_sleep, tmp_path):
+    # Arrange
+    (tmp_path / "test.db").touch()
+    repository = SqliteRepository(tmp_path / "test.db")
+
+    def search_benchmark(search: FakeSearch, resume: bool) -> BenchmarkService:
+        return BenchmarkService(
+            cpu_info_service=FakeCpuInfoService(cores=1, frequencies=[1.0, 2.0]),
+            application_runner=FakeApplication(gflops=10.0),
+            system_service=FakeSystemService(power_draw=40.0),
+            benchmark_repository=repository,
+            resume=resume,
+            search=search,
+        )
+
+    first_search = FakeSearch(runs=1)
+    search_benchmark(first_search, resume=False).run()
+    resumed_search = FakeSearch(runs=2)
+
+    # Act
+    search_benchmark(resumed_search, resume=True).run()
+
+    # Assert
+    [(configuration, live_efficiency)] = first_search.observed
+    assert resumed_search.observed[0] == (configuration, pytest.approx(live_efficiency))
+    assert live_efficiency != pytest.approx(10.0)
@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+from chronus.application.campaign_service import CampaignFailedException, CampaignService
+from chronus.domain.configuration import Configuration
+from chronus.domain.job_state import JobState
+from tests.application.fixtures import (
+    FakeApplication,
+    FakeArrayApplication,
+    FakeBencmarkRepository,
+    FakeCpuInfoService,
+    FakeSystemService,
+)
+
+CONFIGURATIONS = [
+    Configuration(cores=cores, frequency=1.0, threads_per_core=1) for cores in range(1, 9)
+]
+
+
+class RecordingApplication(FakeApplication):
+    """Records the configurations it ran, and waits for the other nodes to start before it
+    runs its first, so every node gets a share of the configurations."""
+
+    def __init__(self, started: threading.Barrier):
+        super().__init__(seconds=0)
+        self.started = started
+        self.ran: list[int] = []
+
+    def run(self, cores: int, frequency: float, thread_per_core=1):
+        if not self.ran:
+            self.started.wait(timeout=5)
+        self.ran.append(cores)
+
+
+class FailingApplication(RecordingApplication):
+    """Fails to submit the second configuration it takes."""
+
+    def run(self, cores: int, frequency: float, thread_per_core=1):
+        if self.ran:
+            raise ConnectionError("sbatch: error: Slurm controller not responding")
+        super().run(cores, frequency, thread_per_core)
+
+
+class FailingArrayApplication(FakeApplication):
+    """Waits for the other node to submit its first array, then fails to submit its own."""
+
+    def __init__(self, started: threading.Barrier):
+        super().__init__()
+        self.started = started
+
+    def run_array(self, configurations: list[Configuration]) -> None:
+        self.started.wait(timeout=5)
+        raise ConnectionError("sbatch: error: Slurm controller not responding")
+
+
+class WaitingArrayApplication(FakeArrayApplication):
+    def __init__(self, started: threading.Barrier):
+        super().__init__([{task: JobState.COMPLETED for task in range(3)}])
+        self.started = started
+
+    def run_array(self, configurations: list[Configuration]) -> None:
+        if not self.submitted:
+            self.started.wait(timeout=5)
+        super().run_array(configurations)
+
+
+class BrokenSystemService(FakeSystemService):
+    def __init__(self):
+        raise ConnectionError("The BMC does not answer")
+
+
+def campaign_fixture(nodes, make_application_runner, make_system_service=None, array_size=0):
+    return CampaignService(
+        nodes=nodes,
+        cpu_info_service=FakeCpuInfoService(cores=8, frequencies=[1.0]),
+        make_application_runner=make_application_runner,
+        make_system_service=make_system_service or (lambda node: FakeSystemService()),
+        benchmark_repository=FakeBencmarkRepository(),
+        job_poll_interval=0.001,
+        array_size=array_size,
+    )
+
+
+def test_campaign_runs_every_configuration_once_spread_over_the_nodes():
+    # Arrange
+    started = threading.Barrier(3)
+    applications = {node: RecordingApplication(started) for node in ["n1", "n2", "n3"]}
+    campaign = campaign_fixture(list(applications), applications.get)
+    campaign.set_configurations(CONFIGURATIONS)
+
+    # Act
+    campaign.run()
+
+    # Assert
+    ran = [cores for application in applications.values() for cores in application.ran]
+    assert sorted(ran) == [conf.cores for conf in CONFIGURATIONS]
+    assert all(application.ran for application in applications.values())
+    assert len(campaign.repository.runs) == len(CONFIGURATIONS)
+
+
+def test_campaign_leaves_the_configurations_of_a_failed_node_to_the_others():
+    # Arrange
+    application = RecordingApplication(threading.Barrier(1))
+    campaign = campaign_fixture(
+        ["broken", "n1"],
+        lambda node: application,
+        lambda node: BrokenSystemService() if node == "broken" else FakeSystemService(),
+    )
+    campaign.set_configurations(CONFIGURATIONS)
+
+    # Act
+    campaign.run()
+
+    # Assert
+    assert application.ran == [conf.cores for conf in CONFIGURATIONS]
+
+
+def test_campaign_puts_back_the_configuration_a_node_was_running_when_it_failed():
+    # Arrange
+    started = threading.Barrier(2)
+    applications = {"flaky": FailingApplication(started), "n1": RecordingApplication(started)}
+    campaign = campaign_fixture(list(applications), applications.get)
+    campaign.set_configurations(CONFIGURATIONS)
+
+    # Act
+    campaign.run()
+
+    # Assert
+    assert len(applications["flaky"].ran) == 1
+    ran = [cores for application in applications.values() for cores in application.ran]
+    assert sorted(ran) == [conf.cores for conf in CONFIGURATIONS]
+
+
+def test_campaign_puts_back_the_job_array_a_node_was_running_when_it_failed():
+    # Arrange
+    started = threading.Barrier(2)
+    healthy = WaitingArrayApplication(started)
+    applications = {"flaky": FailingArrayApplication(started), "n1": healthy}
+    campaign = campaign_fixture(list(applications), applications.get, array_size=3)
+    campaign.set_configurations(CONFIGURATIONS)
+
+    # Act
+    campaign.run()
+
+    # Assert
+    submitted = [conf.cores for array in healthy.submitted for conf in array]
+    assert sorted(submitted) == [conf.cores for conf in CONFIGURATIONS]
+
+
+def test_campaign_fails_when_every_node_fails():
+    # Arrange
+    campaign = campaign_fixture(
+        ["n1", "n2"], lambda node: FakeApplication(), lambda node: BrokenSystemService()
+    )
+    campaign.set_configurations(CONFIGURATIONS)
+
+    # Act / Assert
+    with pytest.raises(CampaignFailedException):
+        campaign.run()
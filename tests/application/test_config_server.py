@@ -0,0 +1,146 @@
+import json
+import threading
+
+import pytest
+
+from chronus.application.config_server import ConfigServer
+from chronus.client import ConfigServerError, main, request_config, request_configs, send_request
+from chronus.domain.configuration import Configuration
+from chronus.domain.job import JobRequest
+
+
+class FakeRunModelService:
+    def __init__(self, conf: Configuration):
+        self.conf = conf
+        self.runs = 0
+        self.reloads = 0
+
+    def reload(self) -> None:
+        self.reloads += 1
+
+    def run(self, cpu: str = None, requested_tasks: int = 0) -> Configuration:
+        self.runs += 1
+        if requested_tasks > self.conf.cores:
+            return Configuration(requested_tasks, self.conf.frequency, self.conf.threads_per_core)
+        return self.conf
+
+    def query_batch(self, jobs: list[JobRequest], cpu: str = None) -> list[Configuration]:
+        return [self.run(cpu, job.tasks_per_node) for job in jobs]
+
+
+@pytest.fixture
+def serving(tmp_path):
+    servers = []
+
+    def start(run_model_service) -> str:
+        socket_path = str(tmp_path / "chronus.sock")
+        server = ConfigServer(run_model_service, socket_path)
+        server.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return socket_path
+
+    yield start
+
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+
+
+def test_config_is_answered_from_the_model_in_memory(serving):
+    # Arrange
+    run_model_service = FakeRunModelService(Configuration(8, 2200000.0, 2))
+    socket_path = serving(run_model_service)
+
+    # Act
+    responses = [request_config("AMD EPYC 7502P", socket_path) for _ in range(3)]
+
+    # Assert
+    assert [json.loads(r) for r in responses] == [
+        {"cores": 8, "frequency": 2200000, "threads_per_core": 2}
+    ] * 3
+    assert run_model_service.runs == 2
+
+
+def test_config_for_requested_tasks(serving):
+    # Arrange
+    socket_path = serving(FakeRunModelService(Configuration(8, 2200000, 2)))
+
+    # Act
+    response = request_config("AMD EPYC 7502P", socket_path, requested_tasks=16)
+
+    # Assert
+    assert json.loads(response)["cores"] == 16
+
+
+def test_batch_of_jobs_is_answered_in_order(serving):
+    # Arrange
+    socket_path = serving(FakeRunModelService(Configuration(8, 2200000, 2)))
+    jobs = [{"ntasks": 32, "nodes": 2}, {"ntasks": 4, "time_limit": 60, "application": "hpcg"}]
+
+    # Act
+    response = request_configs("AMD EPYC 7502P", jobs, socket_path)
+
+    # Assert
+    assert [conf["cores"] for conf in json.loads(response)] == [16, 8]
+
+
+def test_reload_reads_the_model_again(serving):
+    # Arrange
+    run_model_service = FakeRunModelService(Configuration(8, 2200000, 2))
+    socket_path = serving(run_model_service)
+    run_model_service.conf = Configuration(16, 1500000, 1)
+
+    # Act
+    reloaded = send_request("reload", socket_path)
+
+    # Assert
+    assert reloaded == "ok"
+    assert run_model_service.reloads == 2
+    assert json.loads(request_config("cpu", socket_path))["cores"] == 16
+
+
+def test_unknown_request_is_an_error(serving):
+    # Arrange
+    socket_path = serving(FakeRunModelService(Configuration(8, 2200000, 2)))
+
+    # Act / Assert
+    with pytest.raises(ConfigServerError):
+        send_request("delete everything", socket_path)
+
+
+def test_client_prints_config(serving, capsys):
+    # Arrange
+    socket_path = serving(FakeRunModelService(Configuration(4, 1500000, 1)))
+
+    # Act
+    exit_code = main(["cpu", socket_path, "--tasks", "2"])
+
+    # Assert
+    assert exit_code == 0
+    assert json.loads(capsys.readouterr().out) == {
+        "cores": 4,
+        "frequency": 1500000,
+        "threads_per_core": 1,
+    }
+
+
+def test_client_fails_without_server(tmp_path):
+    assert main(["cpu", str(tmp_path / "missing.sock")]) == 1
+
+
+def test_socket_is_removed_on_shutdown(tmp_path):
+    # Arrange
+    socket_path = tmp_path / "chronus.sock"
+    server = ConfigServer(FakeRunModelService(Configuration(1, 1, 1)), str(socket_path))
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    # Act
+    server.shutdown()
+    thread.join()
+
+    # Assert
+    assert not socket_path.exists()
@@ -1,8 +1,23 @@
+import os
+from datetime import datetime
+
 from chronus.application.init_model_service import InitModelService
+from chronus.application.load_model_service import LoadModelService
+from chronus.application.model_store import ModelStore
+from chronus.application.run_model_service import RunModelService
 from chronus.domain.configuration import Configuration
+from chronus.domain.configuration_table import FILE_NAME as CONFIGURATION_TABLE_FILE_NAME
+from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+from chronus.domain.job import JobRequest
+from chronus.domain.model import Model
 from chronus.domain.Run import Run
-from tests.application.fixtures import FakeBencmarkRepository, FakeCpuInfoService
+from chronus.SystemIntegration.optimizers.bruteforce_optmizer import BruteForceOptimizer
+from tests.application.fixtures import (
+    FakeBencmarkRepository,
+    FakeCpuInfoService,
+    FakeLocalStorage,
+)
 
 
 class FakeOptimizer(OptimizerInterface):
@@ -22,7 +37,7 @@ class FakeOptimizer(OptimizerInterface):
     def __init__(self, return_id: int):
         self.id = return_id
 
-    def make_model(self, runs: list[Run]) -> None:
+    def make_model(self, runs: list[Run], system_info: SystemInfo = None) -> None:
         return
 
 
@@ -32,8 +47,195 @@ def test_init_model_saves_model_to_repo(tmp_path):
     optimizer = FakeOptimizer(return_id=1)
 
     # act
-    model_service = InitModelService(repository, optimizer, 0)
+    model_service = InitModelService(repository, optimizer, 0, ModelStore(str(tmp_path)))
     model_service.run()
 
     # assert
     assert len(repository.get_all_models()) == 1
+
+
+def _load_brute_force_model(
+    tmp_path, best_run: Run
+) -> tuple[FakeLocalStorage, BruteForceOptimizer]:
+    optimizer = BruteForceOptimizer()
+    optimizer.make_model([best_run])
+    optimizer.save(str(tmp_path / "trained"))
+    repository = FakeBencmarkRepository()
+    repository.save_model(
+        Model(
+            name="model",
+            system_info=SystemInfo(cpu_name="Fake CPU", cores=4, frequencies=[1.0, 2.0]),
+            path_to_model=str(tmp_path / "trained"),
+            type=optimizer.name(),
+            created_at=datetime.now(),
+        )
+    )
+    local_storage = FakeLocalStorage(str(tmp_path))
+    LoadModelService(
+        repository,
+        BruteForceOptimizer(),
+        local_storage,
+        model_id=1,
+        cpu_info_service=FakeCpuInfoService(cores=4, frequencies=[1.0, 2.0]),
+    ).run()
+    return local_storage, optimizer
+
+
+def test_load_model_precompiles_configuration_table(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    run_model = RunModelService(local_storage, optimizer=None)
+
+    # Act
+    conf = run_model.run("Fake CPU")
+
+    # Assert
+    assert conf == Configuration(cores=2, frequency=2, threads_per_core=1)
+    assert run_model.run("Fake CPU", requested_tasks=3).cores == 3
+
+
+def test_load_model_precompiles_best_run_off_the_grid(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=3.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    run_model = RunModelService(local_storage, optimizer=None)
+
+    # Act
+    conf = run_model.run("Fake CPU")
+
+    # Assert
+    assert conf == Configuration(cores=2, frequency=3.0, threads_per_core=1)
+
+
+def test_run_model_falls_back_to_optimizer_without_table(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, optimizer = _load_brute_force_model(tmp_path, run)
+    os.remove(local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME))
+
+    # Act
+    conf = RunModelService(local_storage, optimizer=BruteForceOptimizer()).run("Fake CPU")
+
+    # Assert
+    assert conf == Configuration(cores=2, frequency=2.0, threads_per_core=1)
+
+
+def test_load_model_removes_table_of_previous_model(tmp_path):
+    # Arrange
+    local_storage = FakeLocalStorage(str(tmp_path))
+    table_path = local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME)
+    open(table_path, "wb").close()
+    repository = FakeBencmarkRepository()
+    repository.save_model(
+        Model(
+            name="model",
+            system_info=SystemInfo(cores=1, frequencies=[1.0]),
+            path_to_model="fake",
+            type="fake-optimizer",
+            created_at=datetime.now(),
+        )
+    )
+
+    # Act
+    LoadModelService(repository, FakeOptimizer(return_id=1), local_storage, model_id=1).run()
+
+    # Assert
+    assert not os.path.exists(table_path)
+
+
+def test_query_batch_evaluates_the_model_once(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    os.remove(local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME))
+    predict = mocker.spy(BruteForceOptimizer, "predict")
+    run_model = RunModelService(
+        local_storage, get_optimizer=lambda model_type: BruteForceOptimizer()
+    )
+    jobs = [JobRequest(), JobRequest(ntasks=2), JobRequest(ntasks=8, nodes=2)]
+
+    # Act
+    configurations = run_model.query_batch(jobs, "Fake CPU")
+
+    # Assert
+    assert [conf.cores for conf in configurations] == [2, 2, 4]
+    assert predict.call_count == 1
+
+
+def test_query_batch_reads_precompiled_table(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    run_model = RunModelService(local_storage, get_optimizer=None)
+
+    # Act
+    configurations = run_model.query_batch([JobRequest(ntasks=1), JobRequest(ntasks=3)], "Fake CPU")
+
+    # Assert
+    assert [conf.cores for conf in configurations] == [2, 3]
+
+
+def test_query_batch_asks_the_optimizer_for_jobs_with_bounds(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    best_configurations = mocker.spy(BruteForceOptimizer, "best_configurations")
+    run_model = RunModelService(
+        local_storage, get_optimizer=lambda model_type: BruteForceOptimizer()
+    )
+
+    # Act
+    run_model.query_batch([JobRequest(ntasks=1), JobRequest(max_slowdown=1.5)], "Fake CPU")
+
+    # Assert
+    assert best_configurations.call_count == 1
+
+
+def test_query_batch_reads_the_model_once(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    os.remove(local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME))
+    read_model = mocker.spy(BruteForceOptimizer, "run")
+    run_model = RunModelService(
+        local_storage, get_optimizer=lambda model_type: BruteForceOptimizer()
+    )
+
+    # Act
+    for _ in range(3):
+        run_model.query_batch([JobRequest(max_slowdown=1.5)], "Fake CPU")
+
+    # Assert
+    assert read_model.call_count == 1
+
+
+def test_reload_makes_the_optimizer_of_the_loaded_model(tmp_path, mocker):
+    # Arrange
+    run = Run(cores=2, threads_per_core=1, frequency=2.0, gflops=1.0)
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    local_storage, _ = _load_brute_force_model(tmp_path, run)
+    os.remove(local_storage.get_full_path(CONFIGURATION_TABLE_FILE_NAME))
+    model_types = []
+
+    def get_optimizer(model_type: str) -> OptimizerInterface:
+        model_types.append(model_type)
+        return BruteForceOptimizer()
+
+    run_model = RunModelService(local_storage, get_optimizer=get_optimizer)
+    run_model.run("Fake CPU")
+    local_storage.get_settings().loaded_model.type = "other-optimizer"
+
+    # Act
+    run_model.reload()
+    run_model.run("Fake CPU")
+
+    # Assert
+    assert model_types == [BruteForceOptimizer.name(), "other-optimizer"]
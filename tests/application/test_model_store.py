@@ -0,0 +1,153 @@
+import os
+
+from chronus.application.init_model_service import InitModelService
+from chronus.application.model_store import ModelStore, training_digest
+from chronus.domain.configuration import Configuration
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.interfaces.optimizer_interface import OptimizerInterface
+from chronus.domain.Run import Run
+from tests.application.fixtures import FakeBencmarkRepository
+
+
+def _run(cores: int, gflops_per_watt: float) -> Run:
+    # Without samples the power draw is taken to be 1 W, so the GFLOPS are the GFLOPS/W.
+    return Run(cpu="Fake CPU", cores=cores, frequency=2, gflops=gflops_per_watt)
+
+
+class CountingOptimizer(OptimizerInterface):
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.trained = 0
+
+    @staticmethod
+    def name() -> str:
+        return "counting-optimizer"
+
+    def hyperparameters(self) -> dict:
+        return {"alpha": self.alpha}
+
+    def make_model(self, runs: list[Run], system_info: SystemInfo = None) -> None:
+        self.trained += 1
+
+    def save(self, path_without_file_extension: str) -> None:
+        with open(path_without_file_extension + ".model", "w") as f:
+            f.write("model")
+
+    def load(self, path: str, path_to_save_locally) -> None:
+        pass
+
+    def run(self, path_local_model: str) -> Configuration:
+        pass
+
+
+class RunsRepository(FakeBencmarkRepository):
+    def __init__(self, runs: list[Run]):
+        super().__init__()
+        self.runs = runs
+
+    def get_all_runs_from_system(self, system: SystemInfo) -> list[Run]:
+        return self.runs
+
+
+def test_training_digest_does_not_depend_on_the_order_of_the_runs():
+    # Arrange
+    runs = [_run(1, 1.0), _run(2, 3.0)]
+
+    # Act
+    digests = training_digest(runs), training_digest(list(reversed(runs)))
+
+    # Assert
+    assert digests[0] == digests[1]
+
+
+def test_key_changes_with_the_runs_and_the_hyperparameters(tmp_path):
+    # Arrange
+    store = ModelStore(str(tmp_path))
+    system = SystemInfo(cpu_name="Fake CPU", cores=2)
+    runs = [_run(1, 1.0)]
+
+    # Act
+    key = store.key("optimizer", {"alpha": 1}, system, runs)
+
+    # Assert
+    assert key == store.key("optimizer", {"alpha": 1}, system, list(runs))
+    assert key != store.key("optimizer", {"alpha": 2}, system, runs)
+    assert key != store.key("optimizer", {"alpha": 1}, system, runs + [_run(2, 3.0)])
+    assert key != store.key("other-optimizer", {"alpha": 1}, system, runs)
+
+
+def test_init_model_uses_the_stored_model_when_the_runs_have_not_changed(tmp_path):
+    # Arrange
+    repository = RunsRepository([_run(1, 1.0), _run(2, 3.0)])
+    optimizer = CountingOptimizer()
+    service = InitModelService(repository, optimizer, 0, ModelStore(str(tmp_path)))
+    first_id = service.run()
+
+    # Act
+    second_id = service.run()
+
+    # Assert
+    assert optimizer.trained == 1
+    assert second_id == first_id
+    assert len(repository.get_all_models()) == 1
+
+
+def test_init_model_trains_again_when_the_runs_change(tmp_path):
+    # Arrange
+    repository = RunsRepository([_run(1, 1.0)])
+    optimizer = CountingOptimizer()
+    service = InitModelService(repository, optimizer, 0, ModelStore(str(tmp_path)))
+    service.run()
+
+    # Act
+    repository.runs = repository.runs + [_run(2, 3.0)]
+    service.run()
+
+    # Assert
+    assert optimizer.trained == 2
+    assert len({model.path_to_model for model in repository.get_all_models()}) == 2
+
+
+def test_init_model_removes_models_it_wrote_that_no_model_refers_to(tmp_path):
+    # Arrange
+    store = ModelStore(str(tmp_path))
+    unreferenced = store.path("1234") + ".json"
+    with open(unreferenced, "w") as f:
+        f.write("{}")
+    repository = RunsRepository([_run(1, 1.0)])
+
+    # Act
+    InitModelService(repository, CountingOptimizer(), 0, store).run()
+
+    # Assert
+    assert not os.path.exists(unreferenced)
+    assert sorted(os.path.splitext(file)[0] for file in os.listdir(tmp_path)) == [
+        os.path.basename(repository.get_all_models()[0].path_to_model),
+        "manifest",
+    ]
+
+
+def test_garbage_collect_leaves_models_other_stores_wrote(tmp_path):
+    # Arrange
+    store = ModelStore(str(tmp_path))
+    other = tmp_path / "5678.json"
+    other.write_text("{}")
+    store.path("1234")
+
+    # Act
+    removed = store.garbage_collect(set())
+
+    # Assert
+    assert removed == []
+    assert other.exists()
+
+
+def test_for_database_roots_the_store_next_to_the_database(tmp_path):
+    # Arrange
+    database = tmp_path / "data.db"
+
+    # Act
+    store = ModelStore.for_database(str(database))
+
+    # Assert
+    assert store.directory == str(tmp_path / "data_models")
@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from chronus.application.sampler import FixedRateSampler
+from chronus.domain.interfaces.system_service_interface import SystemServiceInterface
+from chronus.domain.system_sample import SystemSample
+from tests.application.fixtures import FakeSystemService
+
+
+class SlowSystemService(SystemServiceInterface):
+    def __init__(self, seconds_per_sample: float):
+        self.seconds_per_sample = seconds_per_sample
+
+    def sample(self) -> SystemSample:
+        time.sleep(self.seconds_per_sample)
+        return SystemSample()
+
+
+class FailingSystemService(SystemServiceInterface):
+    def sample(self) -> SystemSample:
+        raise TimeoutError("BMC did not answer")
+
+
+def test_samples_until_stopped():
+    # Arrange
+    samples = []
+    sampler = FixedRateSampler(FakeSystemService(), samples.append, interval_seconds=0.01)
+
+    # Act
+    with sampler:
+        time.sleep(0.1)
+
+    # Assert
+    assert len(samples) > 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scheduled_waits(seconds_per_sample: float, interval_seconds: float, ticks: int):
+    """Runs a sampler on a fake clock and returns how long it waited after every sample."""
+    clock = FakeClock()
+    waits = []
+
+    def sample():
+        clock.now += seconds_per_sample
+        return SystemSample()
+
+    service = FakeSystemService()
+    service.sample = sample
+    sampler = FixedRateSampler(service, lambda s: None, interval_seconds, clock=clock)
+
+    def wait(timeout):
+        waits.append(timeout)
+        clock.now += timeout
+        if len(waits) == ticks:
+            sampler._stopped.set()
+        return sampler._stopped.is_set()
+
+    sampler._stopped.wait = wait
+    sampler._sample_until_stopped()
+    return sampler, waits
+
+
+def test_sample_time_does_not_make_the_period_drift():
+    # Act
+    sampler, waits = scheduled_waits(seconds_per_sample=1.0, interval_seconds=3.0, ticks=5)
+
+    # Assert
+    assert waits == [2.0] * 5
+    assert sampler.missed_ticks == 0
+
+
+def test_skips_ticks_when_a_sample_takes_longer_than_the_interval():
+    # Act
+    sampler, waits = scheduled_waits(seconds_per_sample=7.0, interval_seconds=3.0, ticks=3)
+
+    # Assert
+    assert waits == [2.0] * 3
+    assert sampler.missed_ticks == 6
+
+
+def test_keeps_sampling_when_a_sample_fails(caplog):
+    # Arrange
+    sampler = FixedRateSampler(FailingSystemService(), lambda sample: None, interval_seconds=0.01)
+
+    # Act
+    with sampler:
+        time.sleep(0.05)
+
+    # Assert
+    assert caplog.text.count("Failed to sample the system") > 1
+
+
+def test_stop_does_not_wait_for_the_next_tick():
+    # Arrange
+    sampler = FixedRateSampler(FakeSystemService(), lambda sample: None, interval_seconds=60)
+    sampler.start()
+
+    # Act
+    start = time.monotonic()
+    sampler.stop()
+
+    # Assert
+    assert time.monotonic() - start < 1
+
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        FixedRateSampler(FakeSystemService(), lambda sample: None, interval_seconds=0)
+
+
+def test_takes_a_sample_when_stopped_right_away():
+    # Arrange
+    samples = []
+    sampler = FixedRateSampler(FakeSystemService(), samples.append, interval_seconds=60.0)
+
+    # Act
+    with sampler:
+        pass
+
+    # Assert
+    assert len(samples) == 1
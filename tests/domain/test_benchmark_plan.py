@@ -0,0 +1,46 @@
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlanStatus
+from chronus.domain.configuration import Configuration
+from chronus.domain.Run import Run
+from tests.fixtures import datetime_from_string
+
+CONFIGURATIONS = [
+    Configuration(cores=cores, frequency=2.0, threads_per_core=1) for cores in (1, 2, 4, 8)
+]
+
+
+def test_plan_keeps_the_order_of_the_configurations():
+    # Act
+    plan = BenchmarkPlan.make(7, CONFIGURATIONS)
+
+    # Assert
+    assert plan.benchmark_id == 7
+    assert [planned.configuration for planned in plan.configurations] == CONFIGURATIONS
+    assert [planned.position for planned in plan.configurations] == [0, 1, 2, 3]
+    assert all(planned.status is PlanStatus.PENDING for planned in plan.configurations)
+
+
+def test_remaining_leaves_out_completed_configurations_and_keeps_failed_ones():
+    # Arrange
+    plan = BenchmarkPlan.make(1, CONFIGURATIONS)
+    plan.configurations[0].status = PlanStatus.COMPLETED
+    plan.configurations[1].status = PlanStatus.FAILED
+
+    # Act
+    remaining = plan.remaining()
+
+    # Assert
+    assert [planned.configuration.cores for planned in remaining] == [2, 4, 8]
+
+
+def test_remaining_leaves_out_configurations_with_a_finished_run():
+    # Arrange
+    plan = BenchmarkPlan.make(1, CONFIGURATIONS)
+    finished = Run(cores=4, frequency=2, threads_per_core=1)
+    finished.finish(datetime_from_string("2021-01-01 00:00:10"))
+    unfinished = Run(cores=8, frequency=2.0, threads_per_core=1)
+
+    # Act
+    remaining = plan.remaining([finished, unfinished])
+
+    # Assert
+    assert [planned.configuration.cores for planned in remaining] == [1, 2, 8]
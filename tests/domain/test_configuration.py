@@ -1,4 +1,4 @@
-from chronus.domain.configuration import Configurations
+from chronus.domain.configuration import Configuration, Configurations
 from chronus.domain.cpu_info import SystemInfo
 
 
@@ -65,3 +65,12 @@ def test_configuration_with_2_threads_per_core_makes_configuration_for_running_1
     assert configurations[1].cores == 1
     assert configurations[1].frequency == 1.0
     assert configurations[1].threads_per_core == 2
+
+
+def test_key_is_the_same_for_an_int_or_float_frequency():
+    # act
+    key = Configuration(cores=4, frequency=2200000, threads_per_core=2).key()
+
+    # assert
+    assert key == (4, 2, 2200000.0)
+    assert key == Configuration(cores=4, frequency=2200000.0, threads_per_core=2).key()
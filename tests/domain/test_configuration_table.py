@@ -0,0 +1,67 @@
+import pytest
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.configuration_table import ConfigurationTable
+
+
+def make_table() -> ConfigurationTable:
+    best = Configuration(cores=2, frequency=2200000.0, threads_per_core=1)
+    threaded = Configuration(cores=2, frequency=1500000.0, threads_per_core=2)
+    # The configuration for 0 (no number asked for) up to 4 requested tasks.
+    return ConfigurationTable.from_configurations("cpu", [best, best, best, threaded, threaded])
+
+
+def test_best_configuration_when_no_tasks_are_requested():
+    # Act
+    conf = make_table().lookup("cpu")
+
+    # Assert
+    assert conf == Configuration(cores=2, frequency=2200000, threads_per_core=1)
+
+
+@pytest.mark.parametrize(
+    "requested_tasks, expected",
+    [
+        (2, Configuration(cores=2, frequency=2200000, threads_per_core=1)),
+        (3, Configuration(cores=2, frequency=1500000, threads_per_core=2)),
+        (4, Configuration(cores=2, frequency=1500000, threads_per_core=2)),
+        (100, Configuration(cores=2, frequency=1500000, threads_per_core=2)),
+    ],
+)
+def test_configuration_for_the_requested_tasks(requested_tasks, expected):
+    # Act
+    conf = make_table().lookup("cpu", requested_tasks)
+
+    # Assert
+    assert conf == expected
+
+
+def test_other_cpu_is_not_in_table():
+    assert make_table().lookup("other cpu") is None
+
+
+def test_saved_table_is_memory_mapped(tmp_path):
+    # Arrange
+    path = str(tmp_path / "configurations.table")
+    table = make_table()
+
+    # Act
+    table.save(path)
+    opened = ConfigurationTable.open(path)
+
+    # Assert
+    assert opened.cpu_name == "cpu"
+    assert len(opened) == len(table) == 5
+    assert [opened.lookup("cpu", tasks) for tasks in range(5)] == [
+        table.lookup("cpu", tasks) for tasks in range(5)
+    ]
+
+
+def test_other_files_are_rejected(tmp_path):
+    # Arrange
+    path = tmp_path / "model.json"
+    path.write_bytes(b'{"cores": 1, "frequency": 1, "threads_per_core": 1}' * 2)
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        ConfigurationTable.open(str(path))
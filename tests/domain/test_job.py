@@ -0,0 +1,48 @@
+import pytest
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.job import JobRequest, best_configurations
+
+CONFIGURATIONS = [
+    Configuration(cores=4, frequency=1500000, threads_per_core=1),
+    Configuration(cores=8, frequency=1500000, threads_per_core=2),
+    Configuration(cores=16, frequency=2200000, threads_per_core=1),
+]
+EFFICIENCIES = [3.0, 2.0, 1.0]
+
+
+@pytest.mark.parametrize(
+    "job, tasks_per_node",
+    [
+        (JobRequest(), 0),
+        (JobRequest(ntasks=16), 16),
+        (JobRequest(ntasks=16, nodes=4), 4),
+        (JobRequest(ntasks=17, nodes=4), 5),
+    ],
+)
+def test_tasks_per_node(job, tasks_per_node):
+    assert job.tasks_per_node == tasks_per_node
+
+
+def test_best_configuration_for_each_job():
+    # Arrange
+    jobs = [
+        JobRequest(),
+        JobRequest(ntasks=8),
+        JobRequest(ntasks=32, nodes=2),
+        JobRequest(ntasks=32, time_limit=60, application="hpcg"),
+    ]
+
+    # Act
+    best = best_configurations(CONFIGURATIONS, EFFICIENCIES, jobs)
+
+    # Assert
+    assert best == [CONFIGURATIONS[0], CONFIGURATIONS[1], CONFIGURATIONS[1], CONFIGURATIONS[1]]
+
+
+def test_jobs_too_large_for_the_node_get_the_largest_configuration():
+    # Act
+    best = best_configurations(CONFIGURATIONS, EFFICIENCIES, [JobRequest(ntasks=1000)])
+
+    # Assert
+    assert best == [CONFIGURATIONS[1]]
@@ -0,0 +1,103 @@
+import pytest
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.pareto import ParetoFront, ParetoPoint, points_from_runs
+from chronus.domain.Run import Run
+from chronus.domain.system_sample import SystemSample
+from tests.fixtures import create_datatime_with_seconds
+
+
+def point(cores: int, runtime: float, energy: float) -> ParetoPoint:
+    return ParetoPoint(Configuration(cores=cores, frequency=2, threads_per_core=1), runtime, energy)
+
+
+# Fastest first, each point is slower and uses less energy than the one before.
+FRONT = [
+    point(32, 10.0, 500.0),
+    point(16, 14.0, 350.0),
+    point(8, 25.0, 300.0),
+    point(4, 60.0, 280.0),
+]
+
+
+def test_front_drops_points_beaten_on_runtime_and_energy():
+    # Arrange
+    beaten = [point(24, 15.0, 400.0), point(2, 70.0, 290.0)]
+
+    # Act
+    front = ParetoFront.from_points(beaten + list(reversed(FRONT)))
+
+    # Assert
+    assert front.points == FRONT
+
+
+def test_choose_without_bounds_uses_the_least_energy():
+    # Act
+    chosen = ParetoFront.from_points(FRONT).choose()
+
+    # Assert
+    assert chosen == FRONT[-1]
+
+
+@pytest.mark.parametrize(
+    "max_slowdown, expected", [(0.5, FRONT[0]), (1.0, FRONT[0]), (1.5, FRONT[1]), (2.5, FRONT[2])]
+)
+def test_choose_uses_the_least_energy_within_the_slowdown(max_slowdown, expected):
+    # Act
+    chosen = ParetoFront.from_points(FRONT).choose(max_slowdown=max_slowdown)
+
+    # Assert
+    assert chosen == expected
+
+
+@pytest.mark.parametrize(
+    "energy_budget, expected",
+    [(1000.0, FRONT[0]), (400.0, FRONT[1]), (300.0, FRONT[2]), (1.0, FRONT[3])],
+)
+def test_choose_uses_the_fastest_within_the_energy_budget(energy_budget, expected):
+    # Act
+    chosen = ParetoFront.from_points(FRONT).choose(energy_budget=energy_budget)
+
+    # Assert
+    assert chosen == expected
+
+
+def test_choose_with_both_prefers_the_energy_budget_when_the_slowdown_is_over_it():
+    # Arrange
+    front = ParetoFront.from_points(FRONT)
+
+    # Act
+    within_both = front.choose(max_slowdown=2.5, energy_budget=400.0)
+    over_budget = front.choose(max_slowdown=1.0, energy_budget=400.0)
+
+    # Assert
+    assert within_both == FRONT[2]
+    assert over_budget == FRONT[1]
+
+
+def test_choose_on_an_empty_front_is_none():
+    # Act / Assert
+    assert ParetoFront.from_points([]).choose(max_slowdown=2.0) is None
+
+
+def test_points_average_the_work_of_the_runs_of_a_configuration_and_skip_unfinished_runs():
+    # Arrange
+    runs = []
+    for seconds, power, gflops in [(10, 10.0, 2.0), (20, 20.0, 4.0), (5, 1.0, 1.0)]:
+        run = Run(cores=4, threads_per_core=1, frequency=2, gflops=gflops)
+        run.start_time = create_datatime_with_seconds(0)
+        run.add_sample(
+            SystemSample(timestamp=create_datatime_with_seconds(0), current_power_draw=power)
+        )
+        run.add_sample(
+            SystemSample(timestamp=create_datatime_with_seconds(seconds), current_power_draw=power)
+        )
+        run.finish(create_datatime_with_seconds(seconds))
+        runs.append(run)
+    runs[-1].end_time = None
+
+    # Act
+    points = points_from_runs(runs)
+
+    # Assert
+    assert points == [point(4, 0.375, 5.0)]
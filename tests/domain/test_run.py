@@ -1,3 +1,5 @@
+import pytest
+
 from chronus.domain.Run import Run
 from chronus.domain.system_sample import SystemSample
 from tests.fixtures import create_datatime_with_seconds
@@ -107,12 +109,63 @@ def test_run_calculates_gflops_per_watt_with_non_linear_timestamps():
     run.add_sample(SystemSample(timestamp=end, current_power_draw=30.0))
     run.start_time = start
     run.end_time = end
-    # used 60 joules in 3 seconds
-    # 60 / 3 = 20 watts
-    run.gflops = 20.0
+    # used (10 + 30) / 2 * 2 + (30 + 30) / 2 * 1 = 70 joules in 3 seconds
+    # 70 / 3 = 23.33 watts
+    run.gflops = 70.0
 
     # Act
     gflops_per_watt = run.gflops_per_watt
 
     # Assert
-    assert gflops_per_watt == 1.0
+    assert gflops_per_watt == pytest.approx(3.0)
+
+
+def test_run_peak_power_draw():
+    # Arrange
+    run = Run()
+
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(0), current_power_draw=10.0))
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(1), current_power_draw=25.0))
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(2), current_power_draw=15.0))
+
+    # Act
+    peak_power_draw = run.peak_power_draw
+
+    # Assert
+    assert peak_power_draw == 25.0
+
+
+def test_run_statistics_are_updated_while_samples_arrive():
+    # Arrange
+    run = Run()
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(0), current_power_draw=10.0))
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(2), current_power_draw=30.0))
+    energy_before = run.energy_used_joules
+
+    # Act
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(3), current_power_draw=20.0))
+
+    # Assert
+    assert energy_before == 40.0
+    assert run.energy_used_joules == 65.0
+    assert run.statistics.duration_seconds == 3.0
+    assert run.statistics.min_power_draw == 10.0
+    assert run.statistics.max_power_draw == 30.0
+    assert run.statistics.mean_power_draw == pytest.approx(65.0 / 3.0)
+
+
+def test_run_gflops_per_watt_is_not_stale_after_new_samples():
+    # Arrange
+    run = Run(gflops=10.0)
+    run.start_time = create_datatime_with_seconds(0)
+    run.end_time = create_datatime_with_seconds(2)
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(0), current_power_draw=10.0))
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(1), current_power_draw=10.0))
+    gflops_per_watt_before = run.gflops_per_watt
+
+    # Act
+    run.add_sample(SystemSample(timestamp=create_datatime_with_seconds(2), current_power_draw=10.0))
+
+    # Assert
+    assert gflops_per_watt_before == 2.0
+    assert run.gflops_per_watt == 1.0
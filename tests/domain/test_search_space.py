@@ -0,0 +1,88 @@
+from chronus.domain.configuration import Configuration, make_configurations
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+
+SYSTEM = SystemInfo(cpu_name="cpu", cores=8, threads_per_core=2, frequencies=[1.0, 2.0, 3.0])
+
+
+def test_default_space_is_the_benchmarked_configurations():
+    # Act
+    search_space = SearchSpace(SYSTEM)
+
+    # Assert
+    assert list(search_space) == make_configurations(SYSTEM)
+    assert len(search_space) == 4 * 2 * 3
+
+
+def test_full_grid_has_every_core_count():
+    # Act
+    search_space = SearchSpace.full_grid(SYSTEM)
+
+    # Assert
+    assert len(search_space) == 8 * 2 * 3
+    assert [conf.cores for conf in search_space][::6] == list(range(1, 9))
+
+
+def test_strides_keep_the_largest_core_count_and_frequency():
+    # Act
+    search_space = SearchSpace.full_grid(SYSTEM, core_stride=3, frequency_stride=2)
+
+    # Assert
+    assert search_space.cores == [3, 6, 8]
+    assert search_space.frequencies == [2.0, 3.0]
+
+
+def test_constraints_filter_the_space():
+    # Act
+    search_space = SearchSpace.full_grid(SYSTEM).where(lambda conf: conf.cores >= 6)
+    search_space = search_space.where(lambda conf: conf.frequency == 3.0)
+
+    # Assert
+    assert len(search_space) == 3 * 2
+    assert all(conf.cores >= 6 and conf.frequency == 3.0 for conf in search_space)
+
+
+def test_space_is_scored_in_chunks():
+    # Arrange
+    search_space = SearchSpace.full_grid(SYSTEM)
+    chunk_sizes = []
+
+    def predict(configurations: list[Configuration]) -> list[float]:
+        chunk_sizes.append(len(configurations))
+        return [conf.cores * conf.frequency for conf in configurations]
+
+    # Act
+    ranking = search_space.rank(predict, k=2, chunk_size=10)
+
+    # Assert
+    assert chunk_sizes == [10, 10, 10, 10, 8]
+    assert ranking == [
+        (Configuration(cores=8, frequency=3.0, threads_per_core=1), 24.0),
+        (Configuration(cores=8, frequency=3.0, threads_per_core=2), 24.0),
+    ]
+
+
+def test_full_ranking_is_sorted():
+    # Act
+    ranking = SearchSpace(SYSTEM).rank(lambda chunk: [conf.frequency for conf in chunk])
+
+    # Assert
+    assert len(ranking) == 24
+    assert [score for _, score in ranking] == sorted((score for _, score in ranking), reverse=True)
+
+
+def test_space_from_runs():
+    # Arrange
+    runs = [
+        Run(cores=4, threads_per_core=1, frequency=2),
+        Run(cores=16, threads_per_core=2, frequency=1),
+    ]
+
+    # Act
+    search_space = SearchSpace.from_runs(runs)
+
+    # Assert
+    assert search_space.cores == list(range(1, 17))
+    assert search_space.threads_per_core == [1, 2]
+    assert search_space.frequencies == [1, 2]
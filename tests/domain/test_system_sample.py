@@ -0,0 +1,109 @@
+import datetime
+from datetime import timedelta
+
+import pytest
+
+from chronus.domain.system_sample import SystemSample, SystemSamples
+from tests.fixtures import create_datatime_with_seconds
+
+
+def make_samples(power_draws: list[float]) -> SystemSamples:
+    start = create_datatime_with_seconds(0)
+    return SystemSamples(
+        SystemSample(timestamp=start + timedelta(seconds=second), current_power_draw=power)
+        for second, power in enumerate(power_draws)
+    )
+
+
+def test_samples_are_given_back_as_system_samples():
+    # Arrange
+    sample = SystemSample(
+        timestamp=datetime.datetime(2020, 1, 1, 0, 0, 1, 123456),
+        current_power_draw=10.0,
+        cpu_power=5.0,
+        cpu_temp=50.0,
+        cpu_freq=[{"current": 2000, "min": 1000, "max": 3000}],
+    )
+
+    # Act
+    samples = SystemSamples([sample])
+
+    # Assert
+    assert samples[0] == sample
+    assert samples[-1] == sample
+    assert list(samples) == [sample]
+
+
+def test_samples_grow_past_initial_capacity():
+    # Act
+    samples = make_samples([float(power) for power in range(100)])
+
+    # Assert
+    assert len(samples) == 100
+    assert samples[99].current_power_draw == 99.0
+    assert samples[99].timestamp == create_datatime_with_seconds(0) + datetime.timedelta(seconds=99)
+
+
+def test_index_out_of_range_raises():
+    with pytest.raises(IndexError):
+        make_samples([1.0])[1]
+
+
+@pytest.mark.parametrize(
+    "power_draws, energy",
+    [
+        ([], 0.0),
+        ([10.0], 0.0),
+        ([10.0, 10.0], 10.0),
+        ([10.0, 30.0, 20.0], 45.0),
+    ],
+)
+def test_energy_is_trapezoidal_integral(power_draws, energy):
+    # Act
+    samples = make_samples(power_draws)
+
+    # Assert
+    assert samples.energy_joules() == energy
+
+
+def test_energy_uses_counter_difference_when_samples_have_readings():
+    # Arrange
+    start = create_datatime_with_seconds(0)
+    readings = [(10.0, 100.0), (10.0, 112.5), (10.0, 130.0)]
+
+    # Act
+    samples = SystemSamples(
+        SystemSample(
+            timestamp=start + timedelta(seconds=second), current_power_draw=power, energy=energy
+        )
+        for second, (power, energy) in enumerate(readings)
+    )
+
+    # Assert
+    assert samples.energy_joules() == 30.0
+    assert samples[1].energy == 112.5
+
+
+def test_average_and_peak_power_draw():
+    # Act
+    samples = make_samples([10.0, 30.0, 20.0])
+
+    # Assert
+    assert samples.average_power_draw() == 22.5
+    assert samples.peak_power_draw() == 30.0
+
+
+def test_statistics_track_cpu_temperature():
+    # Arrange
+    start = create_datatime_with_seconds(0)
+    samples = SystemSamples()
+
+    # Act
+    samples.append(SystemSample(timestamp=start, cpu_temp=40.0))
+    samples.append(SystemSample(timestamp=start + timedelta(seconds=2), cpu_temp=60.0))
+
+    # Assert
+    assert samples.statistics.count == 2
+    assert samples.statistics.min_cpu_temp == 40.0
+    assert samples.statistics.max_cpu_temp == 60.0
+    assert samples.statistics.mean_cpu_temp == 50.0
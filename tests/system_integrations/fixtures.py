@@ -15,3 +15,60 @@ def mock_subprocess_run(mocker):
         return mocked_subprocess_run
 
     return get_mock
+
+
+class FakeSlurm:
+    """A stand-in for sbatch, squeue and sacct that answers from a table of job states.
+
+    Like Slurm, squeue only knows jobs that have not ended and refuses a query naming a job it
+    does not know, while sacct knows every job.
+    """
+
+    def __init__(self, first_job_id: int = 449):
+        self.jobs: dict[str, str] = {}
+        self.calls: list[list[str]] = []
+        self.next_job_id = first_job_id
+
+    def submit(self, state: str = "PENDING") -> str:
+        job_id = str(self.next_job_id)
+        self.next_job_id += 1
+        self.jobs[job_id] = state
+        return job_id
+
+    def run(self, args, **kwargs) -> subprocess.CompletedProcess:
+        self.calls.append(args)
+        command = args[0]
+        if command == "sbatch":
+            return self._completed(args, f"Submitted batch job {self.submit()}")
+        job_ids = next(arg for arg in args if arg.startswith("--jobs=")).split("=")[1].split(",")
+        if command == "squeue":
+            if any(self.jobs.get(job_id, "COMPLETED") not in ACTIVE_STATES for job_id in job_ids):
+                return subprocess.CompletedProcess(
+                    args, 1, stdout="", stderr="slurm_load_jobs error: Invalid job id specified"
+                )
+            return self._completed(args, self._lines(job_ids))
+        if command == "sacct":
+            return self._completed(args, self._lines(job_ids))
+        raise ValueError(f"FakeSlurm does not know {command}")
+
+    def calls_to(self, command: str) -> int:
+        return sum(1 for args in self.calls if args[0] == command)
+
+    def _lines(self, job_ids: list[str]) -> str:
+        return "".join(
+            f"{job_id}|{self.jobs[job_id]}\n" for job_id in job_ids if job_id in self.jobs
+        )
+
+    @staticmethod
+    def _completed(args, stdout: str) -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(args, 0, stdout=stdout, stderr="")
+
+
+ACTIVE_STATES = ("PENDING", "CONFIGURING", "RUNNING", "COMPLETING", "SUSPENDED")
+
+
+@pytest.fixture
+def fake_slurm(mocker):
+    slurm = FakeSlurm()
+    mocker.patch.object(subprocess, "run", side_effect=slurm.run)
+    return slurm
@@ -1,6 +1,8 @@
 from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.job import JobRequest
 from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
 from chronus.SystemIntegration.optimizers.bruteforce_optmizer import BruteForceOptimizer
 
 
@@ -23,3 +25,70 @@ def test_saves_and_loads_the_values_from_file(tmp_path):
 
     # Assert
     assert best_run == expected_best_run
+
+
+def test_best_run_off_the_grid_is_the_configuration_for_every_job(mocker):
+    # Arrange
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    optimizer = BruteForceOptimizer()
+    optimizer.make_model([Run(cores=2, threads_per_core=1, frequency=1.5)])
+    search_space = SearchSpace(SystemInfo(cores=4, frequencies=[1.0, 2.0]))
+
+    # Act
+    best = optimizer.best_configurations(search_space, [JobRequest(), JobRequest(ntasks=4)])
+
+    # Assert
+    assert best == [Configuration(cores=2, frequency=1.5, threads_per_core=1)] * 2
+
+
+def test_best_run_on_the_grid_is_predicted_best(mocker):
+    # Arrange
+    mocker.patch.object(Run, "gflops_per_watt", 1.0)
+    optimizer = BruteForceOptimizer()
+    optimizer.make_model([Run(cores=2, threads_per_core=1, frequency=2)])
+    search_space = SearchSpace(SystemInfo(cores=4, frequencies=[1.0, 2.0]))
+
+    # Act
+    [(best, predicted)] = search_space.rank(optimizer.predict, k=1)
+
+    # Assert
+    assert best == Configuration(cores=2, frequency=2.0, threads_per_core=1)
+    assert predicted == 1.0
+
+
+def test_job_that_does_not_fit_the_best_run_gets_the_best_measured_that_fits(tmp_path, mocker):
+    # Arrange
+    mocker.patch.object(Run, "gflops_per_watt", property(lambda run: run.gflops))
+    runs = [
+        Run(cores=2, threads_per_core=1, frequency=2.0, gflops=3.0),
+        Run(cores=4, threads_per_core=1, frequency=1.0, gflops=1.0),
+        Run(cores=4, threads_per_core=1, frequency=2.0, gflops=2.0),
+    ]
+    trained = BruteForceOptimizer()
+    trained.make_model(runs)
+    trained.save(str(tmp_path / "model"))
+    optimizer = BruteForceOptimizer()
+    optimizer.load(str(tmp_path / "model"), str(tmp_path / "local_model"))
+    search_space = SearchSpace.full_grid(SystemInfo(cores=4, frequencies=[1.0, 2.0]))
+
+    # Act
+    best = optimizer.best_configurations(search_space, [JobRequest(), JobRequest(ntasks=3)])
+
+    # Assert
+    assert best == [
+        Configuration(cores=2, frequency=2.0, threads_per_core=1),
+        Configuration(cores=4, frequency=2.0, threads_per_core=1),
+    ]
+
+
+def test_model_with_only_the_best_run_is_still_read(tmp_path):
+    # Arrange
+    (tmp_path / "model.json").write_text('{"cores": 2, "frequency": 2.0, "threads_per_core": 1}')
+    optimizer = BruteForceOptimizer()
+
+    # Act
+    best = optimizer.run(str(tmp_path / "model"))
+
+    # Assert
+    assert best == Configuration(cores=2, frequency=2.0, threads_per_core=1)
+    assert optimizer.predict([best, Configuration(4, 2.0, 1)]) == [1.0, 0.0]
@@ -0,0 +1,173 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import chronus
+from chronus.domain.configuration import Configuration
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+from chronus.SystemIntegration.optimizers.estimator_optimizer import (
+    FORMAT_VERSION,
+    ModelArtifact,
+    ModelArtifactError,
+)
+from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
+from chronus.SystemIntegration.optimizers.random_tree_forrest import RandomTreeOptimizer
+
+SYSTEM = SystemInfo(cores=16, threads_per_core=2, frequencies=[1500000.0, 2200000.0, 2500000.0])
+
+
+def efficiency(cores, threads_per_core, frequency):
+    return 10.0 - (cores - 8) ** 2 / 10 - (frequency / 1e6 - 2.2) ** 2 + threads_per_core / 10
+
+
+@pytest.fixture
+def trained_linear_regression(mocker) -> LinearRegressionOptimizer:
+    mocker.patch.object(
+        Run,
+        "gflops_per_watt",
+        property(lambda run: efficiency(run.cores, run.threads_per_core, run.frequency)),
+    )
+    runs = [
+        Run(cores=conf.cores, threads_per_core=conf.threads_per_core, frequency=conf.frequency)
+        for conf in SearchSpace.full_grid(SYSTEM)
+    ]
+    optimizer = LinearRegressionOptimizer()
+    optimizer.make_model(runs, SYSTEM)
+    return optimizer
+
+
+def trained_random_tree() -> RandomTreeOptimizer:
+    configurations = list(SearchSpace.full_grid(SYSTEM))
+    X = np.array([[conf.cores, conf.threads_per_core, conf.frequency] for conf in configurations])
+    y = [efficiency(conf.cores, conf.threads_per_core, conf.frequency) for conf in configurations]
+    optimizer = RandomTreeOptimizer()
+    optimizer._estimator = RandomForestRegressor(n_estimators=5, random_state=42).fit(X, y)
+    optimizer._rank(SearchSpace.full_grid(SYSTEM))
+    return optimizer
+
+
+def test_linear_regression_is_loaded_without_retraining(trained_linear_regression, tmp_path):
+    # Arrange
+    configurations = list(SearchSpace.full_grid(SYSTEM))
+    trained_linear_regression.save(str(tmp_path / "trained"))
+
+    # Act
+    loaded = LinearRegressionOptimizer()
+    loaded.load(str(tmp_path / "trained"), str(tmp_path / "local"))
+    best = LinearRegressionOptimizer().run(str(tmp_path / "local"))
+
+    # Assert
+    assert best == Configuration(cores=8, frequency=2200000.0, threads_per_core=2)
+    assert loaded.predict(configurations) == trained_linear_regression.predict(configurations)
+
+
+def test_random_tree_is_loaded_without_retraining(tmp_path):
+    # Arrange
+    optimizer = trained_random_tree()
+    configurations = list(SearchSpace.full_grid(SYSTEM))
+    optimizer.save(str(tmp_path / "trained"))
+
+    # Act
+    loaded = RandomTreeOptimizer()
+    best = loaded.run(str(tmp_path / "trained"))
+
+    # Assert
+    assert best == optimizer._ranking[0][0]
+    assert loaded.predict(configurations) == optimizer.predict(configurations)
+
+
+def test_artifact_is_addressed_by_digest(tmp_path):
+    # Arrange
+    path = str(tmp_path / "trained.model")
+    artifact = ModelArtifact("random-tree", [], estimator={"weights": [1, 2, 3]})
+
+    # Act
+    digest = artifact.save(path)
+    loaded = ModelArtifact.load(path)
+
+    # Assert
+    assert len(digest) == 64
+    assert loaded.digest == digest
+    assert loaded.estimator == {"weights": [1, 2, 3]}
+
+
+def test_tampered_estimator_is_rejected(tmp_path):
+    # Arrange
+    path = tmp_path / "trained.model"
+    ModelArtifact("random-tree", [], estimator={"weights": [1, 2, 3]}).save(str(path))
+    path.write_bytes(path.read_bytes().replace(b"weights", b"WEIGHTS"))
+
+    # Act / Assert
+    with pytest.raises(ModelArtifactError):
+        ModelArtifact.load(str(path))
+
+
+def test_other_format_versions_are_rejected(tmp_path):
+    # Arrange
+    path = tmp_path / "trained.model"
+    ModelArtifact("random-tree", [], estimator=None).save(str(path))
+    path.write_bytes(
+        path.read_bytes().replace(
+            f'"format_version": {FORMAT_VERSION}'.encode(),
+            f'"format_version": {FORMAT_VERSION + 1}'.encode(),
+        )
+    )
+
+    # Act / Assert
+    with pytest.raises(ModelArtifactError):
+        ModelArtifact.load(str(path))
+
+
+def test_model_of_other_optimizer_is_rejected(tmp_path):
+    # Arrange
+    trained_random_tree().save(str(tmp_path / "trained"))
+
+    # Act / Assert
+    with pytest.raises(ModelArtifactError):
+        LinearRegressionOptimizer().run(str(tmp_path / "trained"))
+
+
+def test_saving_untrained_model_fails(tmp_path):
+    with pytest.raises(ModelArtifactError):
+        LinearRegressionOptimizer().save(str(tmp_path / "untrained"))
+
+
+def test_inference_works_without_pandas(trained_linear_regression, tmp_path):
+    # Arrange
+    trained_linear_regression.save(str(tmp_path / "trained"))
+    # pandas is an optional extra, so inference has to work where it can not be imported.
+    script = f"""
+import sys
+
+class WithoutPandas:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] == "pandas":
+            raise ImportError("No module named 'pandas'")
+
+sys.meta_path.insert(0, WithoutPandas())
+from chronus.domain.configuration import Configuration
+from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
+optimizer = LinearRegressionOptimizer()
+optimizer.run({str(tmp_path / "trained")!r})
+print("sklearn" in sys.modules)
+optimizer.predict([Configuration(cores=8, frequency=2200000.0, threads_per_core=2)])
+"""
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(chronus.__file__))},
+    )
+
+    # Assert
+    assert result.stdout.strip() == "False"
+    assert result.stderr == ""
@@ -0,0 +1,131 @@
+import os
+import time
+
+import pytest
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.job import JobRequest
+from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
+
+SYSTEM = SystemInfo(cores=32, threads_per_core=2, frequencies=[1500000.0, 2200000.0, 2500000.0])
+
+
+def efficiency(cores, threads_per_core, frequency):
+    # Peaks at 16 cores and 2.2 GHz, so the best configuration is not on the edge of the space.
+    return 10.0 - (cores - 16) ** 2 / 100 - (frequency / 1e6 - 2.2) ** 2 + threads_per_core / 10
+
+
+def runs_of(search_space: SearchSpace) -> list[Run]:
+    return [
+        Run(cores=conf.cores, threads_per_core=conf.threads_per_core, frequency=conf.frequency)
+        for conf in search_space
+    ]
+
+
+@pytest.fixture(scope="module")
+def optimizer():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            Run,
+            "gflops_per_watt",
+            property(lambda run: efficiency(run.cores, run.threads_per_core, run.frequency)),
+        )
+        trained = LinearRegressionOptimizer()
+        trained.make_model(runs_of(SearchSpace.full_grid(SYSTEM)), SYSTEM)
+    return trained
+
+
+def find_best_configuration_row_by_row(optimizer, search_space):
+    """How the best configuration was found before, one predict call per configuration."""
+    best_config = None
+    best_efficiency = -1
+    for config in search_space:
+        predicted_efficiency = optimizer.predict([config])[0]
+        if predicted_efficiency > best_efficiency:
+            best_config = config
+            best_efficiency = predicted_efficiency
+    return best_config, best_efficiency
+
+
+def test_best_configuration_is_the_same_as_row_by_row(optimizer):
+    # Arrange
+    search_space = SearchSpace.full_grid(SYSTEM)
+
+    # Act
+    [best_config] = optimizer.best_configurations(search_space, [JobRequest()])
+    [(ranked_config, best_efficiency)] = search_space.rank(optimizer.predict, k=1)
+
+    # Assert
+    expected_config, expected_efficiency = find_best_configuration_row_by_row(
+        optimizer, search_space
+    )
+    assert best_config == ranked_config == expected_config == Configuration(16, 2.2e6, 2)
+    assert best_efficiency == pytest.approx(expected_efficiency)
+
+
+def test_top_k_is_the_start_of_the_full_ranking(optimizer):
+    # Arrange
+    search_space = SearchSpace.full_grid(SYSTEM)
+
+    # Act
+    top_5 = search_space.rank(optimizer.predict, k=5)
+    ranking = search_space.rank(optimizer.predict)
+
+    # Assert
+    assert len(top_5) == 5
+    assert len(ranking) == len(search_space)
+    assert [config for config, _ in top_5] == [config for config, _ in ranking[:5]]
+    efficiencies = [predicted for _, predicted in ranking]
+    assert efficiencies == sorted(efficiencies, reverse=True)
+
+
+def test_no_configurations(optimizer):
+    assert SearchSpace(SYSTEM, cores=[]).rank(optimizer.predict) == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("CHRONUS_BENCHMARK"),
+    reason="Measures wall clock time, set CHRONUS_BENCHMARK=1 to run it",
+)
+def test_vectorized_search_is_faster_than_row_by_row(optimizer):
+    """Micro-benchmark over the 192 configurations of a 32 core system."""
+    # Arrange
+    search_space = SearchSpace.full_grid(SYSTEM)
+
+    # Act
+    start = time.perf_counter()
+    find_best_configuration_row_by_row(optimizer, search_space)
+    row_by_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_space.rank(optimizer.predict, k=1)
+    vectorized_seconds = time.perf_counter() - start
+
+    # Assert
+    assert vectorized_seconds * 10 < row_by_row_seconds
+
+
+def test_optimizer_picks_configuration_per_job(mocker):
+    # Arrange
+    mocker.patch.object(
+        Run,
+        "gflops_per_watt",
+        property(lambda run: efficiency(run.cores, run.threads_per_core, run.frequency)),
+    )
+    runs = runs_of(SearchSpace.full_grid(SYSTEM))
+    optimizer = LinearRegressionOptimizer()
+    optimizer.make_model(runs, SYSTEM)
+    search_space = SearchSpace(
+        SystemInfo(cores=32, threads_per_core=1, frequencies=[2.2e6]), cores=[8, 16, 32]
+    )
+
+    # Act
+    best = optimizer.best_configurations(
+        search_space, [JobRequest(), JobRequest(ntasks=20), JobRequest(ntasks=32)]
+    )
+
+    # Assert
+    assert [conf.cores for conf in best] == [16, 32, 32]
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.job import JobRequest
+from chronus.domain.Run import Run
+from chronus.domain.search_space import SearchSpace
+from chronus.domain.system_sample import SystemSample
+from chronus.SystemIntegration.optimizers.pareto_optimizer import ParetoOptimizer
+from tests.fixtures import create_datatime_with_seconds
+
+SYSTEM = SystemInfo(cores=32, threads_per_core=1, frequencies=[2])
+
+
+def make_run(cores: int, seconds_per_gflop: float, joules_per_gflop: float) -> Run:
+    """A run of the fixed 900 seconds of HPCG."""
+    gflops = 1 / seconds_per_gflop
+    power = joules_per_gflop * gflops
+    run = Run(cores=cores, threads_per_core=1, frequency=2, gflops=gflops)
+    run.start_time = create_datatime_with_seconds(0)
+    end_time = run.start_time + timedelta(seconds=900)
+    run.add_sample(SystemSample(timestamp=run.start_time, current_power_draw=power))
+    run.add_sample(SystemSample(timestamp=end_time, current_power_draw=power))
+    run.finish(end_time)
+    return run
+
+
+# (cores, seconds, joules) per GFLOP: 32 cores is fastest, 8 cores uses the least energy, 24 is
+# beaten.
+RUNS = [
+    make_run(32, 0.10, 5.0),
+    make_run(24, 0.15, 4.5),
+    make_run(16, 0.14, 3.5),
+    make_run(8, 0.25, 3.0),
+]
+
+
+def cores(configurations: list[Configuration]) -> list[int]:
+    return [conf.cores for conf in configurations]
+
+
+def test_front_is_saved_and_loaded(tmp_path):
+    # Arrange
+    optimizer = ParetoOptimizer()
+    optimizer.make_model(RUNS, SYSTEM)
+    path = str(tmp_path / "model")
+    path_local_model = str(tmp_path / "local_model")
+
+    # Act
+    optimizer.save(path)
+    loaded = ParetoOptimizer()
+    loaded.load(path, path_local_model)
+    best = ParetoOptimizer().run(path_local_model)
+
+    # Assert
+    assert cores(point.configuration for point in loaded.front().points) == [32, 16, 8]
+    assert best.cores == 8
+
+
+def test_jobs_get_the_configuration_their_bounds_allow():
+    # Arrange
+    optimizer = ParetoOptimizer()
+    optimizer.make_model(RUNS, SYSTEM)
+    jobs = [
+        JobRequest(),
+        JobRequest(max_slowdown=1.5),
+        JobRequest(energy_budget=4.0),
+        JobRequest(ntasks=20, max_slowdown=3.0),
+    ]
+
+    # Act
+    configurations = optimizer.best_configurations(SearchSpace.full_grid(SYSTEM), jobs)
+
+    # Assert
+    assert cores(configurations) == [8, 16, 16, 24]
+
+
+def test_predict_ranks_the_configuration_using_the_least_energy_first():
+    # Arrange
+    optimizer = ParetoOptimizer()
+    optimizer.make_model(RUNS, SYSTEM)
+
+    # Act
+    ranking = SearchSpace.full_grid(SYSTEM).rank(optimizer.predict, k=2)
+
+    # Assert
+    assert cores(conf for conf, _ in ranking) == [8, 16]
+
+
+def test_slower_configuration_drawing_less_power_does_not_dominate():
+    # Arrange
+    # The same 900 seconds at half the power, but a quarter of the work.
+    fast = make_run(32, seconds_per_gflop=0.05, joules_per_gflop=5.0)
+    slow = make_run(8, seconds_per_gflop=0.2, joules_per_gflop=10.0)
+    optimizer = ParetoOptimizer()
+
+    # Act
+    optimizer.make_model([slow, fast], SYSTEM)
+
+    # Assert
+    assert slow.energy_used_joules < fast.energy_used_joules
+    assert cores(point.configuration for point in optimizer.front().points) == [32]
+    assert (
+        optimizer.best_configurations(SearchSpace.full_grid(SYSTEM), [JobRequest()])[0].cores == 32
+    )
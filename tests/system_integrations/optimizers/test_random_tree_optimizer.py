@@ -0,0 +1,107 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from chronus.domain.configuration import Configuration
+from chronus.domain.cpu_info import SystemInfo
+from chronus.domain.Run import Run
+from chronus.SystemIntegration.optimizers.random_tree_forrest import RandomTreeOptimizer
+
+SYSTEM = SystemInfo(cores=32, threads_per_core=2, frequencies=[1500000.0, 2200000.0, 2500000.0])
+
+
+def efficiency(cores, threads_per_core, frequency):
+    # Peaks at 16 cores and 2.2 GHz, so the best configuration is not on the edge of the space.
+    return 10.0 - (cores - 16) ** 2 / 100 - (frequency / 1e6 - 2.2) ** 2 + threads_per_core / 10
+
+
+def make_runs(count: int, seed: int) -> list[Run]:
+    rng = np.random.default_rng(seed)
+    runs = []
+    for _ in range(count):
+        cores = int(rng.integers(1, SYSTEM.cores + 1))
+        threads_per_core = int(rng.integers(1, SYSTEM.threads_per_core + 1))
+        frequency = float(rng.choice(SYSTEM.frequencies))
+        # Without samples the power draw is taken to be 1 W, so the GFLOPS are the GFLOPS/W.
+        gflops = efficiency(cores, threads_per_core, frequency) + rng.normal(0, 0.2)
+        runs.append(
+            Run(
+                cpu="Fake CPU",
+                cores=cores,
+                threads_per_core=threads_per_core,
+                frequency=frequency,
+                gflops=gflops,
+            )
+        )
+    return runs
+
+
+def root_mean_squared_error(optimizer: RandomTreeOptimizer, runs: list[Run]) -> float:
+    configurations = [Configuration(run.cores, run.frequency, run.threads_per_core) for run in runs]
+    predicted = np.array(optimizer.predict(configurations))
+    actual = np.array([efficiency(run.cores, run.threads_per_core, run.frequency) for run in runs])
+    return float(np.sqrt(np.mean((predicted - actual) ** 2)))
+
+
+@pytest.mark.parametrize("search", ["halving", "random"])
+def test_search_with_a_budget_finds_a_configuration_near_the_best(search):
+    # Arrange
+    optimizer = RandomTreeOptimizer(search=search, budget=6)
+
+    # Act
+    optimizer.make_model(make_runs(120, seed=0), SYSTEM)
+
+    # Assert
+    best = optimizer._ranking[0][0]
+    assert (
+        efficiency(best.cores, best.threads_per_core, best.frequency)
+        > efficiency(16, 2, 2.2e6) - 0.25
+    )
+
+
+def test_hyperparameters_name_the_search_and_the_budget():
+    # Arrange
+    halving = RandomTreeOptimizer(search="halving", budget=10)
+
+    # Act
+    hyperparameters = halving.hyperparameters()
+
+    # Assert
+    assert hyperparameters["search"] == "halving"
+    assert hyperparameters["budget"] == 10
+    assert hyperparameters != RandomTreeOptimizer(search="grid").hyperparameters()
+
+
+@pytest.mark.parametrize("search, budget", [("exhaustive", None), ("random", 0)])
+def test_unknown_search_or_empty_budget_is_rejected(search, budget):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        RandomTreeOptimizer(search=search, budget=budget)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("CHRONUS_BENCHMARK"),
+    reason="Fits the exhaustive grid, 2,880 forests, set CHRONUS_BENCHMARK=1 to run it",
+)
+def test_benchmark_searches_against_the_exhaustive_grid(capsys):
+    # Arrange
+    train, test = make_runs(300, seed=0), make_runs(300, seed=1)
+    results = {}
+
+    # Act
+    for search in ["grid", "random", "halving"]:
+        optimizer = RandomTreeOptimizer(search=search)
+        start = time.perf_counter()
+        optimizer.make_model(train, SYSTEM)
+        results[search] = (time.perf_counter() - start, root_mean_squared_error(optimizer, test))
+
+    # Assert
+    with capsys.disabled():
+        for search, (seconds, error) in results.items():
+            print(f"\n{search:>8}: {seconds:7.1f} s, RMSE {error:.3f} GFLOPS/W", end="")
+    grid_seconds, grid_error = results["grid"]
+    halving_seconds, halving_error = results["halving"]
+    assert halving_seconds * 5 < grid_seconds
+    assert halving_error < grid_error * 1.25
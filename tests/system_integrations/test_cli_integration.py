@@ -1,4 +1,6 @@
-from chronus.cli.setup import get_optimizer
+import pytest
+
+from chronus.cli.setup import OPTIMIZERS, get_optimizer, get_optimizer_class
 from chronus.SystemIntegration.optimizers.bruteforce_optmizer import BruteForceOptimizer
 from chronus.SystemIntegration.optimizers.linear_regression import LinearRegressionOptimizer
 from chronus.SystemIntegration.optimizers.random_tree_forrest import RandomTreeOptimizer
@@ -32,3 +34,17 @@ def test_get_optimizer_random_tree():
 
     # Assert
     assert isinstance(optimizer, RandomTreeOptimizer)
+
+
+def test_optimizer_registry_names_match_optimizers():
+    for model_type in OPTIMIZERS:
+        # Act
+        optimizer_class = get_optimizer_class(model_type)
+
+        # Assert
+        assert optimizer_class.name() == model_type
+
+
+def test_get_optimizer_unknown_type():
+    with pytest.raises(Exception):
+        get_optimizer("unknown")
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import chronus
+
+# `chronus slurm-config` runs on every job submission, so its cold start has a budget.
+SLURM_CONFIG_IMPORT_BUDGET_SECONDS = 0.5
+HEAVY_MODULES = ("pandas", "sklearn", "pyghmi", "psutil", "numpy", "rich")
+
+SLURM_CONFIG_IMPORTS = """
+import sys
+from chronus.__main__ import app
+from chronus.application.run_model_service import RunModelService
+from chronus.cli.setup import get_optimizer
+from chronus.SystemIntegration.settings_interface.etc_storage import EtcLocalStorage
+get_optimizer("brute-force")
+print(",".join(sorted(sys.modules)))
+"""
+
+
+def _import_slurm_config() -> subprocess.CompletedProcess:
+    repo_root = os.path.dirname(os.path.dirname(chronus.__file__))
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SLURM_CONFIG_IMPORTS],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": repo_root},
+    )
+
+
+def _total_import_seconds(importtime_output: str) -> float:
+    total_microseconds = 0
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Only top level imports, their cumulative time includes the nested ones.
+        if cumulative.strip().isdigit() and not module.startswith("  "):
+            total_microseconds += int(cumulative)
+    return total_microseconds / 1_000_000
+
+
+def test_slurm_config_does_not_import_heavy_modules():
+    # Act
+    result = _import_slurm_config()
+
+    # Assert
+    imported = set(result.stdout.strip().split(","))
+    assert [module for module in HEAVY_MODULES if module in imported] == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("CHRONUS_BENCHMARK"),
+    reason="Measures wall clock time, set CHRONUS_BENCHMARK=1 to run it",
+)
+def test_slurm_config_imports_within_budget():
+    # Act
+    result = _import_slurm_config()
+
+    # Assert
+    assert _total_import_seconds(result.stderr) < SLURM_CONFIG_IMPORT_BUDGET_SECONDS
@@ -89,3 +89,30 @@ def xtest_saving_a_run_can_be_loaded_with_the_same_values(csv_file):
     assert run.flop == 30.0e8
     assert run.energy_used_joules == 10.0
     assert run.gflops_per_watt == 3.0
+
+
+def test_iter_runs_streams_saved_runs_in_batches(csv_file):
+    # Arrange
+    repo = CsvRunRepository(csv_file, batch_size=2)
+    for cores in range(1, 6):
+        run = Run(cpu="test", cores=cores, frequency=1.5, gflops=30.0, flop=30.0e9)
+        run.add_sample(
+            SystemSample(
+                timestamp=datetime_from_string("2020-01-01 00:00:1"), current_power_draw=10.0
+            )
+        )
+        run.add_sample(
+            SystemSample(
+                timestamp=datetime_from_string("2020-01-01 00:00:2"), current_power_draw=10.0
+            )
+        )
+        run.start_time = datetime_from_string("2020-01-01 00:00:01")
+        run.finish(datetime_from_string("2020-01-01 00:00:02"))
+        repo.save_run(run)
+
+    # Act
+    runs = repo.iter_runs()
+
+    # Assert
+    assert [run.cores for run in runs] == [1, 2, 3, 4, 5]
+    assert list(repo.iter_samples()) == []
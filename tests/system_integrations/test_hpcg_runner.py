@@ -4,8 +4,13 @@ import freezegun
 import pytest
 
 from chronus.application.benchmark_service import JobFailedException
+from chronus.domain.configuration import Configuration
+from chronus.domain.job_state import JobState
 from chronus.SystemIntegration.application_runners.hpcg import HpcgService
-from tests.system_integrations.fixtures import mock_subprocess_run
+from chronus.SystemIntegration.job_state_trackers.slurm_job_state_tracker import (
+    SlurmJobStateTracker,
+)
+from tests.system_integrations.fixtures import fake_slurm, mock_subprocess_run
 
 
 @pytest.fixture
@@ -124,77 +129,32 @@ def test_hpcg_run_calls_sbatch(hpcg_service_factory, tmpdir, mocker):
     )
 
 
-def test_hpcg_is_running_is_when_scontrol_running(hpcg_service_factory, mock_subprocess_run):
+@pytest.mark.parametrize(
+    "state, is_running", [("PENDING", True), ("RUNNING", True), ("COMPLETED", False)]
+)
+def test_hpcg_is_running_follows_the_job_state(tmpdir, fake_slurm, state, is_running):
     # Arrange
-    app_runner = hpcg_service_factory()
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir))
     app_runner.prepare()
-    job_id = 449
-    mocked_subprocess_run = mock_subprocess_run()
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=f"Submitted batch job {job_id}"
-    )
-
-    # Act
     app_runner.run(cores=10, frequency=1_500_000)
+    fake_slurm.jobs["449"] = state
 
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=SCONTROL_IS_RUNNING_OUTPUT
-    )
-    is_running = app_runner.is_running()
-
-    # Assert
-    assert is_running is True
-    mocked_subprocess_run.assert_called_with(
-        ["scontrol", "show", "job", str(job_id)], stdout=subprocess.PIPE
-    )
+    # Act / Assert
+    assert app_runner.is_running() is is_running
 
 
-def test_hpcg_is_not_running_when_scontrol_completed(hpcg_service_factory, mock_subprocess_run):
+def test_hpcg_asks_squeue_for_the_submitted_job(tmpdir, fake_slurm):
     # Arrange
-    app_runner = hpcg_service_factory()
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir))
     app_runner.prepare()
-    job_id = 449
-    mocked_subprocess_run = mock_subprocess_run()
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=f"Submitted batch job {job_id}"
-    )
-
-    # Act
     app_runner.run(cores=10, frequency=1_500_000)
 
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=SCONTROL_IS_COMPLETED_OUTPUT
-    )
-    is_running = app_runner.is_running()
-
-    # Assert
-    assert is_running is False
-    mocked_subprocess_run.assert_called_with(
-        ["scontrol", "show", "job", str(job_id)], stdout=subprocess.PIPE
-    )
-
-
-def test_hpcg_is_getting_the_job_id_from_scontrol(hpcg_service_factory, mock_subprocess_run):
-    # Arrange
-    app_runner = hpcg_service_factory()
-    app_runner.prepare()
-    job_id = 300
-    mocked_subprocess_run = mock_subprocess_run()
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=f"Submitted batch job {job_id}"
-    )
-
     # Act
-    app_runner.run(cores=10, frequency=1_500_000)
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=SCONTROL_IS_COMPLETED_OUTPUT
-    )
     app_runner.is_running()
 
     # Assert
-    mocked_subprocess_run.assert_called_with(
-        ["scontrol", "show", "job", str(job_id)], stdout=subprocess.PIPE
-    )
+    assert fake_slurm.calls[-1][0] == "squeue"
+    assert "--jobs=449" in fake_slurm.calls[-1]
 
 
 def test_cores_in_slurm_file_is_correct(hpcg_service_factory, tmpdir):
@@ -240,6 +200,39 @@ def test_thread_per_core_in_slurm_file_is_correct(hpcg_service_factory, tmpdir):
     assert "--ntasks-per-core=5" in last_line
 
 
+def test_jobs_are_pinned_to_the_node_of_the_runner(tmpdir, mocker):
+    # Arrange
+    mocker.patch.object(
+        subprocess,
+        "run",
+        return_value=subprocess.CompletedProcess(
+            args="sbatch", returncode=0, stdout="Submitted batch job 449"
+        ),
+    )
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir), node="node07")
+    app_runner.prepare()
+
+    # Act
+    app_runner.run(cores=5, frequency=1_500_000)
+
+    # Assert
+    content = tmpdir.join("hpcg_benchmark_output/HPCG_BENCHMARK.slurm").read()
+    assert "#SBATCH --nodes=1\n#SBATCH --nodelist=node07\n" in content
+
+
+def test_jobs_are_not_pinned_without_a_node(hpcg_service_factory, tmpdir):
+    # Arrange
+    app_runner = hpcg_service_factory()
+    app_runner.prepare()
+
+    # Act
+    app_runner.run(cores=5, frequency=1_500_000)
+
+    # Assert
+    content = tmpdir.join("hpcg_benchmark_output/HPCG_BENCHMARK.slurm").read()
+    assert "--nodelist" not in content
+
+
 def test_hpcg_gives_correct_result_when_scontrol_completed(
     hpcg_service_factory, mock_subprocess_run, make_file
 ):
@@ -331,29 +324,83 @@ def test_files_are_deleted_after_is_running_is_returning_false(
     assert not tmpdir.join("hpcg_benchmark_output").isdir()
 
 
-def test_returns_is_raises_job_failed_exception_when_scontrol_is_failed(
-    hpcg_service_factory, mock_subprocess_run, make_file
+@pytest.mark.parametrize("state", ["FAILED", "TIMEOUT", "CANCELLED by 1000", "OUT_OF_MEMORY"])
+def test_is_running_raises_job_failed_exception_when_the_job_failed(tmpdir, fake_slurm, state):
+    # Arrange
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir))
+    app_runner.prepare()
+    app_runner.run(cores=10, frequency=1_500_000)
+    fake_slurm.jobs["449"] = state
+
+    # Assert
+    with pytest.raises(JobFailedException):
+        app_runner.is_running()
+
+
+def test_is_running_is_false_when_slurm_forgot_a_job_that_left_its_output(
+    tmpdir, fake_slurm, make_file
 ):
     # Arrange
-    app_runner = hpcg_service_factory()
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir))
     app_runner.prepare()
-    mocked_subprocess_run = mock_subprocess_run()
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=f"Submitted batch job 123"
+    app_runner.run(cores=10, frequency=1_500_000)
+    del fake_slurm.jobs["449"]
+    make_file("HPCG-Benchmark_3.1_2023-04-24_04-16-52.txt", HPCG_OUTPUT)
+
+    # Act / Assert
+    assert app_runner.is_running() is False
+
+
+def test_is_running_waits_out_a_job_slurm_does_not_know_before_it_fails(tmpdir, fake_slurm):
+    # Arrange
+    now = [0.0]
+    app_runner = HpcgService(
+        "/test/xhpcg", output_dir=str(tmpdir), unknown_grace_seconds=60.0, clock=lambda: now[0]
     )
+    app_runner.prepare()
+    app_runner.run(cores=10, frequency=1_500_000)
+    del fake_slurm.jobs["449"]
 
     # Act
-    app_runner.run(cores=10, frequency=1_500_000)
-    mocked_subprocess_run = mock_subprocess_run()
-    mocked_subprocess_run.return_value = subprocess.CompletedProcess(
-        args="", returncode=0, stdout=SCONTROL_IS_FAILED_OUTPUT
-    )
+    running_at_first = app_runner.is_running()
+    now[0] = 59.0
+    running_within_grace = app_runner.is_running()
+    now[0] = 60.0
 
     # Assert
+    assert running_at_first is True
+    assert running_within_grace is True
     with pytest.raises(JobFailedException):
         app_runner.is_running()
 
 
+def test_job_slurm_knows_again_gets_a_new_grace_period(tmpdir, fake_slurm):
+    # Arrange
+    now = [0.0]
+    app_runner = HpcgService(
+        "/test/xhpcg",
+        output_dir=str(tmpdir),
+        job_state_tracker=SlurmJobStateTracker(cache_seconds=0.0),
+        unknown_grace_seconds=60.0,
+        clock=lambda: now[0],
+    )
+    app_runner.prepare()
+    app_runner.run(cores=10, frequency=1_500_000)
+    del fake_slurm.jobs["449"]
+    app_runner.is_running()
+    fake_slurm.jobs["449"] = "RUNNING"
+    now[0] = 30.0
+    app_runner.is_running()
+    del fake_slurm.jobs["449"]
+
+    # Act
+    now[0] = 70.0
+    running = app_runner.is_running()
+
+    # Assert
+    assert running is True
+
+
 @freezegun.freeze_time("2020-11-24 14:00:00")
 def test_if_dir_is_not_empty_backup_old_files_with_timestamp(
     hpcg_service_factory, tmpdir, make_file
@@ -370,6 +417,77 @@ def test_if_dir_is_not_empty_backup_old_files_with_timestamp(
     assert tmpdir.join("hpcg_benchmark_output_2020-11-24T14:00:00").isdir()
 
 
+def test_hpcg_array_makes_a_directory_with_a_dat_file_per_task(hpcg_service_factory, tmpdir):
+    # Arrange
+    app_runner = hpcg_service_factory()
+    app_runner.prepare()
+
+    # Act
+    app_runner.run_array(ARRAY_CONFIGURATIONS)
+
+    # Assert
+    for task in range(len(ARRAY_CONFIGURATIONS)):
+        assert tmpdir.join(f"hpcg_benchmark_output/task_{task}/hpcg.dat").isfile()
+
+
+def test_hpcg_array_slurm_file_contains_correct_content(hpcg_service_factory, tmpdir, mocker):
+    # Arrange
+    app_runner = hpcg_service_factory()
+    app_runner.prepare()
+
+    # Act
+    app_runner.run_array(ARRAY_CONFIGURATIONS)
+
+    # Assert
+    content = tmpdir.join("hpcg_benchmark_output/HPCG_BENCHMARK_ARRAY.slurm").read()
+    assert content == HPCG_ARRAY_SLURM_FILE_CONTENT
+    assert (
+        mocker.call(
+            ["sbatch", "HPCG_BENCHMARK_ARRAY.slurm"],
+            cwd=str(tmpdir.join("hpcg_benchmark_output")),
+            stdout=subprocess.PIPE,
+        )
+        in subprocess.run.call_args_list
+    )
+
+
+def test_hpcg_array_task_states_are_polled_together(tmpdir, fake_slurm):
+    # Arrange
+    app_runner = HpcgService("/test/xhpcg", output_dir=str(tmpdir))
+    app_runner.prepare()
+    app_runner.run_array(ARRAY_CONFIGURATIONS + ARRAY_CONFIGURATIONS)
+    fake_slurm.jobs.update({"449_1": "RUNNING", "449_2": "PENDING", "449_3": "PENDING"})
+    # Task 0 has finished and Slurm has forgotten it, its output tells it completed.
+    tmpdir.join("hpcg_benchmark_output/task_0/HPCG-Benchmark_3.1.txt").write(HPCG_OUTPUT)
+
+    # Act
+    states = app_runner.array_task_states()
+
+    # Assert
+    assert states == {
+        0: JobState.COMPLETED,
+        1: JobState.RUNNING,
+        2: JobState.PENDING,
+        3: JobState.PENDING,
+    }
+    assert fake_slurm.calls_to("squeue") == 1
+    assert fake_slurm.calls_to("sacct") == 1
+
+
+def test_hpcg_array_task_gflops_are_read_from_its_directory(hpcg_service_factory, tmpdir):
+    # Arrange
+    app_runner = hpcg_service_factory()
+    app_runner.prepare()
+    app_runner.run_array(ARRAY_CONFIGURATIONS)
+    tmpdir.join("hpcg_benchmark_output/task_1/HPCG-Benchmark_3.1.txt").write(HPCG_OUTPUT)
+
+    # Act
+    gflops = app_runner.array_task_gflops(1)
+
+    # Assert
+    assert gflops == 1.51085
+
+
 HPCG_DAT_FILE_CONTENT = """HPCG benchmark input file
 Benchmarked on 2020-11-24 14:00:00
 104 104 104
@@ -385,35 +503,6 @@ HPCG_SLURM_FILE_CONTENT = """#!/bin/bash
 
 srun --mpi=pmix_v4 --ntasks-per-core=2 /test/xhpcg"""
 
-SCONTROL_IS_RUNNING_OUTPUT = b"""JobId=450 JobName=RUN_CPU.slurm
-   UserId=aaen(1000) GroupId=aaen(1000) MCS_label=N/A
-   Priority=4294901754 Nice=0 Account=(null) QOS=(null)
-   JobState=RUNNING Reason=None Dependency=(null)
-   Requeue=1 Restarts=0 BatchFlag=1 Reboot=0 ExitCode=0:0
-   RunTime=00:00:52 TimeLimit=01:00:00 TimeMin=N/A
-   SubmitTime=2023-04-24T08:20:30 EligibleTime=2023-04-24T08:20:30
-   AccrueTime=2023-04-24T08:20:30
-   StartTime=2023-04-24T08:20:31 EndTime=2023-04-24T09:20:31 Deadline=N/A
-   SuspendTime=None SecsPreSuspend=0 LastSchedEval=2023-04-24T08:20:31 Scheduler=Backfill
-   Partition=debug AllocNode:Sid=host114:46562
-   ReqNodeList=(null) ExcNodeList=(null)
-   NodeList=host114.grid.aau.dk
-   BatchHost=host114.grid.aau.dk
-   NumNodes=1 NumCPUs=2 NumTasks=2 CPUs/Task=1 ReqB:S:C:T=0:0:*:*
-   TRES=cpu=2,mem=257393M,node=1,billing=2
-   Socks/Node=* NtasksPerN:B:S:C=0:0:*:* CoreSpec=*
-   MinCPUsNode=1 MinMemoryNode=0 MinTmpDiskNode=0
-   Features=(null) DelayBoot=00:00:00
-   OverSubscribe=OK Contiguous=0 Licenses=(null) Network=(null)
-   Command=./RUN_CPU.slurm
-   WorkDir=/home/aaen/slurm-chronus
-   StdErr=/home/aaen/slurm-chronus/out/cpu-info.err
-   StdIn=/dev/null
-   StdOut=/home/aaen/slurm-chronus/out/cpu-info.out
-   CPU_min_freq=2200000 CPU_max_freq=2200000
-   Power=
-
-                              """
 SCONTROL_IS_COMPLETED_OUTPUT = b"""JobId=450 JobName=RUN_CPU.slurm
    UserId=aaen(1000) GroupId=aaen(1000) MCS_label=N/A
    Priority=4294901754 Nice=0 Account=(null) QOS=(null)
@@ -444,34 +533,6 @@ SCONTROL_IS_COMPLETED_OUTPUT = b"""JobId=450 JobName=RUN_CPU.slurm
 
 """
 
-SCONTROL_IS_FAILED_OUTPUT = b"""JobId=919 JobName=HPCG_BENCHMARK
-   UserId=aaen(1000) GroupId=aaen(1000) MCS_label=N/A
-   Priority=4294901329 Nice=0 Account=(null) QOS=(null)
-   JobState=FAILED Reason=NonZeroExitCode Dependency=(null)
-   Requeue=1 Restarts=0 BatchFlag=1 Reboot=0 ExitCode=127:0
-   RunTime=00:00:01 TimeLimit=365-00:00:00 TimeMin=N/A
-   SubmitTime=2023-05-05T09:54:14 EligibleTime=2023-05-05T09:54:14
-   AccrueTime=2023-05-05T09:54:14
-   StartTime=2023-05-05T09:54:14 EndTime=2023-05-05T09:54:15 Deadline=N/A
-   SuspendTime=None SecsPreSuspend=0 LastSchedEval=2023-05-05T09:54:14 Scheduler=Backfill
-   Partition=debug AllocNode:Sid=host114:2085786
-   ReqNodeList=(null) ExcNodeList=(null)
-   NodeList=host114.grid.aau.dk
-   BatchHost=host114.grid.aau.dk
-   NumNodes=1 NumCPUs=12 NumTasks=11 CPUs/Task=1 ReqB:S:C:T=0:0:*:*
-   TRES=cpu=12,mem=257393M,node=1,billing=12
-   Socks/Node=* NtasksPerN:B:S:C=0:0:*:* CoreSpec=*
-   MinCPUsNode=1 MinMemoryNode=0 MinTmpDiskNode=0
-   Features=(null) DelayBoot=00:00:00
-   OverSubscribe=OK Contiguous=0 Licenses=(null) Network=(null)
-   Command=/home/aaen/chronus/hpcg_benchmark_output/HPCG_BENCHMARK.slurm
-   WorkDir=/home/aaen/chronus/hpcg_benchmark_output
-   StdErr=/home/aaen/chronus/hpcg_benchmark_output/HPCG_BENCHMARK.err
-   StdIn=/dev/null
-   StdOut=/home/aaen/chronus/hpcg_benchmark_output/HPCG_BENCHMARK.out
-   CPU_max_freq=1500000
-   Power="""
-
 HPCG_LOG = """WARNING: PERFORMING UNPRECONDITIONED ITERATIONS
 Call [0] Number of Iterations [11] Scaled Residual [2.71587e-14]
 WARNING: PERFORMING UNPRECONDITIONED ITERATIONS
@@ -611,3 +672,25 @@ Final Summary::Reference version of ComputeWAXPBY used=Performance results are m
 Final Summary::Results are valid but execution time (sec) is=0.0878437
 Final Summary::You have selected the QuickPath option=Results are official for legacy installed systems with confirmation from the HPCG Benchmark leaders.
 Final Summary::After confirmation please upload results from the YAML file contents to=http://hpcg-benchmark.org"""
+
+ARRAY_CONFIGURATIONS = [
+    Configuration(cores=4, frequency=1_500_000, threads_per_core=1),
+    Configuration(cores=8, frequency=2_000_000.0, threads_per_core=2),
+]
+
+HPCG_ARRAY_SLURM_FILE_CONTENT = """#!/bin/bash
+#SBATCH --job-name=HPCG_BENCHMARK
+#SBATCH --output=task_%a/HPCG_BENCHMARK.out
+#SBATCH --error=task_%a/HPCG_BENCHMARK.err
+#SBATCH --nodes=1
+#SBATCH --ntasks=8
+#SBATCH --array=0-1%1
+
+CORES=(4 8)
+FREQUENCIES=(1500000 2000000)
+THREADS_PER_CORE=(1 2)
+TASK=$SLURM_ARRAY_TASK_ID
+
+cd task_$TASK
+srun --mpi=pmix_v4 --ntasks=${CORES[$TASK]} --cpu-freq=${FREQUENCIES[$TASK]} \\
+    --ntasks-per-core=${THREADS_PER_CORE[$TASK]} /test/xhpcg"""
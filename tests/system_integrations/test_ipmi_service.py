@@ -117,6 +117,115 @@ def test_gets_cpu_power(mock_ipmi):
     assert sample.cpu_power == 54.0
 
 
+class FakeSensorRecord:
+    def __init__(self, name: str, sensor_number: int, value: float):
+        self.name = name
+        self.sensor_number = sensor_number
+        self.sensor_lun = 0
+        self.value = value
+
+    def decode_sensor_reading(self, ipmicmd, reading):
+        return SensorReading(
+            {
+                "name": self.name,
+                "type": "Power",
+                "id": self.sensor_number,
+                "value": self.value,
+                "imprecision": None,
+                "states": [],
+                "state_ids": [],
+                "health": 0,
+            },
+            "W",
+        )
+
+
+class FakeSdr:
+    def __init__(self, records: list[FakeSensorRecord]):
+        self.sensors = {record.sensor_number: record for record in records}
+
+    def get_sensor_numbers(self):
+        return iter(self.sensors)
+
+
+@pytest.fixture
+def mock_sdr(mocker):
+    mocker.patch("pyghmi.ipmi.private.localsession.Session")
+    sdr = FakeSdr(
+        [
+            FakeSensorRecord("Inlet_Temp", 1, 35.0),
+            FakeSensorRecord("Total_Power", 2, 250.0),
+            FakeSensorRecord("CPU_Temp", 3, 54.0),
+            FakeSensorRecord("CPU_Power", 4, 120.0),
+        ]
+    )
+    return {
+        "init_sdr": mocker.patch("pyghmi.ipmi.command.Command.init_sdr", return_value=sdr),
+        "raw_command": mocker.patch(
+            "pyghmi.ipmi.command.Command.raw_command", return_value={"data": b"\x00"}
+        ),
+        "get_sensor_reading": mocker.patch("pyghmi.ipmi.command.Command.get_sensor_reading"),
+    }
+
+
+def test_cached_sdr_reads_sensors_by_number(mock_sdr):
+    # Arrange
+    ipmi = IpmiSystemService(cache_sdr=True)
+
+    # Act
+    sample = ipmi.sample()
+
+    # Assert
+    assert sample.current_power_draw == 250.0
+    assert sample.cpu_temp == 54.0
+    assert sample.cpu_power == 120.0
+    assert mock_sdr["get_sensor_reading"].call_count == 0
+    sensor_numbers = [c.kwargs["data"] for c in mock_sdr["raw_command"].call_args_list]
+    assert sorted(sensor_numbers) == [(2,), (3,), (4,)]
+
+
+def test_cached_sdr_is_resolved_once(mock_sdr):
+    # Arrange
+    ipmi = IpmiSystemService(cache_sdr=True)
+
+    # Act
+    for _ in range(5):
+        ipmi.sample()
+
+    # Assert
+    assert mock_sdr["init_sdr"].call_count == 1
+
+
+def test_only_configured_sensors_are_read(mock_sdr):
+    # Arrange
+    ipmi = IpmiSystemService(sensors={"current_power_draw": "Total_Power"}, cache_sdr=True)
+
+    # Act
+    sample = ipmi.sample()
+
+    # Assert
+    assert sample.current_power_draw == 250.0
+    assert mock_sdr["raw_command"].call_count == 1
+
+
+def test_sensor_missing_from_sdr_falls_back_to_lookup_by_name(mock_sdr):
+    # Arrange
+    mock_sdr["get_sensor_reading"].return_value = get_sensor_data[0]
+    ipmi = IpmiSystemService(sensors={"cpu_temp": "OEM_Temp"}, cache_sdr=True)
+
+    # Act
+    sample = ipmi.sample()
+
+    # Assert
+    assert call("OEM_Temp") in mock_sdr["get_sensor_reading"].call_args_list
+    assert sample.cpu_temp == 35.0
+
+
+def test_unknown_sample_field_raises(mock_sdr):
+    with pytest.raises(ValueError):
+        IpmiSystemService(sensors={"fan_speed": "FAN1"})
+
+
 get_sensor_data = [
     SensorReading(
         {
@@ -2625,3 +2734,23 @@ get_sensor_data = [
         "",
     ),
 ]
+
+
+def test_remote_bmc_is_read_over_the_network_without_cpu_frequencies(mocker):
+    # Arrange
+    command = mocker.patch(
+        "chronus.SystemIntegration.system_service_interfaces.ipmi_system_service.ipmi.Command"
+    )
+    command.return_value.get_sensor_reading.return_value = get_sensor_data[0]
+    get_cpu_freq = mocker.patch(
+        "chronus.SystemIntegration.system_service_interfaces.ipmi_system_service._get_cpu_freq"
+    )
+    ipmi = IpmiSystemService(bmc="node07-bmc", userid="admin", password="secret")
+
+    # Act
+    sample = ipmi.sample()
+
+    # Assert
+    command.assert_called_once_with(bmc="node07-bmc", userid="admin", password="secret")
+    assert sample.cpu_freq is None
+    get_cpu_freq.assert_not_called()
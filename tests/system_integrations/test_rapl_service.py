@@ -0,0 +1,91 @@
+import pytest
+
+from chronus.SystemIntegration.system_service_interfaces.rapl_system_service import (
+    RaplSystemService,
+)
+
+
+@pytest.fixture
+def powercap(tmp_path):
+    """A fake /sys/class/powercap tree with a package zone and its core and dram subzones."""
+
+    def make_zone(zone: str, name: str, energy_uj: int, max_energy_range_uj: int = 1000_000_000):
+        path = tmp_path / zone
+        path.mkdir()
+        (path / "name").write_text(name + "\n")
+        (path / "max_energy_range_uj").write_text(f"{max_energy_range_uj}\n")
+        set_energy(zone, energy_uj)
+
+    def set_energy(zone: str, energy_uj: int):
+        (tmp_path / zone / "energy_uj").write_text(f"{energy_uj}\n")
+
+    make_zone("intel-rapl:0", "package-0", 100_000_000)
+    make_zone("intel-rapl:0:0", "core", 50_000_000)
+    make_zone("intel-rapl:0:1", "dram", 20_000_000)
+    (tmp_path / "intel-rapl").mkdir()
+
+    class Powercap:
+        root = str(tmp_path)
+        set = staticmethod(set_energy)
+
+    return Powercap
+
+
+def test_energy_is_the_counter_difference(powercap):
+    # Arrange
+    rapl = RaplSystemService(powercap.root)
+    powercap.set("intel-rapl:0", 130_000_000)
+    powercap.set("intel-rapl:0:1", 25_000_000)
+
+    # Act
+    sample = rapl.sample()
+
+    # Assert
+    assert sample.energy == 35.0
+
+
+def test_only_package_and_dram_zones_are_read(powercap):
+    # Arrange
+    rapl = RaplSystemService(powercap.root)
+    powercap.set("intel-rapl:0:0", 90_000_000)
+
+    # Act
+    sample = rapl.sample()
+
+    # Assert
+    assert sample.energy == 0.0
+
+
+def test_counter_wraparound(powercap):
+    # Arrange
+    rapl = RaplSystemService(powercap.root)
+    powercap.set("intel-rapl:0", 999_000_000)
+    rapl.sample()
+    powercap.set("intel-rapl:0", 1_000_000)
+
+    # Act
+    sample = rapl.sample()
+
+    # Assert
+    assert sample.energy == 899.0 + 2.0
+
+
+def test_power_is_average_since_previous_sample(powercap, mocker):
+    # Arrange
+    clock = mocker.patch("time.monotonic", return_value=10.0)
+    rapl = RaplSystemService(powercap.root)
+    powercap.set("intel-rapl:0", 120_000_000)
+    powercap.set("intel-rapl:0:1", 30_000_000)
+    clock.return_value = 12.0
+
+    # Act
+    sample = rapl.sample()
+
+    # Assert
+    assert sample.current_power_draw == 15.0
+    assert sample.cpu_power == 10.0
+
+
+def test_raises_when_there_are_no_rapl_zones(tmp_path):
+    with pytest.raises(RuntimeError):
+        RaplSystemService(str(tmp_path))
@@ -0,0 +1,143 @@
+import pytest
+
+from chronus.domain.job_state import JobState
+from chronus.SystemIntegration.job_state_trackers.slurm_job_state_tracker import (
+    SlurmJobStateTracker,
+    parse_job_states,
+)
+from tests.system_integrations.fixtures import fake_slurm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_many_jobs_are_polled_with_one_squeue_call(fake_slurm):
+    # Arrange
+    job_ids = [fake_slurm.submit("RUNNING") for _ in range(10)]
+    tracker = SlurmJobStateTracker()
+
+    # Act
+    states = tracker.states(job_ids)
+
+    # Assert
+    assert set(states.values()) == {JobState.RUNNING}
+    assert fake_slurm.calls_to("squeue") == 1
+    assert fake_slurm.calls_to("sacct") == 0
+
+
+def test_states_are_cached_for_the_interval(fake_slurm):
+    # Arrange
+    clock = FakeClock()
+    job_id = fake_slurm.submit("RUNNING")
+    tracker = SlurmJobStateTracker(cache_seconds=5.0, clock=clock)
+    tracker.state(job_id)
+    fake_slurm.jobs[job_id] = "COMPLETED"
+
+    # Act
+    cached = tracker.state(job_id)
+    clock.now = 5.0
+    polled = tracker.state(job_id)
+
+    # Assert
+    assert cached is JobState.RUNNING
+    assert polled is JobState.COMPLETED
+    assert fake_slurm.calls_to("squeue") == 2
+
+
+def test_jobs_squeue_has_forgotten_are_asked_from_sacct(fake_slurm):
+    # Arrange
+    running = fake_slurm.submit("RUNNING")
+    timed_out = fake_slurm.submit("TIMEOUT")
+    tracker = SlurmJobStateTracker()
+
+    # Act
+    states = tracker.states([running, timed_out])
+
+    # Assert
+    assert states == {running: JobState.RUNNING, timed_out: JobState.TIMEOUT}
+    assert fake_slurm.calls_to("sacct") == 1
+
+
+def test_jobs_in_a_terminal_state_are_not_polled_again(fake_slurm):
+    # Arrange
+    clock = FakeClock()
+    job_id = fake_slurm.submit("OUT_OF_MEMORY")
+    tracker = SlurmJobStateTracker(cache_seconds=1.0, clock=clock)
+    tracker.state(job_id)
+    calls = len(fake_slurm.calls)
+
+    # Act
+    clock.now = 10.0
+    state = tracker.state(job_id)
+
+    # Assert
+    assert state is JobState.OUT_OF_MEMORY
+    assert len(fake_slurm.calls) == calls
+
+
+def test_jobs_slurm_does_not_know_are_unknown(fake_slurm):
+    # Act
+    state = SlurmJobStateTracker().state("123")
+
+    # Assert
+    assert state is JobState.UNKNOWN
+
+
+def test_jobs_slurm_does_not_know_for_too_long_are_no_longer_polled(fake_slurm):
+    # Arrange
+    clock = FakeClock()
+    running = fake_slurm.submit("RUNNING")
+    tracker = SlurmJobStateTracker(cache_seconds=1.0, clock=clock, max_unknown_polls=3)
+    tracker.track("123", running)
+
+    # Act
+    for second in range(3):
+        clock.now = float(second)
+        tracker.state(running)
+    clock.now = 3.0
+    tracker.state(running)
+
+    # Assert
+    assert fake_slurm.calls[-1][0] == "squeue"
+    assert "--jobs=" + running in fake_slurm.calls[-1]
+
+
+def test_parse_expands_pending_array_tasks_and_skips_job_steps():
+    # Arrange
+    output = (
+        "450_0|COMPLETED\n450_0.batch|COMPLETED\n450_1|CANCELLED by 1000\n450_[2-3%1]|PENDING\n"
+    )
+
+    # Act
+    states = parse_job_states(output)
+
+    # Assert
+    assert states == {
+        "450_0": JobState.COMPLETED,
+        "450_1": JobState.CANCELLED,
+        "450_2": JobState.PENDING,
+        "450_3": JobState.PENDING,
+    }
+
+
+@pytest.mark.parametrize(
+    "state, is_terminal, is_failed",
+    [
+        (JobState.PENDING, False, False),
+        (JobState.RUNNING, False, False),
+        (JobState.COMPLETED, True, False),
+        (JobState.TIMEOUT, True, True),
+        (JobState.CANCELLED, True, True),
+        (JobState.OUT_OF_MEMORY, True, True),
+        (JobState.UNKNOWN, False, False),
+    ],
+)
+def test_terminal_and_failed_states(state, is_terminal, is_failed):
+    # Act / Assert
+    assert state.is_terminal is is_terminal
+    assert state.is_failed is is_failed
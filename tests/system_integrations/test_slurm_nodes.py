@@ -0,0 +1,21 @@
+import subprocess
+
+from chronus.SystemIntegration.application_runners.slurm_nodes import list_partition_nodes
+
+
+def test_lists_every_node_of_the_partition_once(mocker):
+    # Arrange
+    run = mocker.patch.object(
+        subprocess,
+        "run",
+        return_value=subprocess.CompletedProcess(
+            args="sinfo", returncode=0, stdout="node01\nnode02\nnode01\n\n"
+        ),
+    )
+
+    # Act
+    nodes = list_partition_nodes("batch")
+
+    # Assert
+    assert nodes == ["node01", "node02"]
+    assert "--partition=batch" in run.call_args.args[0]
@@ -1,12 +1,17 @@
+import sqlite3
+import threading
+
 import freezegun
 import pytest
 
 from chronus.domain.benchmark import Benchmark
+from chronus.domain.benchmark_plan import BenchmarkPlan, PlanStatus
+from chronus.domain.configuration import Configuration
 from chronus.domain.cpu_info import SystemInfo
 from chronus.domain.model import Model
 from chronus.domain.Run import Run
 from chronus.domain.system_sample import SystemSample
-from chronus.SystemIntegration.repositories.sqlite_repository import SqliteRepository
+from chronus.SystemIntegration.repositories.sqlite_repository import MIGRATIONS, SqliteRepository
 from tests.fixtures import datetime_from_string
 
 
@@ -341,3 +346,357 @@ def test_and_loads_cpufreq_from_system_sample(sqlite_db):
     assert saved_sys.cpu_freq[1]["current"] == 5000
     assert saved_sys.cpu_freq[1]["min"] == 4000
     assert saved_sys.cpu_freq[1]["max"] == 6000
+
+
+def _finished_run(cpu: str, power_draws: list[float]) -> Run:
+    run = Run(cpu=cpu, gflops=1.0)
+    run.start_time = datetime_from_string("2020-01-01 00:00:00")
+    for second, power_draw in enumerate(power_draws):
+        run.add_sample(
+            SystemSample(
+                timestamp=datetime_from_string(f"2020-01-01 00:00:{second:02d}"),
+                current_power_draw=power_draw,
+            )
+        )
+    run.finish(datetime_from_string("2020-01-01 00:00:10"))
+    return run
+
+
+def test_runs_are_loaded_with_their_own_samples(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(cores=2), id=1)
+    benchmark.add_run(_finished_run("run1", [10.0, 11.0]))
+    benchmark.add_run(_finished_run("run2", [20.0, 30.0]))
+    repo.save_benchmark(benchmark)
+
+    # Act
+    runs = repo.get_all_runs_from_system(benchmark.system_info)
+
+    # Assert
+    assert [run.cpu for run in runs] == ["run1", "run2"]
+    assert [s.current_power_draw for s in runs[0].samples] == [10.0, 11.0]
+    assert [s.current_power_draw for s in runs[1].samples] == [20.0, 30.0]
+
+
+def test_repository_reuses_one_connection(sqlite_db, mocker):
+    # Arrange
+    connect = mocker.spy(sqlite3, "connect")
+    repo = SqliteRepository(sqlite_db)
+    for benchmark_id in (1, 2):
+        benchmark = Benchmark(application="test", system_info=SystemInfo(), id=benchmark_id)
+        for _ in range(3):
+            benchmark.add_run(_finished_run("test", [10.0, 10.0]))
+        repo.save_benchmark(benchmark)
+
+    # Act
+    benchmarks = repo.get_all_benchmarks()
+
+    # Assert
+    assert connect.call_count == 1
+    assert [len(benchmark.runs) for benchmark in benchmarks] == [3, 3]
+    assert all(len(run.samples) == 2 for b in benchmarks for run in b.runs)
+
+
+def test_database_uses_wal_journal_mode(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db, synchronous="full")
+
+    # Act
+    journal_mode = repo._connection().execute("PRAGMA journal_mode;").fetchone()[0]
+    synchronous = repo._connection().execute("PRAGMA synchronous;").fetchone()[0]
+
+    # Assert
+    assert journal_mode == "wal"
+    assert synchronous == 2
+
+
+def test_unknown_synchronous_mode_raises(sqlite_db):
+    with pytest.raises(ValueError):
+        SqliteRepository(sqlite_db, synchronous="sometimes")
+
+
+def test_save_run_writes_samples_in_one_transaction(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    run = _finished_run("test", [10.0] * 50)
+    run.benchmark_id = 1
+    statements = []
+    repo._connection().set_trace_callback(statements.append)
+
+    # Act
+    repo.save_run(run)
+
+    # Assert
+    assert [s for s in statements if s.startswith("COMMIT")] == ["COMMIT"]
+    assert len(repo.get_all_runs()[0].samples) == 50
+
+
+def test_each_thread_gets_its_own_connection(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    connections = []
+
+    # Act
+    thread = threading.Thread(target=lambda: connections.append(repo._connection()))
+    thread.start()
+    thread.join()
+
+    # Assert
+    assert connections[0] is not repo._connection()
+    repo.close()
+
+
+def test_migrates_legacy_database_to_systems_table(sqlite_db):
+    # Arrange
+    system = SystemInfo(cpu_name="legacy", cores=4, frequencies=[1, 2])
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.execute(
+            "CREATE TABLE benchmarks (id INTEGER PRIMARY KEY, system_info TEXT, application TEXT,"
+            " created_at TEXT);"
+        )
+        conn.execute(
+            "INSERT INTO benchmarks (system_info, application, created_at) VALUES (?, ?, ?);",
+            (system.to_json(), "HPCG", "2020-01-01T00:00:00"),
+        )
+    conn.close()
+
+    # Act
+    repo = SqliteRepository(sqlite_db)
+
+    # Assert
+    version = repo._connection().execute("PRAGMA user_version;").fetchone()[0]
+    system_id = repo._connection().execute("SELECT system_id FROM benchmarks;").fetchone()[0]
+    assert version == len(MIGRATIONS)
+    assert system_id == system.digest()
+    assert repo.get_all_system_info() == [system]
+
+
+def test_migrations_that_ran_before_they_were_counted_are_skipped(sqlite_db):
+    # Arrange
+    SqliteRepository(sqlite_db).close()
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.execute("PRAGMA user_version = 0;")
+    conn.close()
+
+    # Act
+    repo = SqliteRepository(sqlite_db)
+
+    # Assert
+    assert repo._connection().execute("PRAGMA user_version;").fetchone()[0] == len(MIGRATIONS)
+
+
+def test_failed_migration_is_raised_and_not_counted(sqlite_db, mocker):
+    # Arrange
+    SqliteRepository(sqlite_db).close()
+    mocker.patch(
+        "chronus.SystemIntegration.repositories.sqlite_repository.MIGRATIONS",
+        MIGRATIONS + [["ALTER TABLE no_such_table ADD COLUMN energy REAL;"]],
+    )
+
+    # Act
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        SqliteRepository(sqlite_db)
+
+    # Assert
+    with sqlite3.connect(sqlite_db) as conn:
+        version = conn.execute("PRAGMA user_version;").fetchone()[0]
+    conn.close()
+    assert version == len(MIGRATIONS)
+
+
+def test_system_info_digest_is_stable():
+    # Arrange
+    system = SystemInfo(cpu_name="sys", cores=4, threads_per_core=2, frequencies=[1, 2])
+
+    # Act
+    digest = SystemInfo.from_json(system.to_json()).digest()
+
+    # Assert
+    assert digest == system.digest()
+    assert digest != SystemInfo(cpu_name="sys", cores=8, frequencies=[1, 2]).digest()
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        ("SELECT * FROM system_samples WHERE run_id = 1;", "system_samples_run_id_timestamp_idx"),
+        ("SELECT * FROM runs WHERE benchmark_id = 1;", "runs_benchmark_id_idx"),
+        ("SELECT * FROM benchmarks WHERE system_id = 'x';", "benchmarks_system_id_idx"),
+    ],
+)
+def test_lookups_use_indexes(sqlite_db, query, index):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+
+    # Act
+    plan = repo._connection().execute("EXPLAIN QUERY PLAN " + query).fetchall()
+
+    # Assert
+    assert index in plan[0][-1]
+
+
+def test_iter_runs_streams_runs_with_their_samples(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db, batch_size=2)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(cpu_name="sys1"), id=1)
+    for power_draw in (10.0, 20.0, 30.0):
+        benchmark.add_run(_finished_run("run", [power_draw, power_draw, power_draw]))
+    repo.save_benchmark(benchmark)
+    other = Benchmark(application="test", system_info=SystemInfo(cpu_name="sys2"), id=2)
+    other.add_run(_finished_run("other", [40.0, 40.0]))
+    repo.save_benchmark(other)
+
+    # Act
+    runs = list(repo.iter_runs(SystemInfo(cpu_name="sys1")))
+
+    # Assert
+    assert [[s.current_power_draw for s in run.samples] for run in runs] == [
+        [10.0] * 3,
+        [20.0] * 3,
+        [30.0] * 3,
+    ]
+
+
+def test_iter_runs_without_samples(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(), id=1)
+    benchmark.add_run(_finished_run("run", [10.0, 10.0]))
+    repo.save_benchmark(benchmark)
+
+    # Act
+    runs = list(repo.iter_runs(include_samples=False))
+
+    # Assert
+    assert len(runs) == 1
+    assert runs[0].samples == []
+
+
+def test_iter_runs_without_samples_keeps_the_saved_energy(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(), id=1)
+    run = _finished_run("run", [10.0, 30.0])
+    benchmark.add_run(run)
+    repo.save_benchmark(benchmark)
+
+    # Act
+    [loaded] = repo.iter_runs(include_samples=False)
+
+    # Assert
+    assert loaded.energy_used_joules == pytest.approx(run.energy_used_joules)
+    assert loaded.gflops_per_watt == pytest.approx(run.gflops_per_watt)
+    assert loaded.gflops_per_watt != loaded.gflops
+
+
+def test_iter_samples_of_selected_runs(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db, batch_size=1)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(), id=1)
+    for power_draw in (10.0, 20.0, 30.0):
+        benchmark.add_run(_finished_run("run", [power_draw, power_draw]))
+    repo.save_benchmark(benchmark)
+
+    # Act
+    samples = list(repo.iter_samples(run_ids=[3, 1]))
+
+    # Assert
+    assert [(run_id, s.current_power_draw) for run_id, s in samples] == [
+        (1, 10.0),
+        (1, 10.0),
+        (3, 30.0),
+        (3, 30.0),
+    ]
+
+
+def test_fix_gflops_per_watt_recomputes_energy_from_samples(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(), id=1)
+    runs = [_finished_run("run", [10.0, 30.0, 20.0]), _finished_run("run", [5.0, 5.0, 5.0, 5.0])]
+    runs.append(Run(cpu="no samples", gflops=7.0))
+    runs[-1].finish()
+    for run in runs:
+        benchmark.add_run(run)
+    repo.save_benchmark(benchmark)
+    repo._connection().execute("UPDATE runs SET energy_used = -1, gflops_per_watt = -1;")
+
+    # Act
+    repo.fix_gflops_per_watt()
+
+    # Assert
+    rows = repo._connection().execute("SELECT energy_used, gflops_per_watt FROM runs;")
+    assert rows.fetchall() == [
+        (pytest.approx(run.energy_used_joules), pytest.approx(run.gflops_per_watt)) for run in runs
+    ]
+
+
+def test_fix_gflops_per_watt_uses_energy_counters(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    benchmark = Benchmark(application="test", system_info=SystemInfo(), id=1)
+    run = Run(cpu="rapl", gflops=1.0)
+    run.start_time = datetime_from_string("2020-01-01 00:00:00")
+    for second, energy in enumerate([100.0, 112.5, 130.0]):
+        run.add_sample(
+            SystemSample(
+                timestamp=datetime_from_string(f"2020-01-01 00:00:{second:02d}"),
+                current_power_draw=10.0,
+                energy=energy,
+            )
+        )
+    run.finish(datetime_from_string("2020-01-01 00:00:10"))
+    benchmark.add_run(run)
+    repo.save_benchmark(benchmark)
+    repo._connection().execute("UPDATE runs SET energy_used = -1, gflops_per_watt = -1;")
+
+    # Act
+    repo.fix_gflops_per_watt()
+
+    # Assert
+    rows = repo._connection().execute("SELECT energy_used FROM runs;")
+    assert rows.fetchall() == [(30.0,)]
+    assert repo.get_all_runs()[0].samples[2].energy == 130.0
+
+
+def test_save_and_load_the_plan_of_a_benchmark(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    system = SystemInfo(cpu_name="sys1")
+    benchmark_id = repo.save_benchmark(Benchmark(application="test", system_info=system))
+    configurations = [
+        Configuration(cores=cores, frequency=1.5, threads_per_core=2) for cores in (1, 2)
+    ]
+    repo.save_plan(BenchmarkPlan.make(benchmark_id, configurations))
+
+    # Act
+    repo.set_plan_status(benchmark_id, 1, PlanStatus.FAILED)
+    plan = repo.get_latest_plan(system)
+
+    # Assert
+    assert plan.benchmark_id == benchmark_id
+    assert [planned.configuration for planned in plan.configurations] == configurations
+    assert [planned.status for planned in plan.configurations] == [
+        PlanStatus.PENDING,
+        PlanStatus.FAILED,
+    ]
+
+
+def test_latest_plan_is_the_last_planned_benchmark_of_the_system(sqlite_db):
+    # Arrange
+    repo = SqliteRepository(sqlite_db)
+    sys1 = SystemInfo(cpu_name="sys1")
+    sys2 = SystemInfo(cpu_name="sys2")
+    for system, cores in [(sys1, 1), (sys1, 2), (sys2, 4)]:
+        benchmark_id = repo.save_benchmark(Benchmark(application="test", system_info=system))
+        repo.save_plan(BenchmarkPlan.make(benchmark_id, [Configuration(cores, 1.0, 1)]))
+    # A benchmark without a plan, like one started by a campaign.
+    repo.save_benchmark(Benchmark(application="test", system_info=sys1))
+
+    # Act
+    plan = repo.get_latest_plan(sys1)
+
+    # Assert
+    assert plan.configurations[0].configuration.cores == 2
+    assert repo.get_latest_plan(SystemInfo(cpu_name="sys3")) is None
@@ -0,0 +1,105 @@
+import pytest
+
+from chronus.domain.configuration import Configuration, make_configurations
+from chronus.domain.cpu_info import SystemInfo
+from chronus.SystemIntegration.configuration_searches.surrogate_search import SurrogateSearch
+
+SYSTEM = SystemInfo(
+    cores=64,
+    threads_per_core=2,
+    frequencies=[
+        int(ghz * 1e6) for ghz in (1.0, 1.2, 1.4, 1.6, 1.8, 2.0, 2.2, 2.4, 2.6, 2.8, 3.0, 3.2)
+    ],
+)
+
+
+def efficiency(configuration: Configuration, bandwidth_cores: int = 16, best_ghz: float = 2.4):
+    """HPCG like GFLOPS/W, the GFLOPS stop growing with the cores when the memory bandwidth runs
+    out, while the power keeps growing with the cores and the frequency."""
+    ghz = configuration.frequency / 1e6
+    threads = configuration.threads_per_core - 1
+    gflops = min(configuration.cores, bandwidth_cores) ** 0.9 * ghz * (1 + 0.1 * threads)
+    watts = 90 + configuration.cores * (1.5 + 2.0 * (ghz / best_ghz) ** 3) * (1 + 0.05 * threads)
+    return gflops / watts
+
+
+def measure_all(search: SurrogateSearch, measure=efficiency) -> list[Configuration]:
+    measured = []
+    while (configuration := search.next_configuration()) is not None:
+        measured.append(configuration)
+        search.observe(configuration, measure(configuration))
+    return measured
+
+
+@pytest.mark.parametrize("bandwidth_cores, best_ghz", [(16, 2.4), (32, 2.0), (8, 1.6)])
+def test_finds_the_best_configuration_in_a_fifth_of_the_runs(bandwidth_cores, best_ghz):
+    # Arrange
+    grid = make_configurations(SYSTEM)
+    search = SurrogateSearch()
+    search.start(grid)
+
+    # Act
+    measured = measure_all(search, lambda c: efficiency(c, bandwidth_cores, best_ghz))
+
+    # Assert
+    best = max(efficiency(c, bandwidth_cores, best_ghz) for c in grid)
+    found = efficiency(search.best_configuration, bandwidth_cores, best_ghz)
+    assert found >= 0.99 * best
+    assert len(measured) <= 0.2 * len(grid)
+
+
+def test_measures_every_configuration_once_when_it_never_stops():
+    # Arrange
+    grid = make_configurations(SystemInfo(cores=4, threads_per_core=2, frequencies=[1e6, 2e6]))
+    search = SurrogateSearch(initial_runs=2, patience=1000)
+    search.start(grid)
+
+    # Act
+    measured = measure_all(search)
+
+    # Assert
+    assert sorted(measured, key=str) == sorted(grid, key=str)
+
+
+def test_stops_after_max_runs():
+    # Arrange
+    search = SurrogateSearch(max_runs=7)
+    search.start(make_configurations(SYSTEM))
+
+    # Act
+    measured = measure_all(search)
+
+    # Assert
+    assert len(measured) == 7
+
+
+def test_failed_configurations_are_not_proposed_again():
+    # Arrange
+    grid = make_configurations(SystemInfo(cores=4, threads_per_core=1, frequencies=[1e6, 2e6]))
+    search = SurrogateSearch(initial_runs=1, patience=1000)
+    search.start(grid)
+    failed = grid[0]
+
+    # Act
+    search.observe(failed, None)
+    measured = measure_all(search)
+
+    # Assert
+    assert failed not in measured
+    assert len(measured) == len(grid) - 1
+
+
+def test_start_forgets_the_earlier_search():
+    # Arrange
+    grid = make_configurations(SystemInfo(cores=2, threads_per_core=1, frequencies=[1e6]))
+    search = SurrogateSearch(initial_runs=1, patience=1000)
+    search.start(grid)
+    measure_all(search)
+
+    # Act
+    search.start(grid)
+
+    # Assert
+    assert search.runs == 0
+    assert search.best_configuration is None
+    assert search.next_configuration() is not None